@@ -6,7 +6,7 @@ if __name__ == '__main__':
 
     st.write("This app provides a means to view both current Hiding Book orders as well as past orders\
         that have been submitted by Rook users.")
-    st.write("It is broken down into four sections:")
+    st.write("It is broken down into six sections:")
     st.markdown("- **Open Orders Inspector**: This page provides a table (with filtering and sorting) of all\
         current HidingBook orders and allows viewing of associated auctions and fills each order.")
     st.markdown("- **Open Orders Analytics**: This page provides charts showing breakdown of open Hiding Book orders by size\
@@ -15,14 +15,21 @@ if __name__ == '__main__':
         orders from a given wallet and allows viewing of associated auctions and fills each order.")
     st.markdown("- **Historical Orders Analytics**: This page provides charts showing a user's past orders over time, by size\
         and fill level.")
+    st.markdown("- **Fills Analytics**: This page provides charts of collected fills: fill volume and gas spent by\
+        keeper and pair, and the time from order creation to fill.")
+    st.markdown("- **Diagnostics**: This page shows where page loads spend their time (upstream requests, data\
+        processing, table and chart rendering) and how often the caches are hit.")
 
     st.markdown('<h4>General tips</h4>', unsafe_allow_html=True)
     st.markdown("- You can access the app's setting on the top right. The app is best suited for\
         **Wide mode** with a **Light** or **Custom** theme.")
     st.markdown("- The app can be reset from the settings menu or by pressing 'R.'")
     st.markdown("- The app cache can be cleared from the settings menu or by pressing 'C.'")
+    st.markdown("- Token, market maker and keeper lists are also cached on disk (in `.cache/`) so restarts are fast;\
+        they are refreshed in the background once they are older than a day (a week for tokens).")
     st.markdown("- Logging can be accessed via 'Manage app' at the bottom right of the app.")
     st.markdown("- The sidebar can be closed to increase width available.")
-    st.markdown("- **Filters** are available for all tables from the right sidebar. Additional table columns can be shown\
-                from the **Columns** tab.")
+    st.markdown("- The order tables are filtered, sorted and paged from the **Filter and sort** panel above them, so only\
+                the current page is sent to the browser. Other tables have **Filters** in the right sidebar. Additional\
+                table columns can be shown from the **Columns** tab.")
     st.markdown("- Copying is not available in all tables. In these cases, data can be copied from provided JSON data.")
@@ -0,0 +1,110 @@
+import json
+import os
+import random
+
+from hidingbook import http_client
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RECORDED_ENDPOINTS = {
+    "tokens": (http_client.ROOK_API, "/api/v1/trade/tokens", None),
+    "market_makers": (http_client.ROOK_API, "/api/v1/coordinator/marketMakers", None),
+    "keepers": (http_client.ROOK_API, "/api/v1/coordinator/keepers", None),
+    "orders": (http_client.HIDINGBOOK_API, "/api/v1/orders", {"open": "True"}),
+}
+BENCH_WALLET = "0x" + "b" * 40
+ZERO_ADDRESS = "0x" + "0" * 40
+EXCHANGE_PROXY = "0xdef1c0ded9bec7f1a1670819833240f027b25eff"
+
+
+def record(fixture_dir=FIXTURE_DIR):
+    # Capture live responses once; scaled datasets are then cloned from these instead of the synthetic seed.
+    os.makedirs(fixture_dir, exist_ok=True)
+    for name, (base_url, path, params) in RECORDED_ENDPOINTS.items():
+        with open(os.path.join(fixture_dir, name + ".json"), "w") as fixture_file:
+            json.dump(http_client.get_json(base_url + path, params=params), fixture_file)
+
+
+def load_recorded(fixture_dir=FIXTURE_DIR):
+    if not all(os.path.exists(os.path.join(fixture_dir, name + ".json")) for name in RECORDED_ENDPOINTS):
+        return None
+    recorded = {}
+    for name in RECORDED_ENDPOINTS:
+        with open(os.path.join(fixture_dir, name + ".json")) as fixture_file:
+            recorded[name] = json.load(fixture_file)
+    if not recorded["orders"]["orders"]:
+        return None
+    return recorded
+
+
+def synthetic_seed(rng, token_count=40):
+    tokens = []
+    for i in range(token_count):
+        tokens.append({"address": "0x%040x" % (i + 1), "name": "TKN%d" % i, "decimals": rng.choice([6, 8, 18]),
+                       "coingecko_id": "token-%d" % i, "active": True,
+                       "latest_price": {"usd_price": rng.uniform(0.01, 3000), "eth_price": rng.uniform(1e-6, 2),
+                                        "timestamp": 1660000000},
+                       "trade_info": {"makerTokenTradeCount": 0, "takerTokenTradeCount": 0,
+                                      "mostRecentTradeTimestamp": 1660000000}})
+    market_makers = [{"name": "Maker %d" % i,
+                      "makerAddresses": ["0x%040x" % (0xa000 + 2 * i), "0x%040x" % (0xa001 + 2 * i)]}
+                     for i in range(3)]
+    keepers = [{"name": "Keeper %d" % i, "identityAddress": "0x%040x" % (0xc000 + i),
+                "activeTakerAddresses": ["0x%040x" % (0xd000 + i)]} for i in range(4)]
+    return {"tokens": tokens, "market_makers": market_makers, "keepers": keepers, "orders": {"orders": []}}
+
+
+def synthetic_order(rng, i, tokens, makers):
+    maker_token, taker_token = rng.sample(tokens, 2)
+    creation = 1650000000 + i
+    taker_amount = rng.uniform(1, 1e6) * 10 ** taker_token["decimals"]
+    filled = taker_amount * rng.choice([0, 0, 0, 0.25, 0.5, 1])
+    # Field set of a 0x v4 limit order as served by the Hiding Book API; most of it is never displayed.
+    return {"order": {"maker": rng.choice(makers), "makerToken": maker_token["address"],
+                      "takerToken": taker_token["address"],
+                      "makerAmount": rng.uniform(1, 1e6) * 10 ** maker_token["decimals"], "takerAmount": taker_amount,
+                      "expiry": creation + rng.choice([120, 3600, 86400 * 7]), "salt": rng.getrandbits(62),
+                      "taker": ZERO_ADDRESS, "sender": ZERO_ADDRESS, "feeRecipient": ZERO_ADDRESS,
+                      "takerTokenFeeAmount": 0, "pool": "0x" + "0" * 64, "chainId": 1,
+                      "verifyingContract": EXCHANGE_PROXY,
+                      "signature": {"signatureType": 2, "v": 27, "r": "0x%064x" % rng.getrandbits(256),
+                                    "s": "0x%064x" % rng.getrandbits(256)}},
+            "metaData": {"orderHash": "0x%064x" % i, "creation": creation, "filledAmount_takerToken": filled,
+                         "remainingFillableAmount_takerToken": taker_amount - filled}}
+
+
+def dataset(order_count, seed=0, fixture_dir=FIXTURE_DIR):
+    # Reference data comes from the recorded fixtures when present; orders are cloned from the recorded book
+    # (with fresh hashes) or generated, up to order_count.
+    rng = random.Random(seed)
+    recorded = load_recorded(fixture_dir)
+    base = recorded or synthetic_seed(rng)
+    tokens = base["tokens"]
+    makers = [address for market_maker in base["market_makers"] for address in market_maker["makerAddresses"]]
+    makers += ["0x%040x" % (0xe000 + i) for i in range(50)]
+
+    orders = []
+    for i in range(order_count):
+        if recorded:
+            template = base["orders"]["orders"][i % len(base["orders"]["orders"])]
+            order = {"order": dict(template["order"], salt=rng.getrandbits(62)),
+                     "metaData": dict(template["metaData"], orderHash="0x%064x" % i)}
+        else:
+            order = synthetic_order(rng, i, tokens, makers)
+        orders.append(order)
+
+    keeper_addresses = [address for keeper in base["keepers"] for address in keeper["activeTakerAddresses"]]
+    history = []
+    for i, order in enumerate(orders):
+        item = {"order": dict(order["order"], maker=BENCH_WALLET), "metaData": order["metaData"], "orderFills": []}
+        if order["metaData"]["filledAmount_takerToken"]:
+            item["orderFills"].append({"txHash": "0x%064x" % (i + 1), "taker": rng.choice(keeper_addresses),
+                                       "timestamp": order["metaData"]["creation"] + 60, "blockNumber": 15000000 + i,
+                                       "makerToken": order["order"]["makerToken"],
+                                       "takerToken": order["order"]["takerToken"],
+                                       "makerTokenFilledAmount": order["order"]["makerAmount"] / 2,
+                                       "takerTokenFilledAmount": order["metaData"]["filledAmount_takerToken"],
+                                       "gasUsed": 150000, "gasPrice": 30, "ethPrice": 1500})
+        history.append(item)
+
+    return {"tokens": tokens, "market_makers": base["market_makers"], "keepers": base["keepers"],
+            "orders": {"orders": orders}, "history": history}
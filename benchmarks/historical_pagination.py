@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import pandas as pd
+
+from hidingbook import pagination
+
+ORDER_COUNTS = (1000, 5000, 20000, 50000)
+
+
+def synthetic_history(order_count):
+    return [{"metaData": {"orderHash": "0x%064x" % i, "creation": 1650000000 + i},
+             "order": {"salt": str(i), "makerAmount": 10 ** 18, "takerAmount": 2 * 10 ** 18,
+                       "makerToken": "0x" + "1" * 40, "takerToken": "0x" + "2" * 40, "expiry": 1660000000}}
+            for i in range(order_count)]
+
+
+def page_fetcher(history, latency):
+    def fetch_page(offset, limit):
+        time.sleep(latency)
+        return {"items": history[offset:offset + limit]}
+
+    return fetch_page
+
+
+def sequential_fetch(fetch_page, page_size):
+    # The original historical_fetch loop: one page at a time, concatenating the growing frame.
+    order_count = 0
+    offset = 0
+    while order_count >= offset:
+        page = fetch_page(offset, page_size)
+        if offset == 0:
+            historical_data = pd.json_normalize(page["items"])
+        else:
+            historical_data = pd.concat([historical_data, pd.json_normalize(page["items"])])
+        offset += page_size
+        order_count = len(historical_data)
+    return historical_data
+
+
+def concurrent_fetch(fetch_page, page_size, max_workers):
+    return pd.json_normalize(pagination.fetch_pages(fetch_page, page_size=page_size, max_workers=max_workers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wall time of historical_fetch pagination versus order count")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per API request")
+    parser.add_argument("--page-size", type=int, default=pagination.PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=pagination.MAX_WORKERS)
+    parser.add_argument("--counts", type=int, nargs="+", default=ORDER_COUNTS)
+    args = parser.parse_args()
+
+    results = []
+    for order_count in args.counts:
+        fetch_page = page_fetcher(synthetic_history(order_count), args.latency)
+
+        start = time.perf_counter()
+        sequential_rows = len(sequential_fetch(fetch_page, args.page_size))
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent_rows = len(concurrent_fetch(fetch_page, args.page_size, args.workers))
+        concurrent_time = time.perf_counter() - start
+
+        assert sequential_rows == concurrent_rows == order_count
+        results.append({"Orders": order_count, "SequentialSec": sequential_time, "ConcurrentSec": concurrent_time,
+                        "Speedup": sequential_time / concurrent_time})
+
+    print(pd.DataFrame(results).to_string(index=False, float_format="{:,.2f}".format))
+
+
+if __name__ == '__main__':
+    main()
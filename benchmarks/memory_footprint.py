@@ -0,0 +1,72 @@
+import argparse
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+from hidingbook import cache, disk_cache, fetchers, http_client, valuation
+from hidingbook.order_book import OrderBook, ORDER_AMOUNTS
+
+
+def footprint(frame):
+    # Deep in-memory size, plus the pickled size since that is what the Streamlit memo stores and copies per call.
+    return {"rows": len(frame), "columns": frame.shape[1],
+            "memory_mb": frame.memory_usage(index=True, deep=True).sum() / 2 ** 20,
+            "pickle_mb": len(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)) / 2 ** 20}
+
+
+def measure(order_count, seed=0):
+    data = fixtures.dataset(order_count, seed=seed)
+    rows = []
+    with StandInServer(data) as server:
+        http_client.ROOK_API = server.url
+        http_client.HIDINGBOOK_API = server.url
+        fetchers.reset_singletons()
+        registry = fetchers.token_registry()
+        directory = fetchers.address_directory()
+
+        # Before: the full normalized and joined frames, as cached up to now.
+        orders_book = OrderBook()
+        orders_before = orders_book.sync(data["orders"]["orders"], registry, directory)
+        history_before = registry.join(pd.json_normalize(data["history"]), "order.makerToken", "order.takerToken",
+                                       ORDER_AMOUNTS)
+        history_before = valuation.value_orders(history_before, registry, fetchers.price_store(), "metaData.creation",
+                                                "order.makerToken", "order.takerToken", "creation_price")
+        orders_after = fetchers.order_fetch()
+        history_after = fetchers.historical_fetch(fixtures.BENCH_WALLET)
+
+        frames = [
+            ("order_book (internal)", orders_book.data, fetchers.order_book().data),
+            ("order_fetch", orders_before, orders_after),
+            ("order_table", fetchers.order_frame(orders_before), fetchers.order_frame(orders_after)),
+            ("historical_fetch", history_before, history_after),
+            ("historical_table", fetchers.historical_frame(history_before), fetchers.historical_frame(history_after)),
+        ]
+    for name, before, after in frames:
+        for version, frame in (("before", before), ("after", after)):
+            rows.append(dict(frame=name, version=version, **footprint(frame)))
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of the cached order frames before and after "
+                                                 "compaction, per 10k orders by default")
+    parser.add_argument("--orders", type=int, default=10000)
+    args = parser.parse_args()
+
+    cache.set_backend(cache.NullCache())
+    storage = tempfile.mkdtemp(prefix="hidingbook-bench-")
+    disk_cache.configure(os.path.join(storage, "cache.sqlite"))
+    fetchers.configure_storage(storage)
+    results = measure(args.orders)
+    results = results.pivot(index="frame", columns="version", values=["memory_mb", "pickle_mb"])
+    for metric in ("memory_mb", "pickle_mb"):
+        results[(metric, "ratio")] = results[(metric, "after")] / results[(metric, "before")]
+    print(results.to_string(float_format="{:,.2f}".format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+from hidingbook import cache, disk_cache, fetchers, http_client, metrics
+from hidingbook.price_series import MAX_POINTS, pair_series
+
+LOOKBACKS = ("1D", "1W", "1M", "1Y", "MAX")
+
+
+def positional_series(base_prices, quote_prices):
+    # The previous price_chart: divide by position and plot every point.
+    prices = base_prices.copy()
+    prices["Close"] = base_prices["Close"].div(quote_prices["Close"])
+    return prices
+
+
+def chart_payload(prices):
+    # Size and build time of the chart spec. Altair inlines the data as JSON records, so without Altair installed
+    # the records alone are measured.
+    start = time.perf_counter()
+    try:
+        import altair as alt
+    except ImportError:
+        payload = prices.to_json(orient="records", date_format="iso")
+    else:
+        chart = alt.Chart(prices).mark_line().encode(alt.X("Timestamp:T"), alt.Y("Close:Q"))
+        payload = chart.to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def measure(token1, token2, max_points):
+    rows = []
+    for lookback in LOOKBACKS:
+        base_prices = fetchers.price_fetch(token1, lookback)
+        quote_prices = fetchers.price_fetch(token2, lookback)
+        for version, build in (("positional", positional_series),
+                               ("aligned", lambda base, quote: pair_series(base, quote, max_points))):
+            start = time.perf_counter()
+            prices = build(base_prices, quote_prices)
+            build_s = time.perf_counter() - start
+            payload_bytes, render_s = chart_payload(prices)
+            rows.append({"lookback": lookback, "version": version, "points": len(prices), "build_s": build_s,
+                         "render_s": render_s, "payload_kb": payload_bytes / 1024})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Points, build/render time and chart payload of price_chart per "
+                                                 "lookback, positional versus aligned and downsampled")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS)
+    args = parser.parse_args()
+
+    cache.set_backend(cache.NullCache())
+    storage = tempfile.mkdtemp(prefix="hidingbook-bench-")
+    disk_cache.configure(os.path.join(storage, "cache.sqlite"))
+    fetchers.configure_storage(storage)
+    data = fixtures.dataset(10)
+    with StandInServer(data) as server:
+        http_client.ROOK_API = server.url
+        http_client.HIDINGBOOK_API = server.url
+        token1, token2 = data["tokens"][0]["name"], data["tokens"][1]["name"]
+        results = measure(token1, token2, args.max_points)
+    print(results.to_string(index=False, float_format="{:,.4f}".format))
+    requests = sum(count for (tier, outcome), count in metrics.registry.counters()["price_store_requests"].items()
+                   if outcome != "hit")
+    print("Upstream price requests: %d (one per token and lookback before the price store: %d)"
+          % (requests, 2 * len(LOOKBACKS)))
+
+
+if __name__ == '__main__':
+    main()
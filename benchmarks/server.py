@@ -0,0 +1,92 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandInServer:
+    # Local HTTP stand-in for api.rook.fi and the Hiding Book API, serving a dataset from benchmarks.fixtures.
+    def __init__(self, data, host="127.0.0.1", port=0):
+        self.data = data
+        self.static = {
+            "/api/v1/trade/tokens": json.dumps(data["tokens"]).encode(),
+            "/api/v1/coordinator/marketMakers": json.dumps(data["market_makers"]).encode(),
+            "/api/v1/coordinator/keepers": json.dumps(data["keepers"]).encode(),
+            "/api/v1/orders": json.dumps(data["orders"]).encode(),
+        }
+        self.history_by_hash = {item["metaData"]["orderHash"]: item for item in data["history"]}
+        self.httpd = ThreadingHTTPServer((host, port), self.handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                split = urlsplit(self.path)
+                body = server.respond(split.path, {key: values[0] for key, values in parse_qs(split.query).items()})
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, path, params):
+        if path in self.static:
+            return self.static[path]
+        if path == "/api/v1/trade/orderHistory":
+            if "orderHashes" in params:
+                items = [self.history_by_hash[order_hash] for order_hash in params["orderHashes"].split(",")
+                         if order_hash in self.history_by_hash]
+            else:
+                offset = int(params.get("offset", 0))
+                items = self.data["history"][offset:offset + int(params.get("limit", 100))]
+            return json.dumps({"items": items}).encode()
+        if path == "/api/v1/coordinator/auctions":
+            return json.dumps([{"orderHash": order_hash, "auctionCreationBlockNumber": 15000000,
+                                "auctionSettlementBlockNumber": 15000001, "auctionDeadlineBlockNumber": 15000003,
+                                "bidList": []} for order_hash in params.get("orderHashes", "").split(",")]).encode()
+        if path == "/api/v1/trade/tokenPriceHistory":
+            return json.dumps(self.candles(params.get("coinGeckoTokenId", ""), params.get("days", "1"))).encode()
+        return None
+
+    @staticmethod
+    def candles(coingecko_id, days):
+        # CoinGecko OHLC granularity: 30 minutes up to 2 days, 4 hours up to 30 days, 4 days beyond ("max" is
+        # taken as ten years). Each token gets its own price level.
+        days = 3650 if days == "max" else int(days)
+        interval = 30 * 60 if days <= 2 else 4 * 60 * 60 if days <= 30 else 4 * 24 * 60 * 60
+        count = days * 24 * 60 * 60 // interval
+        end = 1660000000 - 1660000000 % interval
+        level = 1.0 + sum(coingecko_id.encode()) % 100
+        return [[(end - (count - i) * interval) * 1000, level, level * 1.01, level * 0.99, level * (1 + i * 1e-4)]
+                for i in range(count)]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+from hidingbook import analytics, cache, disk_cache, fetchers, http_client
+
+SIZES = (1000, 10000, 100000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def stage_order_fetch(state):
+    state["raw_orders"] = fetchers.order_fetch()
+    return len(state["raw_orders"])
+
+
+def stage_order_resync(state):
+    return len(fetchers.order_fetch())
+
+
+def stage_order_table(state):
+    state["orders"] = fetchers.order_frame(state["raw_orders"])
+    return len(state["orders"])
+
+
+def stage_historical_fetch(state):
+    state["raw_history"] = fetchers.historical_fetch(fixtures.BENCH_WALLET)
+    return len(state["raw_history"])
+
+
+def stage_historical_table(state):
+    state["history"] = fetchers.historical_frame(state["raw_history"])
+    return len(state["history"])
+
+
+def stage_analytics_cube(state):
+    state["cube"] = analytics.build_cube(state["orders"])
+    return len(state["cube"].dimensions)
+
+
+def stage_analytics_filtered(state):
+    # A grid filter: half the rows, re-aggregated from the cube.
+    return len(state["cube"].view(state["orders"].iloc[::2]))
+
+
+def stage_size_pie_chart(state):
+    return len(analytics.size_breakdown(state["cube"].view()))
+
+
+def stage_token_depth(state):
+    return len(analytics.token_depth(state["cube"].view()))
+
+
+def stage_pair_depth(state):
+    return len(analytics.pair_depth(state["cube"].view()))
+
+
+STAGES = [
+    ("order_fetch", stage_order_fetch),
+    ("order_resync", stage_order_resync),
+    ("order_table", stage_order_table),
+    ("historical_fetch", stage_historical_fetch),
+    ("historical_table", stage_historical_table),
+    ("analytics_cube", stage_analytics_cube),
+    ("analytics_filtered", stage_analytics_filtered),
+    ("size_pie_chart", stage_size_pie_chart),
+    ("hiding_book_depth_token", stage_token_depth),
+    ("hiding_book_depth_pair", stage_pair_depth),
+]
+
+
+def run_pipeline(traced):
+    # One pass over every stage against the stand-in server. Wall time comes from an untraced pass since
+    # tracemalloc slows allocation-heavy code down several times; memory comes from a traced pass.
+    fetchers.reset_singletons()
+    state = {}
+    results = {}
+    for name, stage in STAGES:
+        if traced:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        rows = stage(state)
+        wall = time.perf_counter() - start
+        net_blocks = sys.getallocatedblocks() - blocks_before
+        result = {"rows": rows, "wall_s": wall, "net_blocks": net_blocks}
+        if traced:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result.update({"peak_mb": peak / 2 ** 20, "retained_mb": current / 2 ** 20})
+        results[name] = result
+    return results
+
+
+def run(sizes, seed=0):
+    cache.set_backend(cache.NullCache())
+    storage = tempfile.mkdtemp(prefix="hidingbook-bench-")
+    disk_cache.configure(os.path.join(storage, "cache.sqlite"))
+    fetchers.configure_storage(storage)
+    report = {}
+    for size in sizes:
+        with StandInServer(fixtures.dataset(size, seed=seed)) as server:
+            http_client.ROOK_API = server.url
+            http_client.HIDINGBOOK_API = server.url
+            timed = run_pipeline(traced=False)
+            traced = run_pipeline(traced=True)
+        for name, result in timed.items():
+            result["peak_mb"] = traced[name]["peak_mb"]
+            result["retained_mb"] = traced[name]["retained_mb"]
+        report[str(size)] = timed
+    return report
+
+
+def default_label():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def report_frame(report):
+    rows = [dict(size=int(size), stage=stage, **result) for size, stages in report.items()
+            for stage, result in stages.items()]
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage wall time and memory of the data pipeline versus book "
+                                                 "size, replayed against a local stand-in API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="order counts (e.g. 1000 ... 1000000)")
+    parser.add_argument("--label", default=None, help="name to store results under (defaults to the git commit)")
+    parser.add_argument("--baseline", default=None, help="stored label to compare against")
+    parser.add_argument("--record", action="store_true", help="record live API responses as fixtures and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        fixtures.record()
+        return
+
+    label = args.label or default_label()
+    report = run(args.sizes)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, label + ".json"), "w") as results_file:
+        json.dump({"label": label, "created": datetime.utcnow().isoformat(), "python": platform.python_version(),
+                   "pandas": pd.__version__, "results": report}, results_file, indent=2)
+
+    results = report_frame(report)
+    if args.baseline:
+        with open(os.path.join(RESULTS_DIR, args.baseline + ".json")) as baseline_file:
+            baseline = report_frame(json.load(baseline_file)["results"])
+        results = results.merge(baseline[["size", "stage", "wall_s", "peak_mb"]], on=["size", "stage"],
+                                how="left", suffixes=("", "_baseline"))
+        results["wall_ratio"] = results["wall_s"] / results["wall_s_baseline"]
+        results["peak_ratio"] = results["peak_mb"] / results["peak_mb_baseline"]
+    print(results.to_string(index=False, float_format="{:,.3f}".format))
+
+
+if __name__ == '__main__':
+    main()
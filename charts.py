@@ -1,18 +1,16 @@
 import streamlit as st
 import altair as alt
-from data_fetchers import price_fetch
-import pandas as pd
+from hidingbook import metrics
+from hidingbook.fetchers import depth_ladders, price_fetch
+from hidingbook.depth_ladder import DepthLadders, normalized_pairs
+from hidingbook.price_series import pair_series
+from hidingbook.analytics import pair_depth, size_breakdown, token_depth, type_breakdown, fill_totals, \
+    latency_breakdown
 
 
+@metrics.timed()
 def price_chart(token1, token2, lookback, target):
-    prices1 = price_fetch(token1, lookback)
-    prices2 = price_fetch(token2, lookback)
-
-    prices1.set_index('Timestamp')
-    prices2.set_index('Timestamp')
-
-    prices = prices1
-    prices["Close"] = prices1["Close"].div(prices2["Close"])
+    prices = pair_series(price_fetch(token1, lookback), price_fetch(token2, lookback))
     prices["Target"] = target
 
     base = alt.Chart(prices).properties(width=550)
@@ -51,30 +49,17 @@ def price_chart(token1, token2, lookback, target):
         size=alt.value(2)
     )
 
-    st.altair_chart((line + points + price_target + tooltips), use_container_width=True)
+    with metrics.timer("price_chart.render." + lookback):
+        st.altair_chart((line + points + price_target + tooltips), use_container_width=True)
     with st.expander("Legend"):
         st.markdown('<p style="color: SteelBlue; font-weight: bold">― Historical Price</p>', unsafe_allow_html=True)
         st.markdown('<p style="color: Black; font-weight: bold">― Limit Price</p>', unsafe_allow_html=True)
         st.write('Note: all times are in UTC')
 
 
-def size_pie_chart(order_data):
-    order_data["size_group"] = "Empty"
-    order_data['TakerAmtUSD'] = pd.to_numeric(order_data['TakerAmtUSD'])
-    order_data.loc[order_data['TakerAmtUSD'] < 1000, "size_group"] = "A. Tiny (<$1k)"
-    order_data.loc[
-        (1000 <= order_data['TakerAmtUSD']) & (order_data['TakerAmtUSD'] < 5000), "size_group"] = "B. Small ($1k-$5k)"
-    order_data.loc[
-        (5000 <= order_data['TakerAmtUSD']) & (order_data['TakerAmtUSD'] < 10000), "size_group"] = "C. Avg ($5k-$10k)"
-    order_data.loc[
-        (10000 <= order_data['TakerAmtUSD']) & (
-                order_data['TakerAmtUSD'] < 50000), "size_group"] = "D. Large ($10k-$50k)"
-    order_data.loc[(50000 <= order_data['TakerAmtUSD']) & (
-            order_data['TakerAmtUSD'] < 150000), "size_group"] = "E. Very Large ($50k-$150k)"
-    order_data.loc[order_data['TakerAmtUSD'] >= 150000, 'size_group'] = "F. Huge (>$150k)"
-
-    order_stats = order_data['size_group'].value_counts()
-    order_stats = order_stats.reset_index()
+@metrics.timed()
+def size_pie_chart(cube_view):
+    order_stats = size_breakdown(cube_view)
 
     base = alt.Chart(order_stats).encode(
         theta=alt.Theta("size_group:Q", stack=True),
@@ -85,32 +70,28 @@ def size_pie_chart(order_data):
 
     st.altair_chart(pie + label)
 
-    return order_data
 
+@metrics.timed()
+def order_type_chart(cube_view):
+    type_data = type_breakdown(cube_view)
 
-def hiding_book_depth(order_data, mode="Token"):
-    order_data['MakerAmtUSD'] = pd.to_numeric(order_data['MakerAmtUSD'])
-    order_data['TakerAmtUSD'] = pd.to_numeric(order_data['TakerAmtUSD'])
-    if mode == "Token":
-        maker_agg_data = order_data.groupby(['MakerToken']).sum().reset_index().rename(
-            columns={'MakerToken': 'Token'})
-        taker_agg_data = order_data.groupby(['TakerToken']).sum().reset_index().rename(
-            columns={'TakerToken': 'Token'})
-        overlap = taker_agg_data['Token'].isin(maker_agg_data['Token'])
-        unique_taker_data = taker_agg_data[~overlap].drop(columns=['OrderSalt', 'MakerAmtUSD'])
-        unique_taker_data = unique_taker_data.rename(columns={'TakerAmtUSD': 'TotalTakerUSD'})
+    chart = alt.Chart(type_data).mark_bar().encode(
+        x=alt.X('MakerAmtUSD:Q', title="Maker USD"),
+        y=alt.Y('OrderType:N', title=None),
+        color=alt.Color('OrderType:N', legend=None),
+        tooltip=[alt.Tooltip('OrderType:N'), alt.Tooltip('Orders:Q'), alt.Tooltip('MakerAmtUSD:Q', format='$,.2f'),
+                 alt.Tooltip('TakerAmtUSD:Q', format='$,.2f')]
+    )
 
-        order_data = pd.DataFrame(maker_agg_data.loc[:, ['Token', 'MakerAmtUSD']]).rename(
-            columns={'MakerAmtUSD': 'TotalMakerUSD'})
+    st.altair_chart(chart, use_container_width=True)
 
-        taker_agg_data = taker_agg_data.set_index("Token")
-        order_data['TotalTakerUSD'] = order_data['Token'].map(taker_agg_data['TakerAmtUSD']).fillna(0)
 
-        unique_taker_data['TotalMakerUSD'] = 0
-        order_data = pd.concat([order_data, unique_taker_data])
-        order_data = order_data.rename(columns={'TotalTakerUSD': 'Taker', 'TotalMakerUSD': 'Maker'})
+@metrics.timed()
+def hiding_book_depth(cube_view, mode="Token"):
+    if mode == "Token":
+        depth_data = token_depth(cube_view)
 
-        chart = alt.Chart(order_data).mark_bar(clip=True).encode(
+        chart = alt.Chart(depth_data).mark_bar(clip=True).encode(
             x=alt.X('ValueUSD:Q', scale=alt.Scale(domain=(0, 10000000)), axis=alt.Axis(labelAngle=-45)),
             y='Direction:N',
             color=alt.Color('Direction:N', legend=None),
@@ -121,28 +102,7 @@ def hiding_book_depth(order_data, mode="Token"):
             fold=['Taker', 'Maker']
         )
     else:
-        order_data['MakerToken'] = order_data['MakerToken'].astype('category')
-        order_data['TakerToken'] = order_data['TakerToken'].astype('category')
-
-        agg_data = order_data.groupby(['MakerToken', 'TakerToken']).sum().reset_index().drop(
-            columns=['OrderSalt'])
-
-        combined_data = pd.DataFrame(columns={'Pair', 'MakerToken', 'TakerToken', 'SellValueUSD', 'BuyValueUSD'}). \
-            rename({"SellValueUSD: MakerValueUSD", "BuyValueUSD: TakerValueUSD"})
-        for _, row in agg_data.iterrows():
-            pair = row['MakerToken'] + '/' + row["TakerToken"]
-            inverse = row['TakerToken'] + '/' + row["MakerToken"]
-            value = row['MakerAmtUSD']
-            if value != 0:
-                matched_idx = combined_data.index[combined_data['Pair'] == inverse]
-                if len(matched_idx) > 0:
-                    combined_data.loc[matched_idx[0], 'TakerValueUSD'] = value
-                else:
-                    combined_data = combined_data.append({'Pair': pair, 'MakerToken': row['MakerToken'],
-                                                          'TakerToken': row['TakerToken'], 'TakerValueUSD': 0,
-                                                          'MakerValueUSD': value}, ignore_index=True)
-        combined_data = combined_data.rename(columns={'TakerValueUSD': 'Taker', 'MakerValueUSD': 'Maker'})
-        combined_data.set_index('Pair')
+        combined_data = pair_depth(cube_view)
 
         chart = alt.Chart(combined_data).mark_bar(clip=True).encode(
             x=alt.X('ValueUSD:Q', scale=alt.Scale(domain=(0, 5000000)), axis=alt.Axis(labelAngle=-45)),
@@ -158,6 +118,68 @@ def hiding_book_depth(order_data, mode="Token"):
     st.altair_chart(chart)
 
 
+@metrics.timed()
+def depth_ladder_chart(ladder, pair):
+    base_token, quote_token = pair.split("/")
+    chart = alt.Chart(ladder).mark_line(interpolate="step-after").encode(
+        x=alt.X('Price:Q', scale=alt.Scale(zero=False), title="Price (" + quote_token + " per " + base_token + ")"),
+        y=alt.Y('DepthUSD:Q', title="Cumulative depth (USD)"),
+        color=alt.Color('Side:N', scale=alt.Scale(domain=["Bid", "Ask"], range=["green", "red"])),
+        tooltip=[alt.Tooltip('Side:N'), alt.Tooltip('Price:Q', format=',.6f'), alt.Tooltip('Orders:Q'),
+                 alt.Tooltip('DepthAmt:Q', title="Depth (" + base_token + ")", format=',.4f'),
+                 alt.Tooltip('DepthUSD:Q', format='$,.2f')]
+    )
+
+    st.altair_chart(chart, use_container_width=True)
+
+
+def depth_ladder(grid, order_data, archived=False):
+    # Ladders are always built from the whole book (order_data), so every session shares one set for the live
+    # book; the table filter only narrows the pairs to pick from. Archived books are built once and not cached.
+    ladders = (DepthLadders() if archived else depth_ladders()).update(order_data)
+    pairs = sorted(set(normalized_pairs(grid["data"])[0]) & set(ladders))
+    if not pairs:
+        return
+    pair = st.selectbox("Pair", pairs)
+    depth_ladder_chart(ladders[pair], pair)
+    with st.expander("Legend"):
+        st.write("Pairs are shown with their tokens in alphabetical order (base/quote) and prices in quote tokens\
+            per base token. Asks sell the base token and bids buy it; each point is the remaining (unfilled) size\
+            available at that price or better, valued at current USD prices.")
+
+
+@metrics.timed()
+def fill_totals_chart(fills_data, column, measure, limit=25):
+    # Largest keepers or pairs by filled USD; measure is the bar: TakerAmtFilledUSD, GasUSD or MedianLatencySec.
+    totals = fill_totals(fills_data, column).head(limit)
+
+    chart = alt.Chart(totals).mark_bar().encode(
+        x=alt.X(measure + ':Q'),
+        y=alt.Y(column + ':N', sort=list(totals[column]), title=None),
+        tooltip=[alt.Tooltip(column + ':N'), alt.Tooltip('Fills:Q'),
+                 alt.Tooltip('TakerAmtFilledUSD:Q', title="Filled USD", format='$,.2f'),
+                 alt.Tooltip('GasUSD:Q', format='$,.2f'),
+                 alt.Tooltip('GasPct:Q', title="Gas % of filled", format='.3f'),
+                 alt.Tooltip('MedianLatencySec:Q', title="Median latency (s)", format=',.0f')]
+    )
+
+    st.altair_chart(chart, use_container_width=True)
+
+
+@metrics.timed()
+def fill_latency_chart(fills_data):
+    latency_data = latency_breakdown(fills_data)
+
+    chart = alt.Chart(latency_data).mark_bar().encode(
+        x=alt.X('Latency:N', title="Time from order creation to fill"),
+        y=alt.Y('Fills:Q'),
+        tooltip=[alt.Tooltip('Latency:N'), alt.Tooltip('Fills:Q')]
+    )
+
+    st.altair_chart(chart, use_container_width=True)
+
+
+@metrics.timed()
 def order_history_chart(data):
     points = alt.Chart(data).mark_circle().encode(
         x=alt.Y('Expiry:T', axis=alt.Y(title="Expiry (UTC)")),
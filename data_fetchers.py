@@ -1,75 +1,39 @@
+import os
+import tempfile
+import time
+
 import streamlit as st
-import pandas as pd
-import requests
 from st_aggrid import AgGrid, GridOptionsBuilder
 from st_aggrid.shared import GridUpdateMode, JsCode
-import etherscan.tokens as tokens
-from datetime import datetime
-
-
-@st.experimental_memo()
-def market_maker_fetch(start_date=None, end_date=None):
-    mm_params = {"startTimestamp": start_date, "endTimestamp ": end_date}
-    mm_json = requests.get("https://api.rook.fi/api/v1/coordinator/marketMakers", params=mm_params).json()
-    mm_data = pd.json_normalize(mm_json, meta=["name"], record_path=["makerAddresses"])
-
-    mm_data = mm_data.rename(columns={"name": "Name", mm_data.columns[0]: "Address"}).set_index("Address")
-    mm_data["Type"] = "Market Maker"
-
-    return mm_data
-
-
-@st.experimental_memo()
-def keeper_fetch(start_date=None, end_date=None):
-    keeper_params = {"startTimestamp": start_date, "endTimestamp ": end_date}
-    keeper_json = requests.get("https://api.rook.fi/api/v1/coordinator/keepers", params=keeper_params).json()
-    keeper_data = pd.json_normalize(keeper_json, meta=["name"], record_path=["activeTakerAddresses"])
-    keeper_data = keeper_data.rename(columns={"name": "Name", keeper_data.columns[0]: "Address"}).set_index("Address")
-    keeper_data["Type"] = "Keeper"
+from streamlit_autorefresh import st_autorefresh
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
 
-    raw_keeper_id = pd.json_normalize(keeper_json)
-    keeper_id = pd.DataFrame(raw_keeper_id.loc[:, ["name", "identityAddress"]]).rename(
-        columns={"name": "Name", "identityAddress": "IdentityAddress"}). \
-        set_index("IdentityAddress")
+from hidingbook import cache, change_feed, export, local_server, metrics, refresher
+from hidingbook.grid_model import PAGE_SIZE, PAGE_SIZES, query_frame, row_record
+from hidingbook.fetchers import address_directory, token_fetch, historical_frame, order_fetch, \
+    order_frame, token_registry, balance_service, balance_keys, prefetch_order_details, fills_fetch, fills_frame, \
+    auctions_fetch, auctions_frame, history_ingest, history_store, wallet_history, order_cubes, book_archive, \
+    fills_ingest, fills_store, fills_analytics_frame
+from hidingbook.price_store import LOOKBACK_DAYS
 
-    return keeper_data, keeper_id
+CHANGE_SECONDS = 5 * 60
 
 
-@st.experimental_memo()
-def known_address_fetch(start_date=None, end_date=None):
-    mm_data = market_maker_fetch(start_date, end_date)
-    keeper_data, _ = keeper_fetch(start_date, end_date)
-    other_list = [
-        ["Gigawhale", "0x6555e1cc97d3cba6eaddebbcd7ca51d75771e0b8"],
-        ["hello.eth", "0x759a159d78342340ebacffb027c05910c093f430"],
-        ["abuse.eth", "0x49a2dcc237a65cc1f412ed47e0594602f6141936"],
-        ["3 Arrows Capital", "0xd80856b01feed61e954cd365861bd87e5d39f2e7"],
-        ["Amber", "0x5d45594917a30182ca6cfd946b969c1341127c2d"],
-        ["one-decade on OpenSea", "0x3765ea1a0d34d9c7991181824d2410fd8612f474"],
-        ["Harley87 on OpenSea", "0xf6853c77a2452576eae5af424975a101ffc47308"],
-        ["Polychain", "0xf286bb612e219916f8e9ba7200bf09ed218890cb"],
-        ["Maven11", "0xfacf46ea1e0ad2681103e726f64cfc503e9da5d6"],
-        ["Rook Test Wallet", "0x4f72f7Ca2E909BC64022466B46f12Ab328055500"]
-    ]
-    other_data = pd.DataFrame(other_list, columns=["Name", "Address"]).set_index("Address")
-    other_data["Type"] = "User"
+class StreamlitCache:
+    # Core fetchers cache through Streamlit's memo so "Clear cache" in the app menu still clears them.
+    def wrap(self, func, ttl):
+        return st.experimental_memo(ttl=ttl)(func)
 
-    known_data = pd.concat([mm_data, keeper_data, other_data])
 
-    return known_data
-
-
-@st.experimental_memo(ttl=7 * 24 * 60 * 60)
-def token_fetch():
-    token_json = requests.get("https://api.rook.fi/api/v1/trade/tokens").json()
-    token_data = pd.json_normalize(token_json)
-    token_data = token_data.drop(columns=["active", "latest_price.timestamp",
-                                          "trade_info.makerTokenTradeCount", "trade_info.takerTokenTradeCount",
-                                          "trade_info.mostRecentTradeTimestamp"])
-
-    return token_data
+cache.set_backend(StreamlitCache())
+local_server.serve()
+# HIDINGBOOK_REFRESH=0 leaves every fetcher to load on demand; bulk ingestion only runs with HIDINGBOOK_INGEST=1.
+if os.environ.get("HIDINGBOOK_REFRESH", "1") != "0":
+    refresher.start()
 
 
+@metrics.timed()
 @st.experimental_memo(ttl=7 * 24 * 60 * 60)
 def token_table():
     token_data = token_fetch()
@@ -81,108 +45,175 @@ def token_table():
     token_options.configure_side_bar()
     token_options.configure_selection("single")
 
-    token_grid = AgGrid(
-        token_data,
-        enable_enterprise_modules=True,
-        gridOptions=token_options.build(),
-        update_mode=GridUpdateMode.MODEL_CHANGED)
+    with metrics.timer("token_table.aggrid"):
+        token_grid = AgGrid(
+            token_data,
+            enable_enterprise_modules=True,
+            gridOptions=token_options.build(),
+            update_mode=GridUpdateMode.MODEL_CHANGED)
     return token_grid
 
 
-@st.experimental_memo(ttl=5 * 60)
-def price_fetch(token_symbol, lookback_str):
-    token_data = token_fetch()
-    coingecko_id = token_data[token_data["name"] == token_symbol.upper()]["coingecko_id"].iloc[0]
-
-    if lookback_str == "1D":
-        lookback = 1
-    elif lookback_str == "1W":
-        lookback = 7
-    elif lookback_str == "1M":
-        lookback = 30
-    elif lookback_str == "1Y":
-        lookback = 365
-    else:
-        lookback = 'max'
-
-    price_params = {"coinGeckoTokenId": coingecko_id.lower(), "days": str(lookback)}
-    raw_data = requests.get("https://api.rook.fi/api/v1/trade/tokenPriceHistory", params=price_params).content
-    decoded_price_data = raw_data.decode('utf-8').replace("b'", "").replace("'", "")
-    price_data = pd.DataFrame(eval(decoded_price_data), columns=["Timestamp", "Open", "High", "Low", "Close"])
-    price_data["Timestamp"] = pd.to_datetime(price_data["Timestamp"], unit='ms')
-    price_data = price_data.drop(columns=["Open", "High", "Low"])
-
-    return price_data
-
-
-@st.experimental_memo(ttl=15 * 60)
-def historical_fetch(address):
-    token_data = token_fetch()
-
-    order_count = 0
-    offset = 0
-    while order_count >= offset:
-        historical_params = {"makerAddresses": address, "limit": 100, "offset": offset}
-        historical_json = requests.get("https://api.rook.fi/api/v1/trade/orderHistory",
-                                       params=historical_params).json()
-
-        if offset == 0:
-            historical_data = pd.json_normalize(historical_json["items"])
-        else:
-            historical_data = pd.concat([historical_data, pd.json_normalize(historical_json["items"])])
-
-        offset += 100
-        order_count = len(historical_data)
-
-    joined_data0 = pd.merge(historical_data, token_data,
-                            left_on="order.makerToken",
-                            right_on="address")
-    joined_data = pd.merge(joined_data0, token_data,
-                           left_on="order.takerToken",
-                           right_on="address",
-                           suffixes=("_maker", "_taker"))
-    joined_data["order.makerAmount"] = joined_data["order.makerAmount"] / (10 ** joined_data["decimals_maker"])
-    joined_data["order.takerAmount"] = joined_data["order.takerAmount"] / (10 ** joined_data["decimals_taker"])
-    joined_data["metaData.filledAmount_takerToken"] = \
-        joined_data["metaData.filledAmount_takerToken"] / (10 ** joined_data["decimals_taker"])
-    joined_data["metaData.remainingFillableAmount_takerToken"] = \
-        joined_data["metaData.remainingFillableAmount_takerToken"] / (10 ** joined_data["decimals_taker"])
-
-    return joined_data
+def order_changes():
+    # This session's subscription to the shared change feed: only events after its cursor are read, and they
+    # are kept for CHANGE_SECONDS so highlights outlast the rerun that first saw them.
+    events, cursor = change_feed.feed.since(st.session_state.get("change_cursor", change_feed.feed.sequence))
+    st.session_state["change_cursor"] = cursor
+    horizon = time.time() - CHANGE_SECONDS
+    changes = [change for change in st.session_state.get("order_changes", []) + events if change["time"] >= horizon]
+    st.session_state["order_changes"] = changes
+    return changes
+
+
+def schedule_rerun(seconds):
+    # The browser reruns the page every `seconds` (held back while the user is interacting with it), so no script
+    # run sleeps waiting for the poller; each rerun reads the change feed once, from this session's cursor.
+    st_autorefresh(interval=int(seconds * 1000), key="live_rerun")
+
+
+def export_buttons(dataset, **params):
+    # When the local endpoint is reachable from browsers (HIDINGBOOK_PUBLIC_URL), tables link to its /export route,
+    # which sends each chunk as soon as it is encoded. Otherwise the chunks are written to a temporary file on
+    # request and Streamlit serves that file, so they are never joined in the session.
+    key = "export_" + dataset
+    if local_server.PUBLIC_URL:
+        links = ["[" + output_format.upper() + "](" + local_server.PUBLIC_URL + "/export?" +
+                 urlencode(dict(params, dataset=dataset, format=output_format)) + ")"
+                 for output_format in export.FORMATS]
+        st.markdown("Export: " + " · ".join(links))
+        return
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        output_format = st.radio("Export", export.FORMATS, key=key + "_format", format_func=str.upper,
+                                 horizontal=True)
+    with col2:
+        if not st.button("Prepare " + output_format.upper() + " export", key=key + "_prepare"):
+            return
+        with tempfile.TemporaryDirectory(prefix="hidingbook-export-") as directory:
+            path = os.path.join(directory, dataset + "." + output_format)
+            try:
+                with metrics.timer("export." + dataset), open(path, "wb") as output:
+                    export.write(export.DATASETS[dataset](params), output, output_format)
+            except ValueError as error:
+                st.caption("Export unavailable: " + str(error))
+                return
+            metrics.registry.count("export_requests", (dataset, output_format))
+            with open(path, "rb") as data:
+                st.download_button("Download " + output_format.upper(), data, file_name=dataset + "." + output_format,
+                                   mime=export.CONTENT_TYPES[output_format], key=key + "_download")
+
+
+def snapshot_caption(label, fetcher):
+    age = fetcher.job.age()
+    if age is not None:
+        st.caption(label + " as of " + "{:,.0f}".format(age) + "s ago (refreshed in the background every " +
+                   "{:,.0f}".format(fetcher.job.interval) + "s)")
+
+
+def grid_query(key, frame, filter_columns, search_columns, sort_columns, default_sort):
+    # Server-side row model: filters, sort and paging are applied to the cached frame in pandas and only the
+    # current page is handed to AgGrid. Returns all matching rows (in sort order) and the page.
+    with st.expander("Filter and sort"):
+        filters = {}
+        for filter_column, column in zip(filter_columns, st.columns(len(filter_columns))):
+            options = sorted(frame[filter_column].dropna().astype(str).unique())
+            filters[filter_column] = column.multiselect(filter_column, options,
+                                                        key=key + "_filter_" + filter_column)
+        search = st.text_input("Search (" + ", ".join(search_columns) + ")", key=key + "_search")
+        sort_column, order_column, size_column = st.columns([2, 1, 1])
+        sort_by = sort_column.selectbox("Sort by", sort_columns, index=sort_columns.index(default_sort),
+                                        key=key + "_sort")
+        ascending = order_column.radio("Order", ("Descending", "Ascending"), key=key + "_order") == "Ascending"
+        page_size = size_column.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(PAGE_SIZE),
+                                          key=key + "_page_size")
+
+    page_key = key + "_page"
+    rows, window, page_count = query_frame(frame, filters, search, search_columns, sort_by, ascending,
+                                           st.session_state.get(page_key, 1) - 1, page_size)
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    page_column, count_column = st.columns([1, 3])
+    page_column.number_input("Page (of " + str(page_count) + ")", min_value=1, max_value=page_count, key=page_key)
+    count_column.caption(str(len(rows)) + " of " + str(len(frame)) + " orders match")
+    return rows, window
+
+
+def grid_result(grid, rows, key_column, frame):
+    # The grid only knows the current page; selections come back as a row key and are resolved against the
+    # matching rows. "data" holds every matching row, not just the page, so charts see the whole filtered book;
+    # "frame" is the unfiltered frame the rows were taken from.
+    selected_rows = [row_record(rows, key_column, row[key_column]) for row in grid["selected_rows"]]
+    return {"data": rows, "page": grid["data"], "selected_rows": [row for row in selected_rows if row is not None],
+            "frame": frame}
+
+
+def analytics_view(grid):
+    # The grid's matching rows re-aggregated from the analytics cube of its whole frame, which is built once per
+    # snapshot and shared by every session.
+    return order_cubes().cube(grid["frame"]).view(grid["data"])
+
+
+def wallet_picker():
+    # Known wallets are picked by name (a market maker's name selects all of its addresses); any other wallet can
+    # be typed in, and a name that doesn't match exactly offers the closest known names instead. Returns the
+    # selected addresses.
+    directory = address_directory()
+    names = st.multiselect("Known wallets", sorted(directory.addresses_by_name))
+    addresses = [address for name in names for address in directory.addresses_by_name[name]]
+
+    wallet_address = st.text_input("Wallet Address / Identifier", "")
+    if len(wallet_address) > 0:
+        matches = directory.resolve(wallet_address)
+        if len(matches) == 0:
+            suggestions = directory.suggest(wallet_address)
+            if len(suggestions) == 0:
+                st.write("Unknown wallet: " + wallet_address)
+                return list(dict.fromkeys(addresses))
+            suggestion = st.selectbox("Did you mean", ["-"] + suggestions)
+            matches = directory.lookup(suggestion) if suggestion != "-" else []
+        if matches and matches != [wallet_address.strip()]:
+            st.write("Wallet address: " + ", ".join(matches))
+        addresses.extend(matches)
+    addresses = list(dict.fromkeys(addresses))
+
+    stored = sum(address in history_store() for address in addresses)
+    if addresses:
+        st.caption(str(stored) + " of " + str(len(addresses)) + " wallets read from the local history store (" +
+                   str(len(history_store().wallets())) + " stored); the rest are fetched live")
+    snapshot_caption("History store", history_ingest)
+    return addresses
+
+
+def fills_analytics_data(lookback):
+    # Every stored fill within the lookback ("1D" ... "MAX"), or None before the first ingestion.
+    raw_fills_data = fills_store().read()
+    snapshot_caption("Fills store", fills_ingest)
+    if raw_fills_data is None:
+        return None
+    fills_data = fills_analytics_frame(raw_fills_data)
+    if LOOKBACK_DAYS[lookback] is not None:
+        since = datetime.utcnow() - timedelta(days=LOOKBACK_DAYS[lookback])
+        fills_data = fills_data[fills_data["Timestamp"] >= since]
+    st.caption("{:,}".format(len(fills_data)) + " fills of " + "{:,}".format(len(raw_fills_data)) + " stored")
+    return fills_data
 
 
 # @st.experimental_memo(ttl=15 * 60)
-def historical_table(address):
+@metrics.timed()
+def historical_table(addresses):
     try:
-        raw_historical_data = historical_fetch(address)
-    except:
-        st.write("No historical orders found for this wallet.")
-
-    historical_data = pd.DataFrame(raw_historical_data["metaData.orderHash"]).rename(
-        columns={"metaData.orderHash": "OrderHash"})
-    historical_data["OrderSalt"] = raw_historical_data["order.salt"]
-    historical_data["Created"] = pd.to_datetime(raw_historical_data["metaData.creation"], unit='s')
-    historical_data["Expiry"] = pd.to_datetime(raw_historical_data["order.expiry"], unit='s')
-    historical_data["Pair"] = raw_historical_data["name_maker"] + "/" + raw_historical_data["name_taker"]
-    historical_data["MakerAmt"] = raw_historical_data["order.makerAmount"]
-    historical_data["MakerToken"] = raw_historical_data["name_maker"]
-    historical_data["MakerAmtUSD"] = raw_historical_data["order.makerAmount"] * raw_historical_data[
-        "latest_price.usd_price_maker"]
-    historical_data["MakerAmtETH"] = raw_historical_data["order.makerAmount"] * raw_historical_data[
-        "latest_price.eth_price_maker"]
-    historical_data["TakerAmt"] = raw_historical_data["order.takerAmount"]
-    historical_data["TakerToken"] = raw_historical_data["name_taker"]
-    historical_data["TakerAmtUSD"] = raw_historical_data["order.takerAmount"] * raw_historical_data[
-        "latest_price.usd_price_taker"]
-    historical_data["TakerAmtETH"] = raw_historical_data["order.takerAmount"] * raw_historical_data[
-        "latest_price.eth_price_taker"]
-    historical_data["Price"] = raw_historical_data["order.takerAmount"] / raw_historical_data[
-        "order.makerAmount"]
-    historical_data["FillPct"] = raw_historical_data["metaData.filledAmount_takerToken"] / raw_historical_data[
-        "order.takerAmount"]
+        raw_historical_data = wallet_history(addresses)
+    except ValueError as error:
+        st.write(str(error) + ".")
+        st.stop()
+
+    historical_data = historical_frame(raw_historical_data)
+    historical_rows, historical_page = grid_query("historical", historical_data,
+                                                  ["Maker", "Pair", "MakerToken", "TakerToken"], ["OrderHash"],
+                                                  list(historical_data.columns), "Expiry")
 
     historical_options = GridOptionsBuilder.from_dataframe(
-        historical_data,
+        historical_page,
         enableRowGroup=True,
         enableValue=True,
         enablePivot=True)
@@ -196,9 +227,9 @@ def historical_table(address):
                                          precision=2)
     historical_options.configure_columns(["OrderHash", "OrderSalt", "MakerAmtETH", "TakerAmtETH"],
                                          hide=True)
+    historical_options.configure_columns(list(historical_page.columns), sortable=False, filter=False)
     historical_options.configure_side_bar()
     historical_options.configure_selection("single")
-    historical_options.configure_column("Expiry", sort='desc')
 
     jsFormatting = JsCode("""
             function(params) {
@@ -216,14 +247,15 @@ def historical_table(address):
             """)
     historical_options.configure_grid_options(getRowStyle=jsFormatting)
 
-    historical_grid = AgGrid(
-        historical_data,
-        enable_enterprise_modules=True,
-        gridOptions=historical_options.build(),
-        update_mode=GridUpdateMode.MODEL_CHANGED,
-        data_return_mode="FILTERED",
-        allow_unsafe_jscode=True)
+    with metrics.timer("historical_table.aggrid"):
+        historical_grid = AgGrid(
+            historical_page,
+            enable_enterprise_modules=True,
+            gridOptions=historical_options.build(),
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            allow_unsafe_jscode=True)
 
+    export_buttons("history", wallet=",".join(addresses))
     with st.expander("Legend"):
         st.markdown('<span style="background-color:Green;color:White">Complete fill (at least 98% filled)</span>',
                     unsafe_allow_html=True)
@@ -234,89 +266,62 @@ def historical_table(address):
         st.markdown("")
         st.markdown("*OrderHash*: order hash associated with order")
         st.markdown("*OrderSalt*: order salt associated with order")
+        st.markdown("**Maker**: wallet that placed the order")
         st.markdown("**Created**: creation date of order (in UTC)")
         st.markdown("**Expiry**: expiration date of order (in UTC)")
         st.markdown("**Pair**: Maker/Taker pair")
         st.markdown("**MakerAmt**: quantity of maker tokens")
         st.markdown("**MakerToken**: maker token of order")
-        st.markdown("**MakerAmtUSD**: estimated value of maker amount using current USD prices\
-                    (this does **not** show USD value at time of order)")
-        st.markdown("*MakerAmtETH*: estimated value of maker amount using current ETH prices\
-                    (this does **not** show ETH value at time of order)")
+        st.markdown("**MakerAmtUSD**: estimated value of maker amount using USD prices at the time the order was\
+                    created (current prices for tokens without price history)")
+        st.markdown("*MakerAmtETH*: estimated value of maker amount using ETH prices at the time the order was\
+                    created (current prices for tokens without price history)")
         st.markdown("**TakerAmt**, **TakerToken**, **TakerAmtUSD**, *TakerAmtETH*: same as Maker fields")
         st.markdown("**Price**: ratio of MakerAmt and TakerAmt")
         st.markdown("**FillPct**: fill percentage (between 0 and 1)")
 
-    return historical_grid
+    return grid_result(historical_grid, historical_rows, "OrderHash", historical_data)
 
 
-@st.experimental_memo(ttl=5 * 60)
-def order_fetch():
-    token_data = token_fetch()
-    known_addresses = known_address_fetch()
-
-    orders_json = requests.get("https://hidingbook.keeperdao.com/api/v1/orders?open=True").json()
-    order_data = pd.json_normalize(orders_json["orders"])
-
-    order_data["Name"] = order_data["order.maker"].map(known_addresses["Name"])
-    order_data.loc[pd.isna(order_data["Name"]), "Name"] = "App User"
-    order_data["OrderType"] = order_data["order.maker"].map(known_addresses["Type"])
-    order_data.loc[(order_data["OrderType"] != "Market Maker") & (
-            (order_data["order.expiry"] - order_data[
-                "metaData.creation"]) < 180), "OrderType"] = "AutoFill"
-    order_data.loc[(order_data["OrderType"] != "Market Maker") & (
-            (order_data["order.expiry"] - order_data[
-                "metaData.creation"]) >= 180), "OrderType"] = "Limit Order"
-
-    joined_data0 = pd.merge(order_data, token_data,
-                            left_on="order.makerToken",
-                            right_on="address")
-    joined_data = pd.merge(joined_data0, token_data,
-                           left_on="order.takerToken",
-                           right_on="address",
-                           suffixes=("_maker", "_taker"))
-    joined_data["order.makerAmount"] = joined_data["order.makerAmount"] / (10 ** joined_data["decimals_maker"])
-    joined_data["order.takerAmount"] = joined_data["order.takerAmount"] / (10 ** joined_data["decimals_taker"])
-    joined_data["metaData.filledAmount_takerToken"] = \
-        joined_data["metaData.filledAmount_takerToken"] / (10 ** joined_data["decimals_taker"])
-    joined_data["metaData.remainingFillableAmount_takerToken"] = \
-        joined_data["metaData.remainingFillableAmount_takerToken"] / (10 ** joined_data["decimals_taker"])
-
-    return joined_data
+def book_time_picker():
+    # Returns a past time to view the order book at (the end of the picked minute), or None for the live book.
+    span = book_archive().span()
+    if span is None or not st.checkbox("View a past order book", key="book_time_travel"):
+        return None
+    first, last = (datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+                   for timestamp in span)
+    if first >= last:
+        return None
+    as_of = st.slider("Order book as of (UTC)", min_value=first, max_value=last, value=last,
+                      step=timedelta(minutes=1), format="MM/DD/YY HH:mm")
+    return as_of.replace(tzinfo=timezone.utc).timestamp() + 59
 
 
 # @st.experimental_memo(ttl=5 * 60)
-def order_table():
-    raw_order_data = order_fetch()
-    order_data = pd.DataFrame(raw_order_data["order.maker"]).rename(columns={"order.maker": "Address"})
-    order_data["Name"] = raw_order_data["Name"]
-    order_data["OrderType"] = raw_order_data["OrderType"]
-    order_data["OrderHash"] = raw_order_data["metaData.orderHash"]
-    order_data["OrderSalt"] = raw_order_data["order.salt"]
-    order_data["Created"] = pd.to_datetime(raw_order_data["metaData.creation"], unit='s')
-    order_data["Expiry"] = pd.to_datetime(raw_order_data["order.expiry"], unit='s')
-    order_data["Pair"] = raw_order_data["name_maker"] + "/" + raw_order_data["name_taker"]
-    order_data["MakerAmt"] = raw_order_data["order.makerAmount"]
-    order_data["MakerToken"] = raw_order_data["name_maker"]
-    order_data["MakerAmtUSD"] = raw_order_data["order.makerAmount"] * raw_order_data["latest_price.usd_price_maker"]
-    order_data["MakerAmtETH"] = raw_order_data["order.makerAmount"] * raw_order_data["latest_price.eth_price_maker"]
-    order_data["TakerAmt"] = raw_order_data["order.takerAmount"]
-    order_data["TakerToken"] = raw_order_data["name_taker"]
-    order_data["TakerAmtUSD"] = raw_order_data["order.takerAmount"] * raw_order_data["latest_price.usd_price_taker"]
-    order_data["TakerAmtETH"] = raw_order_data["order.takerAmount"] * raw_order_data["latest_price.eth_price_taker"]
-    order_data["Price"] = raw_order_data["order.takerAmount"] / raw_order_data["order.makerAmount"]
-    order_data["UnfilledTakerAmt"] = raw_order_data["metaData.remainingFillableAmount_takerToken"]
-    order_data["UnfilledTakerUSD"] = order_data["UnfilledTakerAmt"] * raw_order_data["latest_price.usd_price_taker"]
-    order_data["UnfilledTakerETH"] = order_data["UnfilledTakerAmt"] * raw_order_data["latest_price.eth_price_taker"]
-    order_data["FillPct"] = raw_order_data["metaData.filledAmount_takerToken"] / raw_order_data["order.takerAmount"]
-    order_data["DiffUnfilledUSD"] = (order_data["MakerAmtUSD"] - order_data["TakerAmtUSD"]) * (
-            1 - order_data["FillPct"])
-    order_data["DiffUnfilledETH"] = (order_data["MakerAmtETH"] - order_data["TakerAmtETH"]) * (
-            1 - order_data["FillPct"])
-    order_data["DiffPct"] = order_data["MakerAmtUSD"] / order_data["TakerAmtUSD"] - 1
+@metrics.timed()
+def order_table(changes=None, as_of=None):
+    # as_of: a timestamp to show the archived book from instead of the live one.
+    if as_of is None:
+        raw_order_data = order_fetch()
+        snapshot_caption("Order book", order_fetch)
+    else:
+        raw_order_data = book_archive().book_at(as_of)
+        if raw_order_data is None:
+            st.write("No archived order book at this time.")
+            st.stop()
+        st.caption("Archived order book as of " +
+                   datetime.fromtimestamp(as_of, timezone.utc).strftime("%m/%d/%y %H:%M") + " UTC")
+    order_data = order_frame(raw_order_data)
+    filter_columns = ["Pair", "MakerToken", "TakerToken", "Name", "OrderType"]
+    if changes is not None:
+        order_data["Change"] = order_data["OrderHash"].map(
+            {change["OrderHash"]: change["kind"] for change in changes}).fillna("")
+        filter_columns.append("Change")
+    order_rows, order_page = grid_query("orders", order_data, filter_columns, ["OrderHash", "Address"],
+                                        list(order_data.columns), "Created")
 
     order_options = GridOptionsBuilder.from_dataframe(
-        order_data,
+        order_page,
         enableRowGroup=True,
         enableValue=True,
         enablePivot=True)
@@ -333,13 +338,21 @@ def order_table():
     order_options.configure_columns(["Address", "OrderType", "OrderHash", "OrderSalt", "MakerAmtETH", "TakerAmtETH",
                                      "UnfilledTakerETH", "DiffUnfilledETH"],
                                     hide=True)
+    order_options.configure_columns(list(order_page.columns), sortable=False, filter=False)
     order_options.configure_side_bar()
     order_options.configure_selection("single")
-    order_options.configure_column("Created", sort='desc')
 
     jsFormatting = JsCode("""
             function(params) {
-                if (params.data.FillPct >= 0.98) {
+                if (params.data.Change === 'added') {
+                    return {
+                        'backgroundColor': 'khaki'
+                    };
+                } else if (params.data.Change === 'filled' || params.data.Change === 'updated') {
+                    return {
+                        'backgroundColor': 'lightblue'
+                    };
+                } else if (params.data.FillPct >= 0.98) {
                     return {
                         'color': 'white',
                         'backgroundColor': 'green'
@@ -353,19 +366,28 @@ def order_table():
             """)
     order_options.configure_grid_options(getRowStyle=jsFormatting)
 
-    order_grid = AgGrid(
-        order_data,
-        enable_enterprise_modules=True,
-        gridOptions=order_options.build(),
-        update_mode=GridUpdateMode.MODEL_CHANGED,
-        data_return_mode="FILTERED",
-        allow_unsafe_jscode=True)
+    with metrics.timer("order_table.aggrid"):
+        order_grid = AgGrid(
+            order_page,
+            enable_enterprise_modules=True,
+            gridOptions=order_options.build(),
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            allow_unsafe_jscode=True)
 
+    if as_of is None:
+        export_buttons("orders")
+    else:
+        export_buttons("book", at=str(as_of))
     with st.expander("Legend"):
         st.markdown('<span style="background-color:Green;color:White">Complete fill (at least 98% filled)</span>',
                     unsafe_allow_html=True)
         st.markdown('<span style="background-color:LightGreen">Partial fill (<98% filled)</span>',
                     unsafe_allow_html=True)
+        if changes is not None:
+            st.markdown('<span style="background-color:Khaki">Added in the last ' +
+                        str(CHANGE_SECONDS // 60) + ' minutes (live updates)</span>', unsafe_allow_html=True)
+            st.markdown('<span style="background-color:LightBlue">Filled or updated in the last ' +
+                        str(CHANGE_SECONDS // 60) + ' minutes (live updates)</span>', unsafe_allow_html=True)
         st.write(
             "*Italics* denote columns hidden by default. These can be unhidden using the Columns tab on the right sidebar.")
         st.markdown("")
@@ -396,28 +418,36 @@ def order_table():
         st.markdown("**DiffPct**: percentage difference between limit price and current estimated market price\
                     (this does **not** represent prices at time of order)")
 
-    return order_grid, order_data
+    return grid_result(order_grid, order_rows, "OrderHash", order_data), order_data
+
 
+@metrics.timed()
+def prefetch_balances(order_data):
+    # Pass only the rows on screen (the grid's "page"); selecting one of them shows its maker's balances.
+    balance_service(st.secrets["etherscan_api_key"]).prefetch(balance_keys(order_data))
 
+
+@metrics.timed()
 def order_string(selected_order):
-    token_data = token_fetch()
+    registry = token_registry()
 
     wallet_address = selected_order["Address"]
-    etherscan_api_key = st.secrets["etherscan_api_key"]
 
     maker_token = selected_order["MakerToken"]
-    maker_contract = token_data.loc[token_data.name == maker_token, "address"].values[0]
-    maker_decimals = token_data.loc[token_data.name == maker_token, "decimals"].values[0]
+    maker_contract = registry.by_symbol(maker_token)["address"]
+    maker_decimals = registry.by_symbol(maker_token)["decimals"]
     maker_amt = "{:,.6f}".format(selected_order["MakerAmt"])
-    maker_api = tokens.Tokens(contract_address=maker_contract, api_key=etherscan_api_key)
-    maker_balance = "{:,.6f}".format(int(maker_api.get_token_balance(address=wallet_address)) / (10 ** maker_decimals))
 
     taker_token = selected_order["TakerToken"]
-    taker_contract = token_data.loc[token_data.name == taker_token, "address"].values[0]
-    taker_decimals = token_data.loc[token_data.name == taker_token, "decimals"].values[0]
+    taker_contract = registry.by_symbol(taker_token)["address"]
+    taker_decimals = registry.by_symbol(taker_token)["decimals"]
     taker_amt = "{:,.6f}".format(selected_order["TakerAmt"])
-    taker_api = tokens.Tokens(contract_address=taker_contract, api_key=etherscan_api_key)
-    taker_balance = "{:,.6f}".format(int(taker_api.get_token_balance(address=wallet_address)) / (10 ** taker_decimals))
+
+    balances = balance_service(st.secrets["etherscan_api_key"])
+    raw_maker_balance, raw_taker_balance = balances.balances([(maker_contract, wallet_address),
+                                                              (taker_contract, wallet_address)])
+    maker_balance = "{:,.6f}".format(raw_maker_balance / (10 ** maker_decimals))
+    taker_balance = "{:,.6f}".format(raw_taker_balance / (10 ** taker_decimals))
 
     price = "{:,.6f}".format(selected_order["Price"])
     fillPct = "{:,.0f}".format(selected_order["FillPct"] * 100)
@@ -430,51 +460,13 @@ def order_string(selected_order):
     st.write("Current " + taker_token + " balance: " + taker_balance)
 
 
-@st.experimental_memo(ttl=3 * 60)
-def fills_fetch(order_hash):
-    token_data = token_fetch()
-    keeper_data, _ = keeper_fetch()
-
-    fills_json = requests.get("https://api.rook.fi/api/v1/trade/orderHistory?orderHashes=" + order_hash).json()
-    fills_data = pd.json_normalize(fills_json["items"], record_path=["orderFills"])
-    if len(fills_data) > 0:
-        fills_data["keeper"] = fills_data["taker"].map(keeper_data["Name"])
-        joined_data0 = pd.merge(fills_data, token_data,
-                                left_on="makerToken",
-                                right_on="address")
-        joined_data = pd.merge(joined_data0, token_data,
-                               left_on="takerToken",
-                               right_on="address",
-                               suffixes=("_maker", "_taker"))
-        joined_data["makerTokenFilledAmount"] = joined_data["makerTokenFilledAmount"] / (
-                10 ** joined_data["decimals_maker"])
-        joined_data["takerTokenFilledAmount"] = joined_data["takerTokenFilledAmount"] / (
-                10 ** joined_data["decimals_taker"])
-    else:
-        joined_data = fills_data
-
-    return joined_data
-
-
 # @st.experimental_memo(ttl=3 * 60)
+@metrics.timed()
 def fills_table(order_hash):
     raw_fills_data = fills_fetch(order_hash)
 
     if len(raw_fills_data) > 0:
-        fills_data = pd.DataFrame(raw_fills_data["txHash"])
-        fills_data["Taker"] = raw_fills_data["keeper"]
-        fills_data["Timestamp"] = pd.to_datetime(raw_fills_data["timestamp"], unit='s')
-        fills_data["BlockNum"] = raw_fills_data["blockNumber"]
-        fills_data["MakerAmtFilled"] = raw_fills_data["makerTokenFilledAmount"]
-        fills_data["MakerToken"] = raw_fills_data["name_maker"]
-        fills_data["MakerAmtFilledUSD"] = raw_fills_data["makerTokenFilledAmount"] * raw_fills_data[
-            "latest_price.usd_price_maker"]
-        fills_data["TakerAmtFilled"] = raw_fills_data["takerTokenFilledAmount"]
-        fills_data["TakerToken"] = raw_fills_data["name_taker"]
-        fills_data["TakerAmtFilledUSD"] = raw_fills_data["takerTokenFilledAmount"] * raw_fills_data[
-            "latest_price.usd_price_taker"]
-        fills_data["GasUSD"] = raw_fills_data["gasUsed"] * raw_fills_data["gasPrice"] * raw_fills_data[
-            "ethPrice"] * 10 ** -9
+        fills_data = fills_frame(raw_fills_data)
 
         fills_options = GridOptionsBuilder.from_dataframe(
             fills_data,
@@ -494,13 +486,15 @@ def fills_table(order_hash):
         fills_options.configure_selection("single")
         fills_options.configure_column("Timestamp", sort='asc')
 
-        fills_grid = AgGrid(
-            fills_data,
-            enable_enterprise_modules=True,
-            gridOptions=fills_options.build(),
-            update_mode=GridUpdateMode.MODEL_CHANGED,
-            data_return_mode="FILTERED", )
+        with metrics.timer("fills_table.aggrid"):
+            fills_grid = AgGrid(
+                fills_data,
+                enable_enterprise_modules=True,
+                gridOptions=fills_options.build(),
+                update_mode=GridUpdateMode.MODEL_CHANGED,
+                data_return_mode="FILTERED", )
 
+        export_buttons("fills", order=order_hash)
         with st.expander("Legend"):
             st.write(
                 "*Italics* denote columns hidden by default. These can be unhidden using the Columns tab on the right sidebar.")
@@ -511,11 +505,11 @@ def fills_table(order_hash):
             st.markdown("*BlockNum*: block in which order was filled")
             st.markdown("**MakerAmtFilled**: quantity of maker tokens filled")
             st.markdown("**MakerToken**: maker token of order")
-            st.markdown("**MakerAmtFilledUSD**: estimated value of MakerAmtFilled using current USD prices\
-                        (this does **not** show USD value at time of fill)")
+            st.markdown("**MakerAmtFilledUSD**: estimated value of MakerAmtFilled using USD prices at time of fill\
+                        (current prices for tokens without price history)")
             st.markdown("**TakerToken**: taker token of order")
-            st.markdown("**TakerAmtFilledUSD**: estimated value of TakerAmtFilled using current USD prices\
-                        (this does **not** show USD value at time of fill)")
+            st.markdown("**TakerAmtFilledUSD**: estimated value of TakerAmtFilled using USD prices at time of fill\
+                        (current prices for tokens without price history)")
             st.markdown("**GasUSD**: gas spent in USD at time of fill")
     else:
         fills_grid = list()
@@ -523,53 +517,13 @@ def fills_table(order_hash):
     return fills_grid, fills_data
 
 
-@st.experimental_memo(ttl=3 * 60)
-def auctions_fetch(order_hash):
-    _, keeper_id = keeper_fetch()
-
-    auctions_json = requests.get("https://api.rook.fi/api/v1/coordinator/auctions?orderHashes=" + order_hash).json()
-    auctions_data = pd.json_normalize(auctions_json, record_path=["bidList"],
-                                      meta=["auctionCreationBlockNumber",
-                                            "auctionSettlementBlockNumber",
-                                            "auctionDeadlineBlockNumber"])
-    if len(auctions_data) > 0:
-        auctions_data["Keeper"] = auctions_data["keeperIdentityAddress"].map(keeper_id["Name"])
-
-    return auctions_data
-
-
 # @st.experimental_memo(ttl=3 * 60)
+@metrics.timed()
 def auctions_table(order_hash):
     raw_auctions_data = auctions_fetch(order_hash)
 
-    auction_outcomes_list = [
-        ["Unfilled", 0],
-        ["Exact fill", 1],
-        ["Filled above target amount", 2],
-        ["Filled within threshold", 3],
-        ["Filled below threshold", 4],
-        ["Filled outside valid range", 5]
-    ]
-    auction_outcomes = pd.DataFrame(auction_outcomes_list, columns=["Outcome", "Value"]).set_index("Value")
-
     if len(raw_auctions_data) > 0:
-        auctions_data = pd.DataFrame(raw_auctions_data["Keeper"])
-        auctions_data["CreationBlock"] = raw_auctions_data["auctionCreationBlockNumber"]
-        auctions_data["SettlementBlock"] = raw_auctions_data["auctionSettlementBlockNumber"]
-        auctions_data["DeadlineBlock"] = raw_auctions_data["auctionDeadlineBlockNumber"]
-        auctions_data["RookBidAmt"] = raw_auctions_data["rook_etherUnits"]
-        auctions_data["ScoreBid"] = raw_auctions_data["score_bid"]
-        auctions_data["ScoreRandom"] = raw_auctions_data["score_random"]
-        auctions_data["ScoreFillAmt"] = raw_auctions_data["score_targetFillAmount"]
-        auctions_data["ScoreReputation"] = raw_auctions_data["score_reputation"]
-        auctions_data["ScoreStake"] = raw_auctions_data["score_stake"]
-        auctions_data["Score"] = raw_auctions_data["score"]
-        auctions_data["Outcome"] = raw_auctions_data["outcome.outcomeValue"].map(auction_outcomes["Outcome"])
-        auctions_data["OutcomeReceipt"] = raw_auctions_data["outcome.outcomeReceipt"]
-        auctions_data["OutcomeTxHash"] = raw_auctions_data["outcome.txHash"]
-        auctions_data["BatchCnt"] = raw_auctions_data["outcome.batchCount"]
-        auctions_data["AuctionID"] = raw_auctions_data["auctionId"]
-        auctions_data["BidID"] = raw_auctions_data["bidId"]
+        auctions_data = auctions_frame(raw_auctions_data)
 
         auctions_options = GridOptionsBuilder.from_dataframe(
             auctions_data,
@@ -604,13 +558,15 @@ def auctions_table(order_hash):
                 """)
         auctions_options.configure_grid_options(getRowStyle=jsFormatting)
 
-        auctions_grid = AgGrid(
-            auctions_data,
-            enable_enterprise_modules=True,
-            gridOptions=auctions_options.build(),
-            update_mode=GridUpdateMode.MODEL_CHANGED,
-            data_return_mode="FILTERED",
-            allow_unsafe_jscode=True)
+        with metrics.timer("auctions_table.aggrid"):
+            auctions_grid = AgGrid(
+                auctions_data,
+                enable_enterprise_modules=True,
+                gridOptions=auctions_options.build(),
+                update_mode=GridUpdateMode.MODEL_CHANGED,
+                data_return_mode="FILTERED",
+                allow_unsafe_jscode=True)
+        export_buttons("auctions", order=order_hash)
         with st.expander("Legend"):
             st.markdown('<span style="background-color:Green;color:White">Filled auction</span>',
                         unsafe_allow_html=True)
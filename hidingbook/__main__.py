@@ -0,0 +1,3 @@
+from hidingbook.cli import main
+
+main()
@@ -0,0 +1,126 @@
+import bisect
+import difflib
+import re
+import threading
+
+import pandas as pd
+
+from hidingbook.token_registry import frame_fingerprint
+
+SUGGESTIONS = 10
+FUZZY_CUTOFF = 0.6
+ADDRESS_PATTERN = re.compile("0x[0-9a-fA-F]{40}")
+
+
+class AddressDirectory:
+    # Built once per known_address_fetch/keeper_fetch refresh. Address lookups are dictionary hits on lowercased
+    # addresses (the API and the hardcoded list disagree on case); names are indexed as sorted lowercased names
+    # and name words for bisect prefix search, with difflib as the fallback for typos.
+    def __init__(self, known_addresses, keeper_ids=None):
+        keeper_ids = keeper_ids if keeper_ids is not None else pd.DataFrame({"Name": []})
+        self.fingerprint = (frame_fingerprint(known_addresses), frame_fingerprint(keeper_ids))
+        self.names_by_address = {}
+        self.types_by_address = {}
+        self.addresses_by_name = {}
+        for address, name, address_type in zip(known_addresses.index, known_addresses["Name"],
+                                               known_addresses["Type"]):
+            if not isinstance(address, str) or not isinstance(name, str):
+                continue
+            self.names_by_address.setdefault(address.lower(), name)
+            self.types_by_address.setdefault(address.lower(), address_type)
+            addresses = self.addresses_by_name.setdefault(name, [])
+            if address not in addresses:
+                addresses.append(address)
+        self.names_by_identity = {identity.lower(): name for identity, name in zip(keeper_ids.index, keeper_ids["Name"])
+                                  if isinstance(identity, str) and isinstance(name, str)}
+
+        self.names_by_key = {}
+        for name in self.addresses_by_name:
+            self.names_by_key.setdefault(name.lower(), name)
+        self.keys = sorted(self.names_by_key)
+        self.words = sorted((word, key) for key in self.keys for word in key.split()[1:])
+        self.addresses = sorted(self.names_by_address)
+
+    def __len__(self):
+        return len(self.names_by_address)
+
+    def name(self, address):
+        return self.names_by_address.get(address.lower()) if isinstance(address, str) else None
+
+    def map_names(self, addresses):
+        # Vectorized over a Series of addresses; unknown addresses map to NaN.
+        return addresses.astype(str).str.lower().map(self.names_by_address)
+
+    def map_types(self, addresses):
+        return addresses.astype(str).str.lower().map(self.types_by_address)
+
+    def map_identities(self, identities):
+        return identities.astype(str).str.lower().map(self.names_by_identity)
+
+    def lookup(self, name):
+        # Addresses of a known name (case-insensitive), or an empty list.
+        name = self.names_by_key.get(name.strip().lower())
+        return list(self.addresses_by_name[name]) if name is not None else []
+
+    def resolve(self, text):
+        # A complete address is returned as typed, known or not; a name resolves to all of its addresses. Partial
+        # addresses resolve to nothing, so callers fall back to suggest() and its address prefix matches.
+        text = text.strip()
+        if text[:2] == "0x":
+            return [text] if ADDRESS_PATTERN.fullmatch(text) else []
+        return self.lookup(text)
+
+    def suggest(self, text, limit=SUGGESTIONS):
+        # Known names ranked exact match first, then names starting with the text, then names with a later word
+        # starting with it, or close spellings when nothing matches a prefix. Text starting with 0x suggests the
+        # names of known addresses with that prefix.
+        key = text.strip().lower()
+        if not key:
+            return []
+        if key[:2] == "0x":
+            start = bisect.bisect_left(self.addresses, key)
+            matches = []
+            for address in self.addresses[start:start + limit]:
+                if not address.startswith(key):
+                    break
+                matches.append(self.names_by_address[address])
+            return list(dict.fromkeys(matches))
+
+        ranked = []
+        if key in self.names_by_key:
+            ranked.append(key)
+        start = bisect.bisect_left(self.keys, key)
+        for name_key in self.keys[start:start + limit]:
+            if not name_key.startswith(key):
+                break
+            ranked.append(name_key)
+        start = bisect.bisect_left(self.words, (key,))
+        for word, name_key in self.words[start:start + limit]:
+            if not word.startswith(key):
+                break
+            ranked.append(name_key)
+        if not ranked:
+            ranked = difflib.get_close_matches(key, self.keys, n=limit, cutoff=FUZZY_CUTOFF)
+        return [self.names_by_key[name_key] for name_key in list(dict.fromkeys(ranked))[:limit]]
+
+
+_directory = None
+_directory_sources = (None, None)
+_directory_lock = threading.Lock()
+
+
+def directory_for(known_addresses, keeper_ids=None):
+    # Like token_registry.registry_for, but per frame: keeper_fetch is not warmed, so under a cache that hands out
+    # copies only the small keeper table is hashed again.
+    global _directory, _directory_sources
+    with _directory_lock:
+        directory, sources = _directory, _directory_sources
+    fingerprint = tuple(
+        directory.fingerprint[position] if directory is not None and frame is sources[position]
+        else frame_fingerprint(frame if frame is not None else pd.DataFrame({"Name": []}))
+        for position, frame in enumerate((known_addresses, keeper_ids)))
+    with _directory_lock:
+        if _directory is None or _directory.fingerprint != fingerprint:
+            _directory = AddressDirectory(known_addresses, keeper_ids)
+        _directory_sources = (known_addresses, keeper_ids)
+        return _directory
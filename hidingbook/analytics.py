@@ -0,0 +1,169 @@
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+
+from hidingbook import metrics
+from hidingbook.token_registry import frame_fingerprint
+
+SIZE_BINS = [-np.inf, 1000, 5000, 10000, 50000, 150000, np.inf]
+SIZE_LABELS = ["A. Tiny (<$1k)", "B. Small ($1k-$5k)", "C. Avg ($5k-$10k)", "D. Large ($10k-$50k)",
+               "E. Very Large ($50k-$150k)", "F. Huge (>$150k)"]
+EMPTY_GROUP = "Empty"
+CUBE_DIMENSIONS = ["MakerToken", "TakerToken", "OrderType"]
+CUBE_MEASURES = ["MakerAmtUSD", "TakerAmtUSD"]
+CUBE_CAPACITY = 8
+LATENCY_BINS = [-np.inf, 60, 5 * 60, 60 * 60, 24 * 60 * 60, 7 * 24 * 60 * 60, np.inf]
+LATENCY_LABELS = ["A. <1m", "B. 1m-5m", "C. 5m-1h", "D. 1h-1d", "E. 1d-1w", "F. >1w"]
+FILL_MEASURES = ["MakerAmtFilledUSD", "TakerAmtFilledUSD", "GasUSD"]
+
+
+def size_groups(amounts_usd):
+    # One binning pass; orders without a USD value are "Empty".
+    groups = pd.cut(pd.to_numeric(amounts_usd), SIZE_BINS, right=False, labels=SIZE_LABELS)
+    return groups.cat.add_categories([EMPTY_GROUP]).fillna(EMPTY_GROUP)
+
+
+class OrderCube:
+    # Order counts and maker/taker USD sums per (MakerToken, TakerToken, size group[, OrderType]) cell, built in
+    # one pass over an order or history frame. view(rows) re-aggregates any subset of the frame's rows (e.g. the
+    # grid's filtered rows, which keep the frame's index) with bincounts over the rows' cell ids, and the token,
+    # pair, size and order type breakdowns are all rolled up from the resulting cells.
+    def __init__(self, order_data):
+        dimensions = {column: pd.Categorical(order_data[column]) for column in CUBE_DIMENSIONS
+                      if column in order_data}
+        dimensions["SizeGroup"] = pd.Categorical(size_groups(order_data["TakerAmtUSD"]))
+        # Missing values get code 0, everything else shifts up by one.
+        codes = [dimension.codes.astype(np.int64) + 1 for dimension in dimensions.values()]
+        shape = [len(dimension.categories) + 1 for dimension in dimensions.values()]
+        cell_ids, self.cells = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+        cell_codes = np.unravel_index(cell_ids, shape)
+        self.dimensions = pd.DataFrame({
+            column: pd.Categorical.from_codes(cell_code - 1, categories=dimension.categories)
+            for (column, dimension), cell_code in zip(dimensions.items(), cell_codes)})
+        self.index = order_data.index
+        self.measures = {column: np.nan_to_num(pd.to_numeric(order_data[column]).to_numpy(dtype=float))
+                         for column in CUBE_MEASURES}
+
+    def view(self, rows=None):
+        positions = None if rows is None else self.index.get_indexer(rows.index)
+        cells = self.cells if positions is None else self.cells[positions]
+        counts = np.bincount(cells, minlength=len(self.dimensions))
+        view = self.dimensions.assign(Orders=counts)
+        for column, values in self.measures.items():
+            view[column] = np.bincount(cells, weights=values if positions is None else values[positions],
+                                       minlength=len(self.dimensions))
+        return view[counts > 0].reset_index(drop=True)
+
+
+class CubeCache:
+    # Cubes of the last few frames, keyed by content so every session and rerun over the same snapshot (and any
+    # filter of it) shares one cube.
+    def __init__(self, capacity=CUBE_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.cubes = collections.OrderedDict()
+
+    def cube(self, order_data):
+        key = frame_fingerprint(order_data[[column for column in CUBE_DIMENSIONS + CUBE_MEASURES
+                                            if column in order_data]])
+        with self._lock:
+            if key in self.cubes:
+                self.cubes.move_to_end(key)
+                metrics.registry.count("analytics_cube_requests", ("order_cube", "hit"))
+                return self.cubes[key]
+        metrics.registry.count("analytics_cube_requests", ("order_cube", "miss"))
+        cube = build_cube(order_data)
+        with self._lock:
+            self.cubes[key] = cube
+            while len(self.cubes) > self.capacity:
+                self.cubes.popitem(last=False)
+        return cube
+
+
+@metrics.timed()
+def build_cube(order_data):
+    return OrderCube(order_data)
+
+
+@metrics.timed()
+def size_breakdown(cube_view):
+    # Orders per size group, largest first, in the ("index", "size_group") layout the size pie chart reads.
+    counts = cube_view.groupby("SizeGroup", observed=True)["Orders"].sum()
+    counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+    return pd.DataFrame({"index": np.asarray(counts.index, dtype=object), "size_group": counts.to_numpy()})
+
+
+@metrics.timed()
+def type_breakdown(cube_view):
+    breakdown = cube_view.groupby("OrderType", observed=True)[["Orders"] + CUBE_MEASURES].sum()
+    return breakdown.reset_index().astype({"OrderType": object})
+
+
+@metrics.timed()
+def token_depth(order_data):
+    # USD offered per token as maker and asked per token as taker; tokens that only appear on the taker side are
+    # appended after the maker tokens with Maker = 0.
+    maker = order_data.groupby("MakerToken", observed=True)["MakerAmtUSD"].sum()
+    taker = order_data.groupby("TakerToken", observed=True)["TakerAmtUSD"].sum()
+
+    depth_data = pd.DataFrame({"Token": np.asarray(maker.index, dtype=object), "Maker": maker.values})
+    depth_data["Taker"] = depth_data["Token"].map(taker).fillna(0)
+    taker_only = taker[~taker.index.isin(maker.index)]
+    depth_data = pd.concat([depth_data, pd.DataFrame({"Token": np.asarray(taker_only.index, dtype=object), "Maker": 0,
+                                                      "Taker": taker_only.values})], ignore_index=True)
+
+    return depth_data
+
+
+@metrics.timed()
+def pair_depth(order_data):
+    # Maker USD per (MakerToken, TakerToken) folded onto a direction-normalized pair: the pair is named after
+    # the first direction in sorted order that has orders, "Maker" is the USD offered in that direction and
+    # "Taker" the USD offered in the opposite direction (0 when the book is one-sided).
+    sides = order_data.groupby(["MakerToken", "TakerToken"], observed=True, sort=False)["MakerAmtUSD"].sum()
+    sides = sides[sides != 0].reset_index()
+    maker_token = sides["MakerToken"].astype(str).to_numpy()
+    taker_token = sides["TakerToken"].astype(str).to_numpy()
+
+    inverse = maker_token > taker_token
+    sides["Key"] = np.where(inverse, taker_token + "/" + maker_token, maker_token + "/" + taker_token)
+    sides["Side"] = np.where(inverse, "Inverse", "Forward")
+    sides["MakerToken"] = maker_token
+    sides["TakerToken"] = taker_token
+
+    values = sides.pivot(index="Key", columns="Side", values="MakerAmtUSD")
+    values = values.reindex(columns=["Forward", "Inverse"])
+    primary = sides.sort_values("Side").drop_duplicates("Key").set_index("Key")
+
+    forward = primary["Side"] == "Forward"
+    pair_data = pd.DataFrame({
+        "Pair": primary["MakerToken"] + "/" + primary["TakerToken"],
+        "MakerToken": primary["MakerToken"],
+        "TakerToken": primary["TakerToken"],
+        "Maker": np.where(forward, values["Forward"].reindex(primary.index), values["Inverse"].reindex(primary.index)),
+        "Taker": np.where(forward, values["Inverse"].reindex(primary.index).fillna(0), 0),
+    })
+
+    return pair_data.sort_values(["MakerToken", "TakerToken"]).reset_index(drop=True)
+
+
+@metrics.timed()
+def fill_totals(fills_data, column):
+    # Fills, filled USD, gas USD and median fill latency per keeper or pair, by filled USD, largest first.
+    grouped = fills_data.groupby(column, observed=True)
+    totals = grouped[FILL_MEASURES].sum()
+    totals.insert(0, "Fills", grouped.size())
+    totals["GasPct"] = totals["GasUSD"] / totals["TakerAmtFilledUSD"] * 100
+    totals["MedianLatencySec"] = grouped["LatencySec"].median()
+    totals = totals.sort_values("TakerAmtFilledUSD", ascending=False, kind="stable")
+    return totals.reset_index().astype({column: object})
+
+
+@metrics.timed()
+def latency_breakdown(fills_data):
+    # Fills per latency group (fill time minus order creation).
+    groups = pd.cut(fills_data["LatencySec"], LATENCY_BINS, right=False, labels=LATENCY_LABELS)
+    counts = groups.value_counts(sort=False)
+    return pd.DataFrame({"Latency": np.asarray(counts.index, dtype=object), "Fills": counts.to_numpy()})
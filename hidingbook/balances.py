@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+BALANCE_TTL = 60
+ETHERSCAN_RATE = 5
+MAX_WORKERS = 4
+
+
+class RateLimiter:
+    # Token bucket shared by every caller using the same API key.
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, reserve=0):
+        # Background callers pass reserve=1 so a token is always left for interactive requests.
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1 + reserve:
+                    self.tokens -= 1
+                    return
+                wait = (1 + reserve - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def etherscan_balance_fetcher(api_key):
+    import etherscan.tokens as tokens
+
+    def fetch_balance(contract, wallet):
+        return int(tokens.Tokens(contract_address=contract, api_key=api_key).get_token_balance(address=wallet))
+
+    return fetch_balance
+
+
+class BalanceService:
+    # Raw token balances per (contract, wallet). fetch_balance(contract, wallet) -> int is injected, so a local
+    # stub can stand in for Etherscan.
+    def __init__(self, fetch_balance, ttl=BALANCE_TTL, rate=ETHERSCAN_RATE, max_workers=MAX_WORKERS):
+        self.fetch_balance = fetch_balance
+        self.ttl = ttl
+        self.limiter = RateLimiter(rate)
+        # Row selections get their own pool so they never queue behind a bulk prefetch.
+        self._interactive_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="balances")
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="balances-prefetch")
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._in_flight = {}
+
+    def _load(self, key, future, reserve):
+        try:
+            self.limiter.acquire(reserve)
+            balance = self.fetch_balance(*key)
+            with self._lock:
+                self._cache[key] = (time.time(), balance)
+            future.set_result(balance)
+        except Exception as error:
+            future.set_exception(error)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _future(self, contract, wallet, background):
+        key = (contract, wallet)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl:
+                future = Future()
+                future.set_result(entry[1])
+                return future
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            self._in_flight[key] = future
+        if background:
+            self._prefetch_pool.submit(self._load, key, future, 1)
+        else:
+            self._interactive_pool.submit(self._load, key, future, 0)
+        return future
+
+    def balances(self, keys):
+        futures = [self._future(contract, wallet, False) for contract, wallet in keys]
+        return [future.result() for future in futures]
+
+    def balance(self, contract, wallet):
+        return self.balances([(contract, wallet)])[0]
+
+    def prefetch(self, keys):
+        # Background requests get rate - 1 per second, so at most that many per TTL are prefetched: the cached
+        # balance of a key beyond that budget would expire before the last one had loaded.
+        budget = max(int((self.limiter.rate - 1) * self.ttl), 0)
+        return [self._future(contract, wallet, True) for contract, wallet in list(dict.fromkeys(keys))[:budget]]
@@ -0,0 +1,189 @@
+import bisect
+import collections
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from hidingbook import metrics
+from hidingbook.compact import concat_compact, hash_columns
+
+ARCHIVE_PATH = os.environ.get("HIDINGBOOK_ARCHIVE_PATH", os.path.join(".cache", "archive"))
+RETENTION = float(os.environ.get("HIDINGBOOK_ARCHIVE_DAYS", 7)) * 24 * 60 * 60
+PARTITION_FORMAT = "%Y%m%dT%H"
+CHECKPOINT = "checkpoint"
+DIFF = "diff"
+DIFFS = "diffs"
+ACTION_COLUMN = "ArchiveAction"
+TIME_COLUMN = "ArchiveTime"
+FILE_CAPACITY = 512
+
+
+def partition_name(timestamp):
+    return time.strftime(PARTITION_FORMAT, time.gmtime(timestamp))
+
+
+def parse_entry(file_name):
+    # "<kind>-<milliseconds>.parquet" -> (seconds, kind); anything else (e.g. an unfinished .tmp file) -> None.
+    stem, extension = os.path.splitext(file_name)
+    kind, _, milliseconds = stem.partition("-")
+    if extension != ".parquet" or kind not in (CHECKPOINT, DIFF, DIFFS) or not milliseconds.isdigit():
+        return None
+    return int(milliseconds) / 1000, kind
+
+
+class BookArchive:
+    # Archive of order book snapshots in hourly (UTC) partition directories. The first snapshot a process records
+    # in each partition is written whole as a checkpoint; every later one only as a diff: the rows the sync added
+    # or changed as "upsert" and the last state of the rows it removed as "removed". book_at(t) reads the latest
+    # checkpoint at or before t and folds in the diffs up to t, so no query reads more than an hour of diffs.
+    # When a new partition starts, partitions older than retention seconds are deleted and the diff files of
+    # finished partitions are merged into one file per partition. Files never change once written, so they are
+    # cached by path.
+    def __init__(self, path=ARCHIVE_PATH, key="metaData.orderHash", shared_categories=(), retention=RETENTION):
+        self.path = path
+        self.key = key
+        self.shared_categories = shared_categories
+        self.retention = retention
+        self._lock = threading.Lock()
+        self.partition = None
+        self.files = collections.OrderedDict()
+
+    def key_columns(self, frame):
+        columns = hash_columns(self.key)
+        return columns if all(column in frame for column in columns) else [self.key]
+
+    def row_keys(self, frame):
+        return pd.util.hash_pandas_object(frame[self.key_columns(frame)], index=False).to_numpy()
+
+    def partitions(self):
+        if not self.path or not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name)))
+
+    def entries(self, partition):
+        # (timestamp, kind, path) of a partition's files, oldest first.
+        directory = os.path.join(self.path, partition)
+        entries = []
+        for file_name in os.listdir(directory):
+            entry = parse_entry(file_name)
+            if entry is not None:
+                entries.append(entry + (os.path.join(directory, file_name),))
+        return sorted(entries)
+
+    def span(self):
+        # Timestamps of the first and last archived snapshots, or None for an empty archive.
+        partitions = self.partitions()
+        first = next((entries[0][0] for entries in map(self.entries, partitions) if entries), None)
+        last = next((entries[-1][0] for entries in map(self.entries, reversed(partitions)) if entries), None)
+        return None if first is None else (first, last)
+
+    def write(self, timestamp, kind, frame, partition=None):
+        directory = os.path.join(self.path, partition or partition_name(timestamp))
+        os.makedirs(directory, exist_ok=True)
+        file = os.path.join(directory, "%s-%d.parquet" % (kind, round(timestamp * 1000)))
+        frame.to_parquet(file + ".tmp", index=False)
+        os.replace(file + ".tmp", file)
+
+    @metrics.timed("book_archive.record")
+    def record(self, frame, changes=None, timestamp=None):
+        # Archives one snapshot of the book (the compact order_fetch frame). changes is the (upserted, removed)
+        # rows that turned the previously recorded snapshot into frame, or None when frame is not a diff of it.
+        # Returns the kind of file written, or None when nothing changed or archiving is disabled (empty path).
+        if not self.path:
+            return None
+        timestamp = time.time() if timestamp is None else timestamp
+        partition = partition_name(timestamp)
+        with self._lock:
+            if changes is None or self.partition != partition:
+                if self.partition != partition:
+                    self.maintain(timestamp)
+                kind, archived = CHECKPOINT, frame
+            else:
+                upserted, removed = changes
+                if len(upserted) == 0 and len(removed) == 0:
+                    return None
+                kind = DIFF
+                archived = concat_compact([part.assign(**{ACTION_COLUMN: action})
+                                           for part, action in ((upserted, "upsert"), (removed, "removed"))
+                                           if len(part) > 0], self.shared_categories)
+            # A failed write leaves a gap the next diff cannot cover, so the next snapshot is a checkpoint again.
+            self.partition = None
+            self.write(timestamp, kind, archived)
+            self.partition = partition
+            return kind
+
+    def maintain(self, timestamp):
+        # Drops partitions past retention and merges the diffs of finished partitions into one "diffs" file with
+        # each row's snapshot time in TIME_COLUMN. Runs once per partition, under the lock.
+        current = partition_name(timestamp)
+        expired = partition_name(timestamp - self.retention) if self.retention else ""
+        for partition in self.partitions():
+            if partition < expired:
+                self.forget(os.path.join(self.path, partition))
+                shutil.rmtree(os.path.join(self.path, partition), ignore_errors=True)
+            elif partition < current:
+                diffs = [(entry_time, file) for entry_time, kind, file in self.entries(partition) if kind == DIFF]
+                if diffs:
+                    merged = concat_compact([pd.read_parquet(file).assign(**{TIME_COLUMN: entry_time})
+                                             for entry_time, file in diffs], self.shared_categories)
+                    self.write(diffs[0][0], DIFFS, merged, partition)
+                    for _, file in diffs:
+                        self.forget(file)
+                        os.remove(file)
+
+    def forget(self, path):
+        for file in [file for file in self.files if file == path or file.startswith(path + os.sep)]:
+            del self.files[file]
+
+    def read(self, file):
+        with self._lock:
+            if file in self.files:
+                self.files.move_to_end(file)
+                return self.files[file]
+        frame = pd.read_parquet(file)
+        with self._lock:
+            self.files[file] = frame
+            while len(self.files) > FILE_CAPACITY:
+                self.files.popitem(last=False)
+        return frame
+
+    @metrics.timed("book_archive.book_at")
+    def book_at(self, timestamp):
+        # The book as of the last snapshot at or before timestamp, in the layout it was recorded in, or None when
+        # nothing was archived before timestamp.
+        partitions = self.partitions()
+        position = bisect.bisect_right(partitions, partition_name(timestamp))
+        for partition in reversed(partitions[:position]):
+            entries = [entry for entry in self.entries(partition) if entry[0] <= timestamp]
+            checkpoints = [index for index, (_, kind, _) in enumerate(entries) if kind == CHECKPOINT]
+            if checkpoints:
+                break
+        else:
+            return None
+
+        checkpoint_time, _, checkpoint_file = entries[checkpoints[-1]]
+        checkpoint = self.read(checkpoint_file)
+        # Plain diffs after the checkpoint, and the rows of merged diffs recorded between the checkpoint and
+        # timestamp (a merged file is dated by its first diff, so it can start before the checkpoint).
+        parts = []
+        for entry_time, kind, file in entries:
+            if kind == DIFF and entry_time > checkpoint_time:
+                parts.append(self.read(file).assign(**{TIME_COLUMN: entry_time}))
+            elif kind == DIFFS:
+                merged = self.read(file)
+                parts.append(merged[(merged[TIME_COLUMN] > checkpoint_time) & (merged[TIME_COLUMN] <= timestamp)])
+        parts = [part for part in parts if len(part) > 0]
+        if not parts:
+            return checkpoint
+        # Only the last action per order counts; checkpoint rows touched by any diff are replaced or dropped.
+        diffs = concat_compact(parts, self.shared_categories)
+        diffs = diffs.iloc[np.argsort(diffs[TIME_COLUMN].to_numpy(), kind="stable")]
+        diff_keys = self.row_keys(diffs)
+        last = diffs[~pd.Series(diff_keys).duplicated(keep="last").to_numpy()]
+        kept = checkpoint[~np.isin(self.row_keys(checkpoint), diff_keys)]
+        upserts = last[last[ACTION_COLUMN] == "upsert"].drop(columns=[ACTION_COLUMN, TIME_COLUMN])
+        return concat_compact([kept, upserts], self.shared_categories)
@@ -0,0 +1,80 @@
+import functools
+import threading
+import time
+
+from hidingbook import metrics
+
+
+class NullCache:
+    def wrap(self, func, ttl):
+        return func
+
+
+class MemoryCache:
+    # Process-wide TTL cache keyed on the call arguments; the default backend for scripts, notebooks and the CLI.
+    def wrap(self, func, ttl):
+        entries = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+            if entry is not None and (ttl is None or time.time() - entry[0] <= ttl):
+                return entry[1]
+            value = func(*args, **kwargs)
+            with lock:
+                entries[key] = (time.time(), value)
+            return value
+
+        wrapper.clear = entries.clear
+        return wrapper
+
+
+_backend = MemoryCache()
+_thread_backend = threading.local()
+# Shared by worker threads that run outside a frontend's request context (see set_thread_backend).
+background = MemoryCache()
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def set_thread_backend(backend):
+    # Overrides the backend for the calling thread only, e.g. for background workers that run outside a
+    # frontend's request context.
+    _thread_backend.backend = backend
+
+
+def get_backend():
+    return getattr(_thread_backend, "backend", None) or _backend
+
+
+def cached(ttl=None):
+    # The backend is resolved on each call, so a frontend can install its own (e.g. Streamlit's memo) after the
+    # core modules have been imported. Backends only call through to the function on a miss, which is how
+    # hits and misses are counted without backend support.
+    def decorator(func):
+        wrapped = {}
+
+        @functools.wraps(func)
+        def miss(*args, **kwargs):
+            metrics.registry.count("cache_requests", (func.__name__, "miss"))
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            backend = get_backend()
+            cached_func = wrapped.get(id(backend))
+            if cached_func is None:
+                cached_func = wrapped.setdefault(id(backend), backend.wrap(miss, ttl))
+            metrics.registry.count("cache_requests", (func.__name__, "call"))
+            return cached_func(*args, **kwargs)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
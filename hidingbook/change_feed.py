@@ -0,0 +1,46 @@
+import collections
+import itertools
+import json
+import threading
+import time
+
+from hidingbook import local_server
+
+CAPACITY = 10000
+KINDS = ("added", "filled", "updated", "expired", "removed")
+
+
+class ChangeFeed:
+    # Bounded log of open order book changes, written by whichever thread syncs the book and read by every
+    # session. Events are numbered; a subscriber keeps the last number it has seen as its cursor and only reads
+    # the events after it, never the book itself.
+    def __init__(self, capacity=CAPACITY):
+        self._lock = threading.Lock()
+        self.events = collections.deque(maxlen=capacity)
+        self.sequence = 0
+
+    def publish(self, changes):
+        # changes: dicts with at least "kind" and "OrderHash"; each gets a sequence number and a timestamp.
+        now = time.time()
+        with self._lock:
+            for change in changes:
+                self.sequence += 1
+                self.events.append(dict(change, seq=self.sequence, time=now))
+
+    def since(self, cursor):
+        # Events after the cursor (oldest first) and the new cursor. A cursor older than the retained events gets
+        # everything still held.
+        with self._lock:
+            count = min(max(self.sequence - cursor, 0), len(self.events))
+            return list(itertools.islice(self.events, len(self.events) - count, None)), self.sequence
+
+
+feed = ChangeFeed()
+
+
+def changes_route(params):
+    events, cursor = feed.since(int(params.get("since", 0)))
+    return "application/json", json.dumps({"cursor": cursor, "events": events}).encode()
+
+
+local_server.route("/changes", changes_route)
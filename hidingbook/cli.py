@@ -0,0 +1,122 @@
+import argparse
+import sys
+
+FORMATS = ("csv", "json", "parquet", "arrow")
+
+
+def write_frame(frame, output, output_format):
+    if output_format == "json":
+        frame.to_json(output or sys.stdout, orient="records", lines=True, date_format="iso")
+        return
+
+    # CSV, Parquet and Arrow are written in chunks as they are encoded, to the output file or binary stdout.
+    from hidingbook import export
+
+    try:
+        if output is None:
+            export.write(frame, sys.stdout.buffer, output_format)
+        else:
+            with open(output, "wb") as output_file:
+                export.write(frame, output_file, output_format)
+    except ValueError as error:
+        raise SystemExit(str(error))
+
+
+def resolve_wallet(wallet):
+    from hidingbook import fetchers
+
+    directory = fetchers.address_directory()
+    matches = directory.resolve(wallet)
+    if len(matches) == 0:
+        suggestions = directory.suggest(wallet)
+        raise SystemExit("Unknown wallet: " + wallet +
+                         ("\nDid you mean: " + ", ".join(suggestions) if suggestions else ""))
+    return matches[0]
+
+
+def open_book(args):
+    from hidingbook import fetchers
+
+    return fetchers.order_frame(fetchers.order_fetch())
+
+
+def wallet_history(args):
+    from hidingbook import fetchers
+
+    return fetchers.historical_frame(fetchers.historical_fetch(resolve_wallet(args.wallet), page_size=args.page_size))
+
+
+def order_fills(args):
+    from hidingbook import export
+
+    return export.fills_dataset({"order": args.order_hash})
+
+
+def order_auctions(args):
+    from hidingbook import export
+
+    return export.auctions_dataset({"order": args.order_hash})
+
+
+def ingest(args):
+    import pandas as pd
+
+    from hidingbook import fetchers
+
+    report = fetchers.history_store().ingest(fetchers.known_address_fetch().index, fetchers.historical_fetch.uncached,
+                                             max_age=args.max_age)
+    return pd.DataFrame(report, columns=["Address", "rows", "seconds", "error"])
+
+
+def ingest_fills(args):
+    import pandas as pd
+
+    from hidingbook import fetchers
+
+    report = fetchers.fills_store().ingest(fetchers.filled_orders(), fetchers.fills_batch_fetch)
+    return pd.DataFrame(report, columns=["orders", "fills", "errors", "seconds"])
+
+
+def parser():
+    arg_parser = argparse.ArgumentParser(prog="hidingbook", description="Dump Hiding Book data without Streamlit")
+    arg_parser.add_argument("--format", choices=FORMATS, default="csv")
+    arg_parser.add_argument("--output", "-o", help="output file (defaults to stdout)")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    open_book_parser = commands.add_parser("open-book", help="dump all open Hiding Book orders")
+    open_book_parser.set_defaults(handler=open_book)
+
+    history_parser = commands.add_parser("history", help="dump the order history of a wallet")
+    history_parser.add_argument("wallet", help="wallet address or known name (e.g. a market maker)")
+    history_parser.add_argument("--page-size", type=int, default=100)
+    history_parser.set_defaults(handler=wallet_history)
+
+    fills_parser = commands.add_parser("fills", help="dump the fills of an order")
+    fills_parser.add_argument("order_hash")
+    fills_parser.set_defaults(handler=order_fills)
+
+    auctions_parser = commands.add_parser("auctions", help="dump the auctions of an order")
+    auctions_parser.add_argument("order_hash")
+    auctions_parser.set_defaults(handler=order_auctions)
+
+    ingest_parser = commands.add_parser("ingest", help="store the order histories of all known wallets locally "
+                                                       "(HIDINGBOOK_HISTORY_PATH) and dump a per-wallet report")
+    ingest_parser.add_argument("--max-age", type=float, default=0,
+                               help="skip wallets stored less than this many seconds ago")
+    ingest_parser.set_defaults(handler=ingest)
+
+    ingest_fills_parser = commands.add_parser("ingest-fills", help="store the fills of every filled order in the "
+                                                                   "history store and the open book locally "
+                                                                   "(HIDINGBOOK_FILLS_PATH) and dump a report")
+    ingest_fills_parser.set_defaults(handler=ingest_fills)
+
+    return arg_parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    write_frame(args.handler(args), args.output, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+HASH_WORDS = 4
+
+
+def hash_columns(column):
+    return ["%s[%d]" % (column, word) for word in range(HASH_WORDS)]
+
+
+def pack_hashes(frame, column):
+    # 32-byte hex hashes ("0x" + 64 hex digits) as four big-endian uint64 columns: 32 bytes per row instead of a
+    # ~115 byte Python string plus its pointer. Pandas has no fixed-width bytes dtype, hence the word columns.
+    # Anything that is not a well-formed hash leaves the column as it is.
+    hashes = frame[column]
+    try:
+        raw = [bytes.fromhex(order_hash[2:]) for order_hash in hashes]
+    except (TypeError, ValueError):
+        return frame
+    if any(len(order_hash) != 8 * HASH_WORDS for order_hash in raw):
+        return frame
+    words = np.frombuffer(b"".join(raw), dtype=">u8").reshape(-1, HASH_WORDS).astype(np.uint64)
+    packed = frame.drop(columns=[column])
+    for word, word_column in enumerate(hash_columns(column)):
+        packed[word_column] = words[:, word]
+    return packed
+
+
+def hash_strings(frame, column):
+    if column in frame:
+        return frame[column]
+    digits = frame[hash_columns(column)].to_numpy(dtype=np.uint64).astype(">u8").tobytes().hex()
+    width = 16 * HASH_WORDS
+    return pd.Series(["0x" + digits[pos:pos + width] for pos in range(0, len(digits), width)], index=frame.index,
+                     dtype=object)
+
+
+def categorize(frame, columns):
+    for column in columns:
+        frame[column] = frame[column].astype("category")
+    return frame
+
+
+def categorize_shared(frame, columns):
+    # Maker and taker sides share one category set, so the two columns can be compared and combined by code.
+    categories = pd.Index(pd.unique(pd.concat([frame[column] for column in columns]).dropna())).sort_values()
+    for column in columns:
+        frame[column] = pd.Categorical(frame[column], categories=categories)
+    return frame
+
+
+def downcast_integers(frame, columns):
+    for column in columns:
+        if pd.api.types.is_integer_dtype(frame[column]):
+            frame[column] = pd.to_numeric(frame[column], downcast="integer")
+    return frame
+
+
+def join_categories(left, right, separator="/"):
+    # left + separator + right as a categorical, built from the distinct (left, right) code pairs rather than by
+    # concatenating a string per row. Rows missing either side are missing in the result.
+    left = pd.Categorical(left)
+    right = pd.Categorical(right)
+    right_count = max(len(right.categories), 1)
+    codes = left.codes.astype(np.int64) * right_count + right.codes
+    missing = (left.codes < 0) | (right.codes < 0)
+    unique_codes, inverse = np.unique(codes[~missing], return_inverse=True)
+    labels = [str(left.categories[code // right_count]) + separator + str(right.categories[code % right_count])
+              for code in unique_codes]
+    result_codes = np.full(len(codes), -1, dtype=np.int64)
+    result_codes[~missing] = inverse
+    return pd.Categorical.from_codes(result_codes, categories=pd.Index(labels, dtype=object))
+
+
+def compact(frame, columns, categories=(), shared_categories=(), hashes=(), integers=()):
+    # Keep only the listed columns, then swap repetitive strings for categoricals, hashes for packed words and
+    # small integers for narrower types. Floats stay 64-bit: amounts are displayed to six decimal places.
+    frame = frame[[column for column in columns if column in frame]].copy()
+    categorize(frame, [column for column in categories if column in frame])
+    for shared_columns in shared_categories:
+        if all(column in frame for column in shared_columns):
+            categorize_shared(frame, shared_columns)
+    downcast_integers(frame, [column for column in integers if column in frame])
+    for column in hashes:
+        if column in frame:
+            frame = pack_hashes(frame, column)
+    return frame
+
+
+def concat_compact(frames, shared_categories=(), ignore_index=True):
+    # pd.concat turns categoricals with differing category sets into object columns, so those are unioned (and
+    # shared pairs re-shared) after concatenating.
+    combined = pd.concat(frames, ignore_index=ignore_index)
+    for column in combined.columns:
+        parts = [frame[column] for frame in frames if column in frame]
+        if len(parts) == len(frames) and all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            combined[column] = pd.api.types.union_categoricals(parts, ignore_order=True)
+    for shared_columns in shared_categories:
+        if all(column in combined for column in shared_columns):
+            categorize_shared(combined, shared_columns)
+    return combined
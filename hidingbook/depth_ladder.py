@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from hidingbook import metrics
+
+LADDER_COLUMNS = ["Pair", "Side", "Price", "Amount", "DepthAmt", "DepthUSD", "Orders"]
+FINGERPRINT_COLUMNS = ["OrderHash", "MakerAmt", "TakerAmt", "MakerAmtUSD", "UnfilledTakerAmt", "UnfilledTakerUSD"]
+
+
+def side_levels(prices, amounts, values, best_first):
+    # One level per distinct price, best first (lowest ask, highest bid): price, base amount, USD value and order
+    # count at that price, and the cumulative amount and value available at that price or better.
+    levels, inverse = np.unique(prices, return_inverse=True)
+    amount = np.bincount(inverse, weights=amounts, minlength=len(levels))
+    value = np.bincount(inverse, weights=values, minlength=len(levels))
+    orders = np.bincount(inverse, minlength=len(levels))
+    if not best_first:
+        levels, amount, value, orders = levels[::-1], amount[::-1], value[::-1], orders[::-1]
+    return levels, amount, np.cumsum(amount), np.cumsum(value), orders
+
+
+def order_sides(order_data, base_token):
+    # Per row, with prices in quote per base token: whether the order is an ask (it sells the base token), its
+    # limit price, and the remaining base amount and USD value. Asks offer the remaining maker amount at Price;
+    # bids ask for the remaining taker amount at the inverse of Price.
+    remaining = (order_data["UnfilledTakerAmt"] / order_data["TakerAmt"]).to_numpy(dtype=float)
+    is_ask = order_data["MakerToken"].astype(str).to_numpy() == base_token
+    price = order_data["Price"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore"):
+        price = np.where(is_ask, price, 1 / price)
+    amount = np.where(is_ask, order_data["MakerAmt"].to_numpy(dtype=float) * remaining,
+                      order_data["UnfilledTakerAmt"].to_numpy(dtype=float))
+    value = np.where(is_ask, order_data["MakerAmtUSD"].to_numpy(dtype=float) * remaining,
+                     order_data["UnfilledTakerUSD"].to_numpy(dtype=float))
+    valid = np.isfinite(price) & (price > 0) & np.isfinite(amount) & np.isfinite(value)
+    return is_ask & valid, ~is_ask & valid, price, amount, value
+
+
+def normalized_pairs(order_data):
+    # Each row's pair with its tokens in sorted order (base/quote), and the base token.
+    maker_token = order_data["MakerToken"].astype(str).to_numpy()
+    taker_token = order_data["TakerToken"].astype(str).to_numpy()
+    forward = maker_token <= taker_token
+    base_token = np.where(forward, maker_token, taker_token)
+    pairs = pd.Series(np.char.add(np.char.add(base_token, "/"), np.where(forward, taker_token, maker_token)))
+    return pairs, base_token
+
+
+def pair_ladder(pair, asks, bids, price, amount, value):
+    ask_levels = side_levels(price[asks], amount[asks], value[asks], best_first=True)
+    bid_levels = side_levels(price[bids], amount[bids], value[bids], best_first=False)
+    sides = np.repeat(["Ask", "Bid"], [len(ask_levels[0]), len(bid_levels[0])])
+    columns = [np.concatenate([ask_column, bid_column]) for ask_column, bid_column in zip(ask_levels, bid_levels)]
+    return pd.DataFrame(dict(zip(LADDER_COLUMNS, [pair, sides] + columns)))
+
+
+class DepthLadders:
+    # Cumulative price-level depth per direction-normalized pair (tokens in sorted order, base/quote), built
+    # from order_frame rows. Each update fingerprints every pair's rows in one hash pass and only re-sorts and
+    # re-accumulates the pairs whose orders or fill amounts changed since the previous update.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ladders = {}
+
+    @metrics.timed("depth_ladder.update")
+    def update(self, order_data):
+        pairs, base_token = normalized_pairs(order_data)
+        hashes = pd.util.hash_pandas_object(order_data[FINGERPRINT_COLUMNS], index=False).to_numpy()
+        asks, bids, price, amount, value = order_sides(order_data, base_token)
+
+        with self._lock:
+            ladders = {}
+            for pair, positions in pairs.groupby(pairs, sort=True).indices.items():
+                fingerprint = (len(positions), int(hashes[positions].sum()))
+                cached = self.ladders.get(pair)
+                if cached is not None and cached[0] == fingerprint:
+                    metrics.registry.count("depth_ladder_requests", ("pair_ladder", "hit"))
+                    ladders[pair] = cached
+                else:
+                    metrics.registry.count("depth_ladder_requests", ("pair_ladder", "miss"))
+                    ladders[pair] = (fingerprint, pair_ladder(pair, asks[positions], bids[positions],
+                                                              price[positions], amount[positions], value[positions]))
+            self.ladders = ladders
+            return {pair: ladder for pair, (_, ladder) in ladders.items()}
@@ -0,0 +1,106 @@
+import functools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from hidingbook import metrics
+
+CACHE_PATH = os.environ.get("HIDINGBOOK_CACHE_PATH", os.path.join(".cache", "hidingbook.sqlite"))
+
+
+class DiskCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, stored_at REAL, value BLOB)")
+        return self._connection
+
+    def get(self, key):
+        with self._lock:
+            row = self._connect().execute("SELECT stored_at, value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], pickle.loads(row[1])
+        except Exception:
+            return None
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            connection = self._connect()
+            connection.execute("INSERT OR REPLACE INTO entries (key, stored_at, value) VALUES (?, ?, ?)",
+                               (key, time.time(), blob))
+            connection.commit()
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM entries")
+            connection.commit()
+
+
+_cache = DiskCache()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def configure(path):
+    global _cache
+    _cache = DiskCache(path)
+
+
+def _refresh(key, func, args, kwargs):
+    try:
+        _cache.set(key, func(*args, **kwargs))
+    except Exception:
+        # Keep serving the stale entry; the next call past the TTL tries again.
+        pass
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def disk_cached(ttl, max_stale=30 * 24 * 60 * 60):
+    # Persist results across restarts. Fresh entries are served from disk; entries older than ttl (but younger
+    # than max_stale) are still served immediately while a background thread refreshes them.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = "%s.%s:%r:%r" % (func.__module__, func.__qualname__, args, sorted(kwargs.items()))
+            entry = _cache.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                age = time.time() - stored_at
+                if age <= ttl:
+                    metrics.registry.count("disk_cache_requests", (func.__name__, "hit"))
+                    return value
+                if age <= max_stale:
+                    metrics.registry.count("disk_cache_requests", (func.__name__, "stale"))
+                    with _refreshing_lock:
+                        start_refresh = key not in _refreshing
+                        _refreshing.add(key)
+                    if start_refresh:
+                        threading.Thread(target=_refresh, args=(key, func, args, kwargs), daemon=True).start()
+                    return value
+
+            metrics.registry.count("disk_cache_requests", (func.__name__, "miss"))
+            value = func(*args, **kwargs)
+            _cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
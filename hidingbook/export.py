@@ -0,0 +1,149 @@
+from hidingbook import cache, fetchers, local_server, metrics
+
+FORMATS = ("csv", "parquet", "arrow")
+CONTENT_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+                 "arrow": "application/vnd.apache.arrow.stream"}
+CHUNK_ROWS = 10000
+
+
+class ChunkSink:
+    # Write target for the pyarrow writers: collects the bytes written since the last drain, so each chunk can be
+    # sent on as soon as it is encoded.
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def frame_chunks(frame, chunk_rows=CHUNK_ROWS):
+    # Row slices of the frame; iloc slices share the frame's blocks instead of copying them.
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def csv_chunks(frame, chunk_rows=CHUNK_ROWS):
+    for position, chunk in enumerate(frame_chunks(frame, chunk_rows)):
+        yield chunk.to_csv(index=False, header=position == 0).encode()
+
+
+def arrow_schema(frame):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("pyarrow is required for Parquet and Arrow exports")
+    return pa, pa.Schema.from_pandas(frame, preserve_index=False)
+
+
+def arrow_chunks(frame, chunk_rows=CHUNK_ROWS):
+    # An Arrow IPC stream with one record batch per chunk. The schema is inferred from the whole frame up front,
+    # so a missing pyarrow or an unsupported column fails before anything is sent.
+    pa, schema = arrow_schema(frame)
+
+    def chunks():
+        sink = ChunkSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for chunk in frame_chunks(frame, chunk_rows):
+                writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain()
+        yield sink.drain()
+
+    return chunks()
+
+
+def parquet_chunks(frame, chunk_rows=CHUNK_ROWS):
+    # A Parquet file with one row group per chunk; the footer follows the last row group.
+    pa, schema = arrow_schema(frame)
+    import pyarrow.parquet as pq
+
+    def chunks():
+        sink = ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in frame_chunks(frame, chunk_rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain()
+        yield sink.drain()
+
+    return chunks()
+
+
+ENCODERS = {"csv": csv_chunks, "parquet": parquet_chunks, "arrow": arrow_chunks}
+
+
+def stream(frame, output_format, chunk_rows=CHUNK_ROWS):
+    if output_format not in ENCODERS:
+        raise ValueError("Unknown export format: " + output_format)
+    return ENCODERS[output_format](frame, chunk_rows)
+
+
+def write(frame, output, output_format, chunk_rows=CHUNK_ROWS):
+    for chunk in stream(frame, output_format, chunk_rows):
+        output.write(chunk)
+
+
+def orders_dataset(params):
+    return fetchers.order_frame(fetchers.order_fetch())
+
+
+def book_dataset(params):
+    # at: Unix timestamp; the archived book as of then.
+    raw_order_data = fetchers.book_archive().book_at(float(params["at"]))
+    if raw_order_data is None:
+        raise ValueError("No archived order book at " + params["at"])
+    return fetchers.order_frame(raw_order_data)
+
+
+def history_dataset(params):
+    # wallet: comma-separated addresses and/or known names.
+    directory = fetchers.address_directory()
+    addresses = [address for wallet in params["wallet"].split(",") for address in directory.resolve(wallet)]
+    return fetchers.historical_frame(fetchers.wallet_history(list(dict.fromkeys(addresses))))
+
+
+def fills_dataset(params):
+    raw_fills_data = fetchers.fills_fetch(params["order"])
+    if len(raw_fills_data) == 0:
+        raise ValueError("No fills for order " + params["order"])
+    return fetchers.fills_frame(raw_fills_data)
+
+
+def auctions_dataset(params):
+    raw_auctions_data = fetchers.auctions_fetch(params["order"])
+    if len(raw_auctions_data) == 0:
+        raise ValueError("No auctions for order " + params["order"])
+    return fetchers.auctions_frame(raw_auctions_data)
+
+
+DATASETS = {"orders": orders_dataset, "book": book_dataset, "history": history_dataset, "fills": fills_dataset,
+            "auctions": auctions_dataset}
+
+
+def export_route(params):
+    # /export?dataset=orders|book|history|fills|auctions&format=csv|parquet|arrow, plus at= for book, wallet=
+    # for history and order= for fills and auctions. Requests run on the local server's threads, outside any
+    # frontend's cache.
+    cache.set_thread_backend(cache.background)
+    dataset = params.get("dataset", "orders")
+    output_format = params.get("format", "csv")
+    if dataset not in DATASETS or output_format not in ENCODERS:
+        raise ValueError("Unknown dataset or format: " + dataset + ", " + output_format)
+    with metrics.timer("export." + dataset):
+        frame = DATASETS[dataset](params)
+    metrics.registry.count("export_requests", (dataset, output_format))
+    return CONTENT_TYPES[output_format], stream(frame, output_format)
+
+
+local_server.route("/export", export_route)
@@ -0,0 +1,487 @@
+import os
+import threading
+
+import pandas as pd
+
+from hidingbook import change_feed
+from hidingbook import http_client
+from hidingbook import metrics
+from hidingbook import pagination
+from hidingbook import valuation
+from hidingbook.address_directory import directory_for
+from hidingbook.analytics import CubeCache
+from hidingbook.balances import BalanceService, etherscan_balance_fetcher
+from hidingbook.book_archive import ARCHIVE_PATH, BookArchive
+from hidingbook.cache import cached
+from hidingbook.compact import compact, concat_compact, hash_strings, join_categories
+from hidingbook.depth_ladder import DepthLadders
+from hidingbook.disk_cache import disk_cached
+from hidingbook.fills_store import FillsStore, STORE_PATH as FILLS_PATH
+from hidingbook.history_store import HistoryStore, STORE_PATH as HISTORY_PATH
+from hidingbook.order_book import OrderBook, ORDER_AMOUNTS
+from hidingbook.order_details import OrderDetailPrefetcher
+from hidingbook.price_store import PriceStore
+from hidingbook.refresher import warmed
+from hidingbook.token_registry import registry_for
+
+ADDRESS_TTL = 24 * 60 * 60
+TOKEN_TTL = 7 * 24 * 60 * 60
+HISTORY_INTERVAL = 6 * 60 * 60
+FILLS_INTERVAL = 60 * 60
+INGEST_FLAG = "HIDINGBOOK_INGEST"
+ORDER_COLUMNS = ["order.maker", "Name", "OrderType", "metaData.orderHash", "order.salt", "metaData.creation",
+                 "order.expiry", "order.makerToken", "order.takerToken", "name_maker", "name_taker",
+                 "order.makerAmount", "order.takerAmount", "latest_price.usd_price_maker",
+                 "latest_price.eth_price_maker", "latest_price.usd_price_taker", "latest_price.eth_price_taker",
+                 "metaData.filledAmount_takerToken", "metaData.remainingFillableAmount_takerToken"]
+HISTORY_COLUMNS = ORDER_COLUMNS + ["creation_price.usd_price_maker", "creation_price.eth_price_maker",
+                                   "creation_price.usd_price_taker", "creation_price.eth_price_taker"]
+CATEGORY_COLUMNS = ["order.maker", "Name", "OrderType"]
+TOKEN_COLUMNS = (("name_maker", "name_taker"), ("order.makerToken", "order.takerToken"))
+TIMESTAMP_COLUMNS = ["metaData.creation", "order.expiry"]
+FILL_AMOUNTS = {"makerTokenFilledAmount": "maker", "takerTokenFilledAmount": "taker"}
+FILL_COLUMNS = ["metaData.orderHash", "metaData.creation", "txHash", "taker", "keeper", "timestamp", "blockNumber",
+                "makerToken", "takerToken", "name_maker", "name_taker", "makerTokenFilledAmount",
+                "takerTokenFilledAmount", "fill_price.usd_price_maker", "fill_price.usd_price_taker", "gasUsed",
+                "gasPrice", "ethPrice"]
+FILL_TOKEN_COLUMNS = (("name_maker", "name_taker"), ("makerToken", "takerToken"))
+AUCTION_OUTCOMES = pd.DataFrame([
+    ["Unfilled", 0],
+    ["Exact fill", 1],
+    ["Filled above target amount", 2],
+    ["Filled within threshold", 3],
+    ["Filled below threshold", 4],
+    ["Filled outside valid range", 5]
+], columns=["Outcome", "Value"]).set_index("Value")
+
+_singletons = {}
+_singletons_lock = threading.RLock()
+_storage_root = None
+
+
+def singleton(name, factory):
+    with _singletons_lock:
+        if name not in _singletons:
+            _singletons[name] = factory()
+        return _singletons[name]
+
+
+def reset_singletons():
+    with _singletons_lock:
+        _singletons.clear()
+
+
+def configure_storage(root):
+    # Puts the on-disk stores in directories under root, e.g. a temporary directory for benchmarks, from the next
+    # reset_singletons() on. None restores their configured paths.
+    global _storage_root
+    _storage_root = root
+
+
+def storage_path(name, default):
+    return default if _storage_root is None else os.path.join(_storage_root, name)
+
+
+@metrics.timed()
+@cached(ttl=60 * 60)
+@disk_cached(ttl=ADDRESS_TTL)
+def market_maker_fetch(start_date=None, end_date=None):
+    mm_params = {"startTimestamp": start_date, "endTimestamp ": end_date}
+    mm_json = http_client.get_json(http_client.ROOK_API + "/api/v1/coordinator/marketMakers", params=mm_params)
+    mm_data = pd.json_normalize(mm_json, meta=["name"], record_path=["makerAddresses"])
+
+    mm_data = mm_data.rename(columns={"name": "Name", mm_data.columns[0]: "Address"}).set_index("Address")
+    mm_data["Type"] = "Market Maker"
+
+    return mm_data
+
+
+@metrics.timed()
+@cached(ttl=60 * 60)
+@disk_cached(ttl=ADDRESS_TTL)
+def keeper_fetch(start_date=None, end_date=None):
+    keeper_params = {"startTimestamp": start_date, "endTimestamp ": end_date}
+    keeper_json = http_client.get_json(http_client.ROOK_API + "/api/v1/coordinator/keepers",
+                                      params=keeper_params)
+    keeper_data = pd.json_normalize(keeper_json, meta=["name"], record_path=["activeTakerAddresses"])
+    keeper_data = keeper_data.rename(columns={"name": "Name", keeper_data.columns[0]: "Address"}).set_index("Address")
+    keeper_data["Type"] = "Keeper"
+
+    raw_keeper_id = pd.json_normalize(keeper_json)
+    keeper_id = pd.DataFrame(raw_keeper_id.loc[:, ["name", "identityAddress"]]).rename(
+        columns={"name": "Name", "identityAddress": "IdentityAddress"}). \
+        set_index("IdentityAddress")
+
+    return keeper_data, keeper_id
+
+
+@metrics.timed()
+@warmed(interval=60 * 60)
+@cached(ttl=60 * 60)
+@disk_cached(ttl=ADDRESS_TTL)
+def known_address_fetch(start_date=None, end_date=None):
+    mm_data = market_maker_fetch(start_date, end_date)
+    keeper_data, _ = keeper_fetch(start_date, end_date)
+    other_list = [
+        ["Gigawhale", "0x6555e1cc97d3cba6eaddebbcd7ca51d75771e0b8"],
+        ["hello.eth", "0x759a159d78342340ebacffb027c05910c093f430"],
+        ["abuse.eth", "0x49a2dcc237a65cc1f412ed47e0594602f6141936"],
+        ["3 Arrows Capital", "0xd80856b01feed61e954cd365861bd87e5d39f2e7"],
+        ["Amber", "0x5d45594917a30182ca6cfd946b969c1341127c2d"],
+        ["one-decade on OpenSea", "0x3765ea1a0d34d9c7991181824d2410fd8612f474"],
+        ["Harley87 on OpenSea", "0xf6853c77a2452576eae5af424975a101ffc47308"],
+        ["Polychain", "0xf286bb612e219916f8e9ba7200bf09ed218890cb"],
+        ["Maven11", "0xfacf46ea1e0ad2681103e726f64cfc503e9da5d6"],
+        ["Rook Test Wallet", "0x4f72f7Ca2E909BC64022466B46f12Ab328055500"]
+    ]
+    other_data = pd.DataFrame(other_list, columns=["Name", "Address"]).set_index("Address")
+    other_data["Type"] = "User"
+
+    known_data = pd.concat([mm_data, keeper_data, other_data])
+
+    return known_data
+
+
+@metrics.timed()
+@warmed(interval=60 * 60)
+@cached(ttl=60 * 60)
+@disk_cached(ttl=TOKEN_TTL)
+def token_fetch():
+    token_json = http_client.get_json(http_client.ROOK_API + "/api/v1/trade/tokens")
+    token_data = pd.json_normalize(token_json)
+    token_data = token_data.drop(columns=["active", "latest_price.timestamp",
+                                          "trade_info.makerTokenTradeCount", "trade_info.takerTokenTradeCount",
+                                          "trade_info.mostRecentTradeTimestamp"])
+
+    return token_data
+
+
+def compact_orders(order_data, columns=ORDER_COLUMNS):
+    # Cached order frames carry only the columns order_frame/historical_frame read, in compact dtypes.
+    return compact(order_data, columns, categories=CATEGORY_COLUMNS, shared_categories=TOKEN_COLUMNS,
+                   hashes=["metaData.orderHash"], integers=TIMESTAMP_COLUMNS)
+
+
+def token_registry():
+    return registry_for(token_fetch())
+
+
+def address_directory():
+    return directory_for(known_address_fetch(), keeper_fetch()[1])
+
+
+def price_store():
+    return singleton("price_store", PriceStore)
+
+
+@metrics.timed()
+def price_fetch(token_symbol, lookback_str):
+    coingecko_id = token_registry().by_symbol(token_symbol.upper())["coingecko_id"]
+    return price_store().view(coingecko_id, lookback_str)
+
+
+@metrics.timed()
+@cached(ttl=15 * 60)
+def historical_fetch(address, page_size=pagination.PAGE_SIZE):
+    registry = token_registry()
+
+    def historical_page(offset, limit):
+        historical_params = {"makerAddresses": address, "limit": limit, "offset": offset}
+        return http_client.get_json(http_client.ROOK_API + "/api/v1/trade/orderHistory", params=historical_params)
+
+    raw_pages = pagination.fetch_pages(historical_page, page_size=page_size)
+    with metrics.timer("historical_fetch.json_normalize"):
+        historical_data = pd.json_normalize(raw_pages)
+
+    joined_data = registry.join(historical_data, "order.makerToken", "order.takerToken", ORDER_AMOUNTS)
+    valued_data = valuation.value_orders(joined_data, registry, price_store(), "metaData.creation",
+                                         "order.makerToken", "order.takerToken", "creation_price")
+
+    return compact_orders(valued_data, HISTORY_COLUMNS)
+
+
+def history_store():
+    return singleton("history_store", lambda: HistoryStore(storage_path("history", HISTORY_PATH)))
+
+
+@metrics.timed()
+@warmed(interval=HISTORY_INTERVAL, opt_in=INGEST_FLAG)
+def history_ingest():
+    # Bulk ingestion of every known market maker, keeper and named wallet into the history store.
+    return history_store().ingest(known_address_fetch().index, historical_fetch.uncached, max_age=HISTORY_INTERVAL)
+
+
+@metrics.timed()
+def wallet_history(addresses):
+    # Histories of one or more wallets as one compact frame: stored wallets are read from the history store,
+    # the rest are fetched live. Wallets without any history are left out.
+    frames = []
+    for address in addresses:
+        frame = history_store().read(address)
+        if frame is None:
+            try:
+                frame = historical_fetch(address)
+            except KeyError:
+                continue
+        frames.append(frame)
+    if not frames:
+        raise ValueError("No historical orders for " + ", ".join(addresses))
+    return concat_compact(frames, shared_categories=TOKEN_COLUMNS)
+
+
+@metrics.timed()
+def historical_frame(raw_historical_data):
+    historical_data = pd.DataFrame({"OrderHash": hash_strings(raw_historical_data, "metaData.orderHash")})
+    historical_data["OrderSalt"] = raw_historical_data["order.salt"]
+    historical_data["Maker"] = raw_historical_data["order.maker"]
+    historical_data["Created"] = pd.to_datetime(raw_historical_data["metaData.creation"], unit='s')
+    historical_data["Expiry"] = pd.to_datetime(raw_historical_data["order.expiry"], unit='s')
+    historical_data["Pair"] = join_categories(raw_historical_data["name_maker"], raw_historical_data["name_taker"])
+    historical_data["MakerAmt"] = raw_historical_data["order.makerAmount"]
+    historical_data["MakerToken"] = raw_historical_data["name_maker"]
+    historical_data["MakerAmtUSD"] = raw_historical_data["order.makerAmount"] * raw_historical_data[
+        "creation_price.usd_price_maker"]
+    historical_data["MakerAmtETH"] = raw_historical_data["order.makerAmount"] * raw_historical_data[
+        "creation_price.eth_price_maker"]
+    historical_data["TakerAmt"] = raw_historical_data["order.takerAmount"]
+    historical_data["TakerToken"] = raw_historical_data["name_taker"]
+    historical_data["TakerAmtUSD"] = raw_historical_data["order.takerAmount"] * raw_historical_data[
+        "creation_price.usd_price_taker"]
+    historical_data["TakerAmtETH"] = raw_historical_data["order.takerAmount"] * raw_historical_data[
+        "creation_price.eth_price_taker"]
+    historical_data["Price"] = raw_historical_data["order.takerAmount"] / raw_historical_data[
+        "order.makerAmount"]
+    historical_data["FillPct"] = raw_historical_data["metaData.filledAmount_takerToken"] / raw_historical_data[
+        "order.takerAmount"]
+
+    return historical_data
+
+
+def book_archive():
+    return singleton("book_archive", lambda: BookArchive(storage_path("archive", ARCHIVE_PATH),
+                                                         shared_categories=TOKEN_COLUMNS))
+
+
+def order_book():
+    return singleton("order_book", lambda: OrderBook(compact=compact_orders, shared_categories=TOKEN_COLUMNS,
+                                                     feed=change_feed.feed, archive=book_archive()))
+
+
+@metrics.timed()
+@warmed(interval=30)
+@cached(ttl=30)
+def order_fetch():
+    registry = token_registry()
+    directory = address_directory()
+
+    orders_json = http_client.get_json(http_client.HIDINGBOOK_API + "/api/v1/orders", params={"open": "True"})
+
+    return order_book().sync(orders_json["orders"], registry, directory)
+
+
+@metrics.timed()
+def order_frame(raw_order_data):
+    order_data = pd.DataFrame(raw_order_data["order.maker"]).rename(columns={"order.maker": "Address"})
+    order_data["Name"] = raw_order_data["Name"]
+    order_data["OrderType"] = raw_order_data["OrderType"]
+    order_data["OrderHash"] = hash_strings(raw_order_data, "metaData.orderHash")
+    order_data["OrderSalt"] = raw_order_data["order.salt"]
+    order_data["Created"] = pd.to_datetime(raw_order_data["metaData.creation"], unit='s')
+    order_data["Expiry"] = pd.to_datetime(raw_order_data["order.expiry"], unit='s')
+    order_data["Pair"] = join_categories(raw_order_data["name_maker"], raw_order_data["name_taker"])
+    order_data["MakerAmt"] = raw_order_data["order.makerAmount"]
+    order_data["MakerToken"] = raw_order_data["name_maker"]
+    order_data["MakerAmtUSD"] = raw_order_data["order.makerAmount"] * raw_order_data["latest_price.usd_price_maker"]
+    order_data["MakerAmtETH"] = raw_order_data["order.makerAmount"] * raw_order_data["latest_price.eth_price_maker"]
+    order_data["TakerAmt"] = raw_order_data["order.takerAmount"]
+    order_data["TakerToken"] = raw_order_data["name_taker"]
+    order_data["TakerAmtUSD"] = raw_order_data["order.takerAmount"] * raw_order_data["latest_price.usd_price_taker"]
+    order_data["TakerAmtETH"] = raw_order_data["order.takerAmount"] * raw_order_data["latest_price.eth_price_taker"]
+    order_data["Price"] = raw_order_data["order.takerAmount"] / raw_order_data["order.makerAmount"]
+    order_data["UnfilledTakerAmt"] = raw_order_data["metaData.remainingFillableAmount_takerToken"]
+    order_data["UnfilledTakerUSD"] = order_data["UnfilledTakerAmt"] * raw_order_data["latest_price.usd_price_taker"]
+    order_data["UnfilledTakerETH"] = order_data["UnfilledTakerAmt"] * raw_order_data["latest_price.eth_price_taker"]
+    order_data["FillPct"] = raw_order_data["metaData.filledAmount_takerToken"] / raw_order_data["order.takerAmount"]
+    order_data["DiffUnfilledUSD"] = (order_data["MakerAmtUSD"] - order_data["TakerAmtUSD"]) * (
+            1 - order_data["FillPct"])
+    order_data["DiffUnfilledETH"] = (order_data["MakerAmtETH"] - order_data["TakerAmtETH"]) * (
+            1 - order_data["FillPct"])
+    order_data["DiffPct"] = order_data["MakerAmtUSD"] / order_data["TakerAmtUSD"] - 1
+
+    return order_data
+
+
+def order_cubes():
+    return singleton("order_cubes", CubeCache)
+
+
+def depth_ladders():
+    return singleton("depth_ladders", DepthLadders)
+
+
+def balance_service(api_key=None):
+    return singleton("balance_service", lambda: BalanceService(
+        etherscan_balance_fetcher(api_key or os.environ.get("ETHERSCAN_API_KEY"))))
+
+
+def balance_keys(order_data):
+    registry = token_registry()
+    keys = []
+    for token_column in ("MakerToken", "TakerToken"):
+        contracts = order_data[token_column].map(registry.address_by_symbol)
+        keys.extend((contract, wallet) for contract, wallet in zip(contracts, order_data["Address"])
+                    if isinstance(contract, str))
+    return keys
+
+
+def fills_request(order_hashes):
+    fills_params = {"orderHashes": ",".join(order_hashes), "limit": len(order_hashes)}
+    return http_client.get_json(http_client.ROOK_API + "/api/v1/trade/orderHistory", params=fills_params)
+
+
+def auctions_request(order_hashes):
+    auctions_params = {"orderHashes": ",".join(order_hashes)}
+    return http_client.get_json(http_client.ROOK_API + "/api/v1/coordinator/auctions", params=auctions_params)
+
+
+def order_details():
+    return singleton("order_details", lambda: OrderDetailPrefetcher(auctions_request, fills_request))
+
+
+def prefetch_order_details(order_hashes):
+    order_details().prefetch(list(order_hashes))
+
+
+def value_fills(fills_data):
+    registry = token_registry()
+    fills_data["keeper"] = address_directory().map_names(fills_data["taker"])
+    joined_data = registry.join(fills_data, "makerToken", "takerToken", FILL_AMOUNTS)
+    return valuation.value_orders(joined_data, registry, price_store(), "timestamp", "makerToken", "takerToken",
+                                  "fill_price")
+
+
+@metrics.timed()
+@cached(ttl=3 * 60)
+def fills_fetch(order_hash):
+    fills_data = pd.json_normalize(order_details().fills(order_hash), record_path=["orderFills"])
+    if len(fills_data) > 0:
+        joined_data = value_fills(fills_data)
+    else:
+        joined_data = fills_data
+
+    return joined_data
+
+
+def fills_store():
+    return singleton("fills_store", lambda: FillsStore(storage_path("fills", FILLS_PATH),
+                                                      shared_categories=FILL_TOKEN_COLUMNS))
+
+
+@metrics.timed()
+def fills_batch_fetch(order_hashes):
+    # The fills of a chunk of orders, valued and compacted for the fills store, with the order's hash and
+    # creation time on every fill.
+    items = fills_request(order_hashes)["items"]
+    fills_data = pd.json_normalize(items, record_path=["orderFills"],
+                                   meta=[["metaData", "orderHash"], ["metaData", "creation"]], errors="ignore")
+    if len(fills_data) == 0:
+        return None
+    return compact(value_fills(fills_data), FILL_COLUMNS, categories=["taker", "keeper"],
+                   shared_categories=FILL_TOKEN_COLUMNS, hashes=["metaData.orderHash", "txHash"],
+                   integers=["timestamp", "metaData.creation", "blockNumber"])
+
+
+def filled_orders():
+    # Every order with a fill in the history store or the open book; orders no longer open are final.
+    frames = [history_store().read(address) for address in history_store().wallets()]
+    open_data = order_fetch()
+    hashes = pd.concat([hash_strings(frame[frame["metaData.filledAmount_takerToken"] > 0], "metaData.orderHash")
+                        for frame in frames + [open_data] if frame is not None])
+    orders = pd.DataFrame({"OrderHash": hashes.drop_duplicates().to_numpy()})
+    orders["Final"] = ~orders["OrderHash"].isin(hash_strings(open_data, "metaData.orderHash"))
+    return orders
+
+
+@metrics.timed()
+@warmed(interval=FILLS_INTERVAL, opt_in=INGEST_FLAG)
+def fills_ingest():
+    # Bulk ingestion of the fills of every filled order into the fills store.
+    return fills_store().ingest(filled_orders(), fills_batch_fetch)
+
+
+@metrics.timed()
+def fills_frame(raw_fills_data):
+    fills_data = pd.DataFrame(raw_fills_data["txHash"])
+    fills_data["Taker"] = raw_fills_data["keeper"]
+    fills_data["Timestamp"] = pd.to_datetime(raw_fills_data["timestamp"], unit='s')
+    fills_data["BlockNum"] = raw_fills_data["blockNumber"]
+    fills_data["MakerAmtFilled"] = raw_fills_data["makerTokenFilledAmount"]
+    fills_data["MakerToken"] = raw_fills_data["name_maker"]
+    fills_data["MakerAmtFilledUSD"] = raw_fills_data["makerTokenFilledAmount"] * raw_fills_data[
+        "fill_price.usd_price_maker"]
+    fills_data["TakerAmtFilled"] = raw_fills_data["takerTokenFilledAmount"]
+    fills_data["TakerToken"] = raw_fills_data["name_taker"]
+    fills_data["TakerAmtFilledUSD"] = raw_fills_data["takerTokenFilledAmount"] * raw_fills_data[
+        "fill_price.usd_price_taker"]
+    fills_data["GasUSD"] = raw_fills_data["gasUsed"] * raw_fills_data["gasPrice"] * raw_fills_data[
+        "ethPrice"] * 10 ** -9
+
+    return fills_data
+
+
+@metrics.timed()
+def fills_analytics_frame(raw_fills_data):
+    # One row per stored fill with what the fills analytics group by and sum; fills by unknown takers are
+    # attributed to the taker address.
+    keepers = raw_fills_data["keeper"].astype(object).fillna(raw_fills_data["taker"].astype(object))
+    fills_data = pd.DataFrame({"Keeper": pd.Categorical(keepers)})
+    fills_data["Pair"] = join_categories(raw_fills_data["name_maker"], raw_fills_data["name_taker"])
+    fills_data["Timestamp"] = pd.to_datetime(raw_fills_data["timestamp"], unit='s')
+    fills_data["MakerAmtFilledUSD"] = raw_fills_data["makerTokenFilledAmount"] * raw_fills_data[
+        "fill_price.usd_price_maker"]
+    fills_data["TakerAmtFilledUSD"] = raw_fills_data["takerTokenFilledAmount"] * raw_fills_data[
+        "fill_price.usd_price_taker"]
+    fills_data["GasUSD"] = raw_fills_data["gasUsed"] * raw_fills_data["gasPrice"] * raw_fills_data[
+        "ethPrice"] * 10 ** -9
+    fills_data["LatencySec"] = raw_fills_data["timestamp"].astype(float) - raw_fills_data[
+        "metaData.creation"].astype(float)
+
+    return fills_data
+
+
+@metrics.timed()
+@cached(ttl=3 * 60)
+def auctions_fetch(order_hash):
+    directory = address_directory()
+
+    auctions_data = pd.json_normalize(order_details().auctions(order_hash), record_path=["bidList"],
+                                      meta=["auctionCreationBlockNumber",
+                                            "auctionSettlementBlockNumber",
+                                            "auctionDeadlineBlockNumber"])
+    if len(auctions_data) > 0:
+        auctions_data["Keeper"] = directory.map_identities(auctions_data["keeperIdentityAddress"])
+
+    return auctions_data
+
+
+@metrics.timed()
+def auctions_frame(raw_auctions_data):
+    auctions_data = pd.DataFrame(raw_auctions_data["Keeper"])
+    auctions_data["CreationBlock"] = raw_auctions_data["auctionCreationBlockNumber"]
+    auctions_data["SettlementBlock"] = raw_auctions_data["auctionSettlementBlockNumber"]
+    auctions_data["DeadlineBlock"] = raw_auctions_data["auctionDeadlineBlockNumber"]
+    auctions_data["RookBidAmt"] = raw_auctions_data["rook_etherUnits"]
+    auctions_data["ScoreBid"] = raw_auctions_data["score_bid"]
+    auctions_data["ScoreRandom"] = raw_auctions_data["score_random"]
+    auctions_data["ScoreFillAmt"] = raw_auctions_data["score_targetFillAmount"]
+    auctions_data["ScoreReputation"] = raw_auctions_data["score_reputation"]
+    auctions_data["ScoreStake"] = raw_auctions_data["score_stake"]
+    auctions_data["Score"] = raw_auctions_data["score"]
+    auctions_data["Outcome"] = raw_auctions_data["outcome.outcomeValue"].map(AUCTION_OUTCOMES["Outcome"])
+    auctions_data["OutcomeReceipt"] = raw_auctions_data["outcome.outcomeReceipt"]
+    auctions_data["OutcomeTxHash"] = raw_auctions_data["outcome.txHash"]
+    auctions_data["BatchCnt"] = raw_auctions_data["outcome.batchCount"]
+    auctions_data["AuctionID"] = raw_auctions_data["auctionId"]
+    auctions_data["BidID"] = raw_auctions_data["bidId"]
+
+    return auctions_data
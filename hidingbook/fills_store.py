@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hidingbook import cache, metrics
+from hidingbook.compact import concat_compact, hash_columns, hash_strings
+from hidingbook.order_details import CHUNK_SIZE, chunked
+
+STORE_PATH = os.environ.get("HIDINGBOOK_FILLS_PATH", os.path.join(".cache", "fills"))
+MAX_WORKERS = 4
+BATCH_LIMIT = 32
+ORDER_HASH = "metaData.orderHash"
+BATCH = "batch"
+FINAL = "final"
+
+logger = logging.getLogger(__name__)
+
+
+class FillsStore:
+    # Compact fills of many orders in append-only Parquet batches, one per ingestion run. An order's fills are
+    # re-fetched until it has left the open book (Final); the newest batch holding an order supersedes older
+    # ones, and once there are more than BATCH_LIMIT batches they are merged into one. Final orders that came
+    # back without fills are recorded by hash in "final" marker files, merged the same way, so they are not
+    # requested again either.
+    def __init__(self, path=STORE_PATH, shared_categories=()):
+        self.path = path
+        self.shared_categories = shared_categories
+        self._lock = threading.Lock()
+        self._frame = (None, None)
+
+    def files(self, kind):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith(kind + "-") and name.endswith(".parquet"))
+
+    def batches(self):
+        return self.files(BATCH)
+
+    def stored_at(self):
+        batches = self.batches()
+        return os.path.getmtime(batches[-1]) if batches else None
+
+    def write(self, frame, kind=BATCH):
+        os.makedirs(self.path, exist_ok=True)
+        stamp = round(time.time() * 1000)
+        while os.path.exists(os.path.join(self.path, "%s-%d.parquet" % (kind, stamp))):
+            stamp += 1
+        file = os.path.join(self.path, "%s-%d.parquet" % (kind, stamp))
+        frame.to_parquet(file + ".tmp", index=False)
+        os.replace(file + ".tmp", file)
+
+    def order_keys(self, frame):
+        columns = hash_columns(ORDER_HASH)
+        columns = columns if all(column in frame for column in columns) else [ORDER_HASH]
+        return pd.util.hash_pandas_object(frame[columns], index=False).to_numpy()
+
+    @metrics.timed("fills_store.read")
+    def read(self):
+        # Every stored fill, only from the newest batch of each order. Cached until a batch is written.
+        batches = tuple(self.batches())
+        with self._lock:
+            if self._frame[0] == batches:
+                return self._frame[1]
+        frames = [pd.read_parquet(batch) for batch in batches]
+        if not frames:
+            return None
+        fills_data = concat_compact(frames, self.shared_categories)
+        if len(frames) > 1:
+            batch_ids = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+            newest = pd.Series(batch_ids).groupby(self.order_keys(fills_data)).transform("max").to_numpy()
+            fills_data = fills_data[batch_ids == newest].reset_index(drop=True)
+        with self._lock:
+            self._frame = (batches, fills_data)
+        return fills_data
+
+    def final_orders(self):
+        # Hashes of the final orders that had no fills.
+        markers = [pd.read_parquet(marker)["OrderHash"] for marker in self.files(FINAL)]
+        return set(pd.concat(markers)) if markers else set()
+
+    def merge(self):
+        batches = self.batches()
+        if len(batches) > BATCH_LIMIT:
+            self.write(self.read())
+            for batch in batches:
+                os.remove(batch)
+        markers = self.files(FINAL)
+        if len(markers) > BATCH_LIMIT:
+            self.write(pd.DataFrame({"OrderHash": sorted(self.final_orders())}), FINAL)
+            for marker in markers:
+                os.remove(marker)
+
+    def ingest(self, orders, fetch, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS):
+        # orders: OrderHash (hex strings) and Final (no longer open) of every order that has been filled.
+        # fetch(order_hashes) returns the compact fills of a chunk of orders, or None when there are none.
+        # Orders already stored as final, with or without fills, are skipped. Returns a one-row status report.
+        start = time.perf_counter()
+        stored = self.read()
+        final = self.final_orders()
+        if stored is not None:
+            final.update(hash_strings(stored[stored["Final"]], ORDER_HASH))
+        pending = orders[~orders["OrderHash"].isin(final)]
+        final_pending = set(pending["OrderHash"][pending["Final"]])
+
+        def ingest_chunk(order_hashes):
+            try:
+                return fetch(order_hashes)
+            except Exception as error:
+                logger.info("No fills stored for %d orders: %r", len(order_hashes), error)
+                return error
+
+        with metrics.timer("fills_store.ingest"):
+            with ThreadPoolExecutor(max_workers=max_workers, initializer=cache.set_thread_backend,
+                                    initargs=(cache.background,)) as pool:
+                chunks = list(chunked(list(pending["OrderHash"]), chunk_size))
+                results = list(pool.map(ingest_chunk, chunks))
+            frames = [result for result in results if isinstance(result, pd.DataFrame) and len(result) > 0]
+            filled = set()
+            if frames:
+                fills_data = concat_compact(frames, self.shared_categories)
+                fill_orders = hash_strings(fills_data, ORDER_HASH)
+                filled = set(fill_orders)
+                fills_data["Final"] = fill_orders.isin(final_pending).to_numpy()
+                self.write(fills_data)
+            # Final orders whose chunk was fetched without error but returned none of their fills.
+            fetched = {order_hash for order_hashes, result in zip(chunks, results)
+                       if not isinstance(result, Exception) for order_hash in order_hashes}
+            unfilled = sorted((final_pending & fetched) - filled)
+            if unfilled:
+                self.write(pd.DataFrame({"OrderHash": unfilled}), FINAL)
+            if frames or unfilled:
+                self.merge()
+
+        return [{"orders": len(pending), "fills": sum(len(frame) for frame in frames),
+                 "errors": sum(isinstance(result, Exception) for result in results),
+                 "seconds": time.perf_counter() - start}]
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 50
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def filter_mask(frame, filters=None, search=None, search_columns=()):
+    # filters maps a column to a list of accepted values, or to a (low, high) range where either bound may be None.
+    # search is a case-insensitive substring matched against any of search_columns.
+    mask = np.ones(len(frame), dtype=bool)
+    for column, accepted in (filters or {}).items():
+        if isinstance(accepted, tuple):
+            low, high = accepted
+            if low is not None:
+                mask &= (frame[column] >= low).to_numpy()
+            if high is not None:
+                mask &= (frame[column] <= high).to_numpy()
+        elif accepted:
+            mask &= frame[column].isin(accepted).to_numpy()
+    if search:
+        matched = np.zeros(len(frame), dtype=bool)
+        for column in search_columns:
+            matched |= frame[column].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        mask &= matched
+    return mask
+
+
+def sort_order(values, ascending=True):
+    # Positions in sort order, from an argsort of the one sort column rather than reordering every column.
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(str)
+    order = np.argsort(values.to_numpy(), kind="stable")
+    return order if ascending else order[::-1]
+
+
+def query_frame(frame, filters=None, search=None, search_columns=(), sort_by=None, ascending=True, page=0,
+                page_size=PAGE_SIZE):
+    # Filter and sort the cached frame in pandas and cut out one page. Returns (rows, window, page_count): rows
+    # are all matching rows in sort order (for charts and prefetching), window is the page sent to the grid.
+    positions = np.flatnonzero(filter_mask(frame, filters, search, search_columns))
+    if sort_by is not None:
+        positions = positions[sort_order(frame[sort_by].iloc[positions], ascending)]
+    rows = frame.take(positions)
+    page_count = max((len(rows) + page_size - 1) // page_size, 1)
+    page = min(max(page, 0), page_count - 1)
+    window = rows.iloc[page * page_size:(page + 1) * page_size]
+    return rows, window, page_count
+
+
+def records(frame):
+    # Rows as the grid returns them: JSON types, with dates as ISO strings to the second.
+    return json.loads(frame.to_json(orient="records", date_format="iso", date_unit="s"))
+
+
+def row_record(frame, key_column, key):
+    rows = frame[frame[key_column] == key]
+    if len(rows) == 0:
+        return None
+    return records(rows.iloc[:1])[0]
@@ -0,0 +1,81 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from hidingbook import cache, metrics
+
+STORE_PATH = os.environ.get("HIDINGBOOK_HISTORY_PATH", os.path.join(".cache", "history"))
+MAX_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    # Compact order histories, one Parquet file per wallet. Files are replaced atomically on ingestion and read
+    # back once per write, so queries for any set of stored wallets are local reads and a concat.
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def file(self, address):
+        return os.path.join(self.path, address.lower() + ".parquet")
+
+    def stored_at(self, address):
+        try:
+            return os.path.getmtime(self.file(address))
+        except OSError:
+            return None
+
+    def __contains__(self, address):
+        return self.stored_at(address) is not None
+
+    def write(self, address, frame):
+        os.makedirs(self.path, exist_ok=True)
+        temporary = self.file(address) + ".tmp"
+        frame.to_parquet(temporary, index=False)
+        os.replace(temporary, self.file(address))
+
+    def read(self, address):
+        stored_at = self.stored_at(address)
+        if stored_at is None:
+            return None
+        with self._lock:
+            entry = self._frames.get(address.lower())
+        if entry is None or entry[0] != stored_at:
+            entry = (stored_at, pd.read_parquet(self.file(address)))
+            with self._lock:
+                self._frames[address.lower()] = entry
+        return entry[1]
+
+    def wallets(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name[:-len(".parquet")] for name in os.listdir(self.path) if name.endswith(".parquet"))
+
+    def ingest(self, addresses, fetch, max_age=0, max_workers=MAX_WORKERS):
+        # fetch(address) returns the wallet's compact history. Wallets stored less than max_age seconds ago are
+        # skipped, so a restart does not download everything again. Returns one status row per wallet.
+        now = time.time()
+        pending = [address for address in dict.fromkeys(addresses)
+                   if self.stored_at(address) is None or now - self.stored_at(address) >= max_age]
+
+        def ingest_wallet(address):
+            start = time.perf_counter()
+            try:
+                frame = fetch(address)
+                self.write(address, frame)
+            except Exception as error:
+                # Wallets without any history fail in the token join; they are reported and retried next run.
+                logger.info("No history stored for %s: %r", address, error)
+                return {"Address": address, "rows": 0, "seconds": time.perf_counter() - start, "error": repr(error)}
+            return {"Address": address, "rows": len(frame), "seconds": time.perf_counter() - start, "error": None}
+
+        with metrics.timer("history_store.ingest"):
+            with ThreadPoolExecutor(max_workers=max_workers, initializer=cache.set_thread_backend,
+                                    initargs=(cache.background,)) as pool:
+                return list(pool.map(ingest_wallet, pending))
@@ -0,0 +1,142 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+ROOK_API = os.environ.get("HIDINGBOOK_ROOK_API", "https://api.rook.fi")
+HIDINGBOOK_API = os.environ.get("HIDINGBOOK_ORDERS_API", "https://hidingbook.keeperdao.com")
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+POOL_MAXSIZE = 16
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    # Full jitter: sleep a random amount up to the exponential backoff so that
+    # concurrent fetchers retrying the same host do not stampede it together.
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        return random.uniform(0, backoff)
+
+
+class TransportStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, latency, ok, size=0):
+        with self._lock:
+            host_stats = self._hosts.setdefault(host, {"requests": 0, "errors": 0, "bytes": 0, "latency_total": 0.0,
+                                                      "latency_max": 0.0})
+            host_stats["requests"] += 1
+            host_stats["bytes"] += size
+            host_stats["errors"] += 0 if ok else 1
+            host_stats["latency_total"] += latency
+            host_stats["latency_max"] = max(host_stats["latency_max"], latency)
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(host_stats) for host, host_stats in self._hosts.items()}
+
+
+class HttpClient:
+    def __init__(self, hosts=(ROOK_API, HIDINGBOOK_API), pool_maxsize=POOL_MAXSIZE,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.timeout = timeout
+        self.stats = TransportStats()
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+
+        retry = JitteredRetry(total=max_retries, connect=max_retries, read=max_retries, status=max_retries,
+                              backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                              allowed_methods=frozenset(["GET"]), raise_on_status=False)
+        # One adapter (and so one keep-alive pool) per upstream host, plus a default for anything else.
+        self.adapters = {}
+        for host in hosts:
+            self.adapters[host] = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+            self.session.mount(host, self.adapters[host])
+        self.adapters["default"] = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", self.adapters["default"])
+        self.session.mount("http://", self.adapters["default"])
+
+    def get(self, url, params=None, timeout=None):
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        ok = False
+        size = 0
+        try:
+            response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            # Decoded body size (after gzip); reading it here also makes the latency include the download.
+            size = len(response.content)
+            ok = True
+        finally:
+            self.stats.record(host, time.perf_counter() - start, ok, size)
+        return response
+
+    def get_json(self, url, params=None, timeout=None):
+        return self.get(url, params=params, timeout=timeout).json()
+
+    def get_content(self, url, params=None, timeout=None):
+        return self.get(url, params=params, timeout=timeout).content
+
+    def connection_counts(self):
+        counts = {}
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host_counts = counts.setdefault(pool.host, {"connections": 0, "pool_requests": 0})
+                host_counts["connections"] += pool.num_connections
+                host_counts["pool_requests"] += pool.num_requests
+        return counts
+
+    def transport_stats(self):
+        report = self.stats.snapshot()
+        connections = self.connection_counts()
+        for host, host_stats in report.items():
+            host_stats["latency_avg"] = host_stats["latency_total"] / host_stats["requests"]
+            host_connections = connections.get(host.split(":")[0], {"connections": 0, "pool_requests": 0})
+            host_stats.update(host_connections)
+            if host_connections["pool_requests"] > 0:
+                host_stats["reuse_rate"] = 1 - host_connections["connections"] / host_connections["pool_requests"]
+            else:
+                host_stats["reuse_rate"] = 0.0
+        return report
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def get_json(url, params=None, timeout=None):
+    return client().get_json(url, params=params, timeout=timeout)
+
+
+def get_content(url, params=None, timeout=None):
+    return client().get_content(url, params=params, timeout=timeout)
+
+
+def transport_stats():
+    return client().transport_stats()
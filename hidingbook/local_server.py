@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SERVER_HOST = os.environ.get("HIDINGBOOK_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("HIDINGBOOK_SERVER_PORT", "9464"))
+# Where browsers reach this endpoint when the app is deployed behind a proxy, e.g. https://example.org/hidingbook.
+PUBLIC_URL = os.environ.get("HIDINGBOOK_PUBLIC_URL", "").rstrip("/")
+
+logger = logging.getLogger(__name__)
+
+_routes = {}
+_server = None
+_server_error = None
+_server_lock = threading.Lock()
+
+
+def route(path, handler):
+    # handler(params) returns (content_type, body); body is bytes or an iterable of bytes chunks, which is sent
+    # with chunked transfer encoding so large responses never have to be held in memory at once.
+    _routes[path] = handler
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        split = urlsplit(self.path)
+        handler = _routes.get(split.path)
+        if handler is None:
+            self.send_error(404)
+            return
+        try:
+            content_type, body = handler({key: values[0] for key, values in parse_qs(split.query).items()})
+        except (KeyError, ValueError) as error:
+            self.send_error(400, str(error))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if isinstance(body, bytes):
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in body:
+            if chunk:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(host=SERVER_HOST, port=SERVER_PORT):
+    # Idempotent: Streamlit re-runs page scripts on every interaction, but only the first call starts a server.
+    # Another process (e.g. a second app instance) may already hold the port; that is logged once, not raised.
+    global _server, _server_error
+    with _server_lock:
+        if _server is None and _server_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), Handler)
+            except OSError as error:
+                _server_error = error
+                logger.warning("Local endpoint not started on %s:%d: %s", host, port, error)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+def url():
+    if _server is None:
+        return None
+    host, port = _server.server_address[:2]
+    return "http://%s:%d" % (host, port)
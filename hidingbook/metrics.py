@@ -0,0 +1,196 @@
+import contextlib
+import functools
+import threading
+import time
+
+import pandas as pd
+
+from hidingbook import http_client
+from hidingbook import local_server
+
+PREFIX = "hidingbook"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def observe(self, name, seconds, rows=None, size=None, ok=True):
+        with self._lock:
+            timer = self._timers.setdefault(name, {"calls": 0, "errors": 0, "seconds_total": 0.0, "seconds_max": 0.0,
+                                                   "seconds_last": 0.0, "rows_last": None, "bytes_last": None})
+            timer["calls"] += 1
+            timer["errors"] += 0 if ok else 1
+            timer["seconds_total"] += seconds
+            timer["seconds_max"] = max(timer["seconds_max"], seconds)
+            timer["seconds_last"] = seconds
+            if rows is not None:
+                timer["rows_last"] = rows
+            if size is not None:
+                timer["bytes_last"] = size
+
+    def count(self, name, label, amount=1):
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[label] = counter.get(label, 0) + amount
+
+    def timers(self):
+        with self._lock:
+            return {name: dict(timer) for name, timer in self._timers.items()}
+
+    def counters(self):
+        with self._lock:
+            return {name: dict(counter) for name, counter in self._counters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+registry = Metrics()
+_gauges = {}
+
+
+def gauge(name, collect):
+    # collect() returns {name label: value} when the export is rendered; None values are skipped.
+    _gauges[name] = collect
+
+
+def measure(result):
+    # Row count and in-memory size of whatever a fetcher, table builder or chart returned. Table builders return
+    # (grid, frame), so the first frame in a tuple is used. Sizes are shallow: deep=True walks every object cell.
+    if isinstance(result, tuple):
+        result = next((item for item in result if isinstance(item, pd.DataFrame)), None)
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=True).sum())
+    if isinstance(result, (list, dict)):
+        return len(result), None
+    return None, None
+
+
+def timed(name=None):
+    def decorator(func):
+        metric_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                registry.observe(metric_name, time.perf_counter() - start, ok=False)
+                raise
+            rows, size = measure(result)
+            registry.observe(metric_name, time.perf_counter() - start, rows=rows, size=size)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def timer(name):
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        registry.observe(name, time.perf_counter() - start, ok=ok)
+
+
+def timer_frame():
+    rows = []
+    for name, timer_stats in sorted(registry.timers().items()):
+        row = {"Name": name}
+        row.update(timer_stats)
+        row["seconds_avg"] = timer_stats["seconds_total"] / timer_stats["calls"]
+        rows.append(row)
+    return pd.DataFrame(rows, columns=["Name", "calls", "errors", "seconds_avg", "seconds_max", "seconds_last",
+                                       "seconds_total", "rows_last", "bytes_last"])
+
+
+def cache_counts():
+    # The in-process cache only sees calls and misses (see hidingbook.cache.cached), so its hits are derived.
+    counters = registry.counters()
+    counts = []
+    calls = counters.get("cache_requests", {})
+    for (name, outcome), count in calls.items():
+        if outcome == "call":
+            misses = calls.get((name, "miss"), 0)
+            counts.extend([("cache", name, "hit", count - misses), ("cache", name, "miss", misses)])
+    for layer in ("disk_cache", "price_store", "depth_ladder", "analytics_cube"):
+        for (name, outcome), count in counters.get(layer + "_requests", {}).items():
+            counts.append((layer, name, outcome, count))
+    return sorted(counts)
+
+
+def cache_frame():
+    frame = pd.DataFrame(cache_counts(), columns=["Layer", "Name", "Outcome", "Count"])
+    if len(frame) == 0:
+        return frame
+    frame = frame.pivot_table(index=["Layer", "Name"], columns="Outcome", values="Count", aggfunc="sum",
+                              fill_value=0)
+    return frame.reset_index().rename_axis(columns=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _sample(lines, metric, labels, value):
+    label_text = ",".join('%s="%s"' % (key, _escape(label)) for key, label in labels.items())
+    lines.append("%s_%s{%s} %r" % (PREFIX, metric, label_text, float(value)))
+
+
+def prometheus_text():
+    lines = []
+    timers = registry.timers()
+    lines.append("# HELP %s_call_seconds Wall time of instrumented fetchers, table builders and charts." % PREFIX)
+    lines.append("# TYPE %s_call_seconds summary" % PREFIX)
+    for name, timer_stats in sorted(timers.items()):
+        _sample(lines, "call_seconds_sum", {"name": name}, timer_stats["seconds_total"])
+        _sample(lines, "call_seconds_count", {"name": name}, timer_stats["calls"])
+    lines.append("# TYPE %s_call_seconds_max gauge" % PREFIX)
+    for name, timer_stats in sorted(timers.items()):
+        _sample(lines, "call_seconds_max", {"name": name}, timer_stats["seconds_max"])
+    lines.append("# TYPE %s_call_errors_total counter" % PREFIX)
+    for name, timer_stats in sorted(timers.items()):
+        _sample(lines, "call_errors_total", {"name": name}, timer_stats["errors"])
+    lines.append("# TYPE %s_result_rows gauge" % PREFIX)
+    for name, timer_stats in sorted(timers.items()):
+        if timer_stats["rows_last"] is not None:
+            _sample(lines, "result_rows", {"name": name}, timer_stats["rows_last"])
+    lines.append("# TYPE %s_result_bytes gauge" % PREFIX)
+    for name, timer_stats in sorted(timers.items()):
+        if timer_stats["bytes_last"] is not None:
+            _sample(lines, "result_bytes", {"name": name}, timer_stats["bytes_last"])
+
+    lines.append("# TYPE %s_cache_requests_total counter" % PREFIX)
+    for layer, name, outcome, count in cache_counts():
+        _sample(lines, "cache_requests_total", {"layer": layer, "name": name, "outcome": outcome}, count)
+
+    for gauge_name, collect in sorted(_gauges.items()):
+        lines.append("# TYPE %s_%s gauge" % (PREFIX, gauge_name))
+        for name, value in sorted(collect().items()):
+            if value is not None:
+                _sample(lines, gauge_name, {"name": name}, value)
+
+    transport = http_client.transport_stats()
+    for metric, key, metric_type in (("http_requests_total", "requests", "counter"),
+                                     ("http_errors_total", "errors", "counter"),
+                                     ("http_response_bytes_total", "bytes", "counter"),
+                                     ("http_latency_seconds_total", "latency_total", "counter"),
+                                     ("http_latency_seconds_max", "latency_max", "gauge"),
+                                     ("http_connections", "connections", "gauge")):
+        lines.append("# TYPE %s_%s %s" % (PREFIX, metric, metric_type))
+        for host, host_stats in sorted(transport.items()):
+            _sample(lines, metric, {"host": host}, host_stats[key])
+    return "\n".join(lines) + "\n"
+
+
+local_server.route("/metrics", lambda params: ("text/plain; version=0.0.4", prometheus_text().encode()))
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pandas as pd
+
+from hidingbook import metrics
+from hidingbook.compact import concat_compact
+
+FILL_FIELDS = ("filledAmount_takerToken", "remainingFillableAmount_takerToken")
+ORDER_AMOUNTS = {"order.makerAmount": "maker", "order.takerAmount": "taker",
+                 "metaData.filledAmount_takerToken": "taker", "metaData.remainingFillableAmount_takerToken": "taker"}
+
+
+def derive_orders(order_data, token_registry, address_directory):
+    order_data["Name"] = address_directory.map_names(order_data["order.maker"])
+    order_data.loc[pd.isna(order_data["Name"]), "Name"] = "App User"
+    order_data["OrderType"] = address_directory.map_types(order_data["order.maker"])
+    order_data.loc[(order_data["OrderType"] != "Market Maker") & (
+            (order_data["order.expiry"] - order_data[
+                "metaData.creation"]) < 180), "OrderType"] = "AutoFill"
+    order_data.loc[(order_data["OrderType"] != "Market Maker") & (
+            (order_data["order.expiry"] - order_data[
+                "metaData.creation"]) >= 180), "OrderType"] = "Limit Order"
+
+    joined_data = token_registry.join(order_data, "order.makerToken", "order.takerToken", ORDER_AMOUNTS)
+
+    return joined_data
+
+
+def fill_state(order):
+    return tuple(order["metaData"].get(field) for field in FILL_FIELDS)
+
+
+def removal_kind(order, now):
+    # Why an order left the book, when its last polled state shows it: nothing left to fill, or past its expiry.
+    # Anything else is "removed": an order filled in full between polls and a cancelled one look the same here.
+    try:
+        if float(order["metaData"].get("remainingFillableAmount_takerToken")) == 0:
+            return "filled"
+    except (TypeError, ValueError):
+        pass
+    try:
+        if float(order["order"].get("expiry")) <= now:
+            return "expired"
+    except (TypeError, ValueError):
+        pass
+    return "removed"
+
+
+def update_kind(order, previous_order):
+    # A fill moves filledAmount; other updates only move the remaining fillable amount (balances, allowances).
+    filled = order["metaData"].get("filledAmount_takerToken")
+    return "filled" if filled != previous_order["metaData"].get("filledAmount_takerToken") else "updated"
+
+
+def change_events(kinds, order_data):
+    # kinds maps order hash to change kind; each event carries enough of the derived row to show an order that
+    # is no longer in the book.
+    rows = order_data.reindex(list(kinds))
+    names = rows["Name"] if "Name" in rows else pd.Series("", index=rows.index)
+    pairs = rows["name_maker"].astype(str) + "/" + rows["name_taker"].astype(str) if "name_maker" in rows else names
+    return [{"kind": kind, "OrderHash": order_hash, "Name": str(name), "Pair": str(pair)}
+            for (order_hash, kind), name, pair in zip(kinds.items(), names, pairs)]
+
+
+class OrderBook:
+    # Open orders keyed by metaData.orderHash. Each sync diffs the polled payload against the previous one and
+    # only normalizes, joins and rescales the orders that are new or whose fill amounts moved. When compact is
+    # given, only those rows go through it (e.g. to keep some columns in compact dtypes) before they join the
+    # book, with shared_categories kept shared. When feed is given, every sync after the first publishes its
+    # changes to it (added, filled, updated, expired, removed). When archive is given, every sync records the book
+    # to it along with the rows it changed.
+    def __init__(self, compact=None, shared_categories=(), feed=None, archive=None):
+        self._lock = threading.Lock()
+        self.compact = compact
+        self.shared_categories = shared_categories
+        self.feed = feed
+        self.archive = archive
+        self.raw_orders = {}
+        self.data = pd.DataFrame()
+        self.reference = None
+        self.last_diff = {"added": [], "updated": [], "removed": []}
+        self.version = 0
+
+    def sync(self, orders, token_registry, address_directory):
+        with self._lock:
+            incoming = {order["metaData"]["orderHash"]: order for order in orders}
+            reference = (token_registry.fingerprint, address_directory.fingerprint)
+            rebuilt = reference != self.reference
+            if rebuilt:
+                # Token or address tables were refreshed: every derived column may be stale.
+                self.raw_orders = {}
+                self.data = pd.DataFrame()
+                self.reference = reference
+
+            previous = self.raw_orders
+            # The first sync and rebuilds after a token or address refresh are snapshots, not changes.
+            publish = self.feed is not None and len(previous) > 0
+            added = [order_hash for order_hash in incoming if order_hash not in previous]
+            updated = [order_hash for order_hash in incoming if order_hash in previous
+                       and fill_state(incoming[order_hash]) != fill_state(previous[order_hash])]
+            removed = [order_hash for order_hash in previous if order_hash not in incoming]
+
+            changes = []
+            if publish and removed:
+                now = time.time()
+                changes.extend(change_events({order_hash: removal_kind(previous[order_hash], now)
+                                              for order_hash in removed}, self.data))
+            removed_data = self.data[self.data.index.isin(removed)]
+            if updated or removed:
+                self.data = self.data[~self.data.index.isin(updated + removed)]
+            changed_data = self.data.iloc[:0]
+            if added or updated:
+                changed_orders = [incoming[order_hash] for order_hash in added + updated]
+                with metrics.timer("order_book.json_normalize"):
+                    changed_data = pd.json_normalize(changed_orders)
+                changed_data = derive_orders(changed_data, token_registry, address_directory)
+                changed_data.index = changed_data["metaData.orderHash"].values
+                if self.compact is not None:
+                    changed_data = self.compact(changed_data)
+                if len(self.data) == 0:
+                    self.data = changed_data
+                elif len(changed_data) > 0 and self.compact is not None:
+                    self.data = concat_compact([self.data, changed_data], self.shared_categories, ignore_index=False)
+                elif len(changed_data) > 0:
+                    self.data = pd.concat([self.data, changed_data])
+            if publish and (added or updated):
+                kinds = {order_hash: "added" for order_hash in added}
+                kinds.update((order_hash, update_kind(incoming[order_hash], previous[order_hash]))
+                             for order_hash in updated)
+                changes.extend(change_events(kinds, self.data))
+            if changes:
+                self.feed.publish(changes)
+
+            self.raw_orders = incoming
+            self.last_diff = {"added": added, "updated": updated, "removed": removed}
+            if added or updated or removed:
+                self.version += 1
+
+            book_data = self.data.reset_index(drop=True)
+            if self.archive is not None:
+                # A rebuild is not a diff of the previous sync, so the archive gets the whole book again.
+                self.archive.record(book_data, None if rebuilt else (changed_data.reset_index(drop=True),
+                                                                     removed_data.reset_index(drop=True)))
+            return book_data
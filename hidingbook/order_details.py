@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 50
+PREFETCH_LIMIT = 500
+MAX_WORKERS = 4
+DETAIL_TTL = 3 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(values, size=CHUNK_SIZE):
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def auction_order_hashes(auction):
+    if auction.get("orderHash"):
+        return [auction["orderHash"]]
+    if auction.get("orderHashes"):
+        return list(auction["orderHashes"])
+    return [order["orderHash"] for order in auction.get("orders", [])
+            if isinstance(order, dict) and "orderHash" in order]
+
+
+def split_auctions(auctions_json, order_hashes):
+    # Auctions can cover several orders (crossed auctions), so one auction may land under more than one hash.
+    # Returns None when the response carries no per-auction order hash and the chunk cannot be attributed.
+    split = {order_hash: [] for order_hash in order_hashes}
+    for auction in auctions_json:
+        auction_hashes = auction_order_hashes(auction)
+        if not auction_hashes:
+            if len(order_hashes) != 1:
+                return None
+            auction_hashes = order_hashes
+        for order_hash in auction_hashes:
+            if order_hash in split:
+                split[order_hash].append(auction)
+    return split
+
+
+def split_fills(history_json, order_hashes):
+    split = {order_hash: [] for order_hash in order_hashes}
+    for item in history_json["items"]:
+        order_hash = item.get("metaData", {}).get("orderHash")
+        if order_hash is None and len(order_hashes) == 1:
+            order_hash = order_hashes[0]
+        if order_hash in split:
+            split[order_hash].append(item)
+    return split
+
+
+class OrderDetailCache:
+    # Raw auctions and order-history items per order hash, filled in bulk so that selecting a row in an
+    # inspector grid never has to wait on the network.
+    def __init__(self, ttl=DETAIL_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {"auctions": {}, "fills": {}}
+
+    def get(self, kind, order_hash):
+        with self._lock:
+            entry = self._entries[kind].get(order_hash)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def put_many(self, kind, values):
+        now = time.time()
+        with self._lock:
+            self._entries[kind].update({order_hash: (now, value) for order_hash, value in values.items()})
+
+    def missing(self, kind, order_hashes):
+        return [order_hash for order_hash in order_hashes if self.get(kind, order_hash) is None]
+
+
+class OrderDetailPrefetcher:
+    def __init__(self, fetch_auctions, fetch_fills, cache=None, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS):
+        # fetch_auctions / fetch_fills take a list of order hashes and return the decoded API response.
+        self.fetch_auctions = fetch_auctions
+        self.fetch_fills = fetch_fills
+        self.cache = cache or OrderDetailCache()
+        self.chunk_size = chunk_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="order-details")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+
+    def _load_chunk(self, kind, order_hashes):
+        try:
+            if kind == "auctions":
+                split = split_auctions(self.fetch_auctions(order_hashes), order_hashes)
+            else:
+                split = split_fills(self.fetch_fills(order_hashes), order_hashes)
+            if split is not None:
+                self.cache.put_many(kind, split)
+            else:
+                logger.info("Prefetched %s of %d orders carry no order hashes and were dropped", kind,
+                            len(order_hashes))
+        except Exception as error:
+            # Nobody waits on prefetch futures, so the failure is only logged; the orders are fetched on their own
+            # when selected.
+            logger.info("Prefetching %s of %d orders failed: %r", kind, len(order_hashes), error)
+        finally:
+            with self._lock:
+                self._in_flight.difference_update((kind, order_hash) for order_hash in order_hashes)
+
+    def prefetch(self, order_hashes, limit=PREFETCH_LIMIT):
+        order_hashes = list(dict.fromkeys(order_hashes))[:limit]
+        futures = []
+        for kind in ("auctions", "fills"):
+            with self._lock:
+                pending = [order_hash for order_hash in self.cache.missing(kind, order_hashes)
+                           if (kind, order_hash) not in self._in_flight]
+                self._in_flight.update((kind, order_hash) for order_hash in pending)
+            for chunk in chunked(pending, self.chunk_size):
+                futures.append(self._pool.submit(self._load_chunk, kind, chunk))
+        return futures
+
+    def auctions(self, order_hash):
+        auctions = self.cache.get("auctions", order_hash)
+        if auctions is None:
+            auctions = split_auctions(self.fetch_auctions([order_hash]), [order_hash])
+            self.cache.put_many("auctions", auctions)
+            auctions = auctions[order_hash]
+        return auctions
+
+    def fills(self, order_hash):
+        items = self.cache.get("fills", order_hash)
+        if items is None:
+            items = split_fills(self.fetch_fills([order_hash]), [order_hash])
+            self.cache.put_many("fills", items)
+            items = items[order_hash]
+        return items
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+TOTAL_KEYS = ("total", "totalCount", "count", "totalItems")
+
+
+def page_total(page_json):
+    if not isinstance(page_json, dict):
+        return None
+    for key in TOTAL_KEYS:
+        if isinstance(page_json.get(key), int):
+            return page_json[key]
+    return None
+
+
+def fetch_pages(fetch_page, page_size=PAGE_SIZE, max_workers=MAX_WORKERS, items_key="items"):
+    # fetch_page(offset, limit) returns one decoded page. Raw items are collected in offset order and
+    # returned as a single list so callers normalize once instead of concatenating frames per page.
+    first_page = fetch_page(0, page_size)
+    items = list(first_page[items_key])
+    if len(first_page[items_key]) < page_size:
+        return items
+
+    total = page_total(first_page)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        if total is not None:
+            offsets = range(page_size, total, page_size)
+            for page in pool.map(lambda offset: fetch_page(offset, page_size), offsets):
+                items.extend(page[items_key])
+            return items
+
+        # No total in the response: probe ahead one wave of pages at a time until a short page comes back.
+        offset = page_size
+        while True:
+            offsets = [offset + i * page_size for i in range(max_workers)]
+            for page in pool.map(lambda wave_offset: fetch_page(wave_offset, page_size), offsets):
+                items.extend(page[items_key])
+                if len(page[items_key]) < page_size:
+                    return items
+            offset = offsets[-1] + page_size
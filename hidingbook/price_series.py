@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from hidingbook import metrics
+
+MAX_POINTS = 500
+
+
+def cross_rate(base_prices, quote_prices):
+    # base/quote on a common clock: each base candle is matched with the nearest quote candle no further away
+    # than the coarser of the two sampling intervals; unmatched candles are dropped rather than misaligned.
+    base_prices = base_prices[["Timestamp", "Close"]].sort_values("Timestamp")
+    quote_prices = quote_prices[["Timestamp", "Close"]].sort_values("Timestamp")
+    if len(base_prices) == 0 or len(quote_prices) == 0:
+        return pd.DataFrame({"Timestamp": pd.Series([], dtype="datetime64[ns]"), "Close": pd.Series([], dtype=float)})
+    intervals = [prices["Timestamp"].diff().median() for prices in (base_prices, quote_prices) if len(prices) > 1]
+    tolerance = max(intervals) if intervals else pd.Timedelta(0)
+    aligned = pd.merge_asof(base_prices, quote_prices, on="Timestamp", direction="nearest", tolerance=tolerance,
+                            suffixes=("_base", "_quote"))
+    aligned["Close"] = aligned["Close_base"] / aligned["Close_quote"]
+    return aligned.loc[aligned["Close"].notna(), ["Timestamp", "Close"]].reset_index(drop=True)
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and, from each of threshold - 2 buckets,
+    # the point forming the largest triangle with the previously kept point and the next bucket's average.
+    # Returns the positions of the kept points.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bucket_size = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(prices, max_points=MAX_POINTS):
+    positions = lttb(prices["Timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64), prices["Close"],
+                     max_points)
+    return prices.iloc[positions].reset_index(drop=True)
+
+
+@metrics.timed()
+def pair_series(base_prices, quote_prices, max_points=MAX_POINTS):
+    return downsample(cross_rate(base_prices, quote_prices), max_points)
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+from hidingbook import http_client
+from hidingbook import metrics
+from hidingbook.prices import CANDLE_COLUMNS, parse_candles
+
+# Upstream request sizes, finest first. CoinGecko picks the candle interval from the requested days (30 minutes up
+# to 2 days, 4 hours up to 30 days, 4 days beyond), so one request per tier covers every lookback.
+TIERS = ("1", "30", "max")
+TIER_DAYS = {"1": 1, "30": 30, "max": None}
+LOOKBACK_DAYS = {"1D": 1, "1W": 7, "1M": 30, "1Y": 365, "MAX": None}
+REFRESH_SECONDS = 5 * 60
+DAY_MS = 24 * 60 * 60 * 1000
+
+logger = logging.getLogger(__name__)
+
+
+def lookback_tier(lookback):
+    days = LOOKBACK_DAYS[lookback]
+    for tier in TIERS:
+        if days is not None and TIER_DAYS[tier] is not None and days <= TIER_DAYS[tier]:
+            return tier
+    return TIERS[-1]
+
+
+def covering_lookback(since):
+    # Shortest lookback that reaches back to the given unix time.
+    days = (time.time() - since) / (DAY_MS / 1000)
+    for lookback, lookback_days in LOOKBACK_DAYS.items():
+        if lookback_days is not None and days <= lookback_days:
+            return lookback
+    return "MAX"
+
+
+def candle_interval(candles):
+    return float(np.median(np.diff(candles[:, 0]))) if len(candles) > 1 else 0.0
+
+
+def resample(candles, since, interval):
+    # OHLC candles of the given interval built from finer candles closing after `since`, one per complete bucket
+    # (since, since + interval], (since + interval, since + 2 * interval], ...; each stamped with its close time.
+    candles = candles[candles[:, 0] > since]
+    if len(candles) == 0 or interval <= 0:
+        return candles[:0]
+    buckets = np.ceil((candles[:, 0] - since) / interval).astype(np.int64)
+    complete = since + buckets * interval <= candles[-1, 0]
+    candles, buckets = candles[complete], buckets[complete]
+    if len(candles) == 0:
+        return candles
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+    return np.column_stack([since + buckets[starts] * interval, candles[starts, 1],
+                            np.maximum.reduceat(candles[:, 2], starts), np.minimum.reduceat(candles[:, 3], starts),
+                            candles[ends, 4]])
+
+
+class TokenPrices:
+    # Candles of one token at each tier's resolution. The first refresh downloads every tier; later refreshes only
+    # download the finest tier, append its new candles and roll them up into the coarser tiers, which are only
+    # downloaded again when the finer history no longer reaches back to their last candle.
+    def __init__(self, coingecko_id):
+        self.coingecko_id = coingecko_id
+        self.candles = {}
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+
+    def fetch(self, tier):
+        price_params = {"coinGeckoTokenId": self.coingecko_id.lower(), "days": tier}
+        return parse_candles(http_client.get_content(http_client.ROOK_API + "/api/v1/trade/tokenPriceHistory",
+                                                     params=price_params))
+
+    def load(self, tier):
+        metrics.registry.count("price_store_requests", ("days=" + tier, "load"))
+        return self.fetch(tier)
+
+    def append(self):
+        finest = TIERS[0]
+        metrics.registry.count("price_store_requests", ("days=" + finest, "append"))
+        latest = self.fetch(finest)
+        previous = self.candles[finest]
+        source = np.concatenate([previous, latest[latest[:, 0] > previous[-1, 0]]]) if len(previous) else latest
+        self.candles[finest] = source[source[:, 0] > source[-1, 0] - TIER_DAYS[finest] * DAY_MS]
+        for tier in TIERS[1:]:
+            candles = self.candles[tier]
+            if len(candles) == 0 or len(source) == 0 or source[0, 0] > candles[-1, 0]:
+                self.candles[tier] = self.load(tier)
+            else:
+                new_candles = resample(source, candles[-1, 0], candle_interval(candles))
+                if len(new_candles):
+                    metrics.registry.count("price_store_requests", ("days=" + tier, "append"))
+                    candles = np.concatenate([candles, new_candles])
+                if TIER_DAYS[tier] is not None:
+                    candles = candles[candles[:, 0] > candles[-1, 0] - TIER_DAYS[tier] * DAY_MS]
+                self.candles[tier] = candles
+            source = self.candles[tier]
+
+    def refresh(self):
+        # Returns whether upstream was asked.
+        with self._lock:
+            if self.refreshed_at is not None and time.time() - self.refreshed_at < REFRESH_SECONDS:
+                return False
+            if not self.candles:
+                self.candles = {tier: self.load(tier) for tier in TIERS}
+            else:
+                try:
+                    self.append()
+                except (requests.RequestException, ValueError) as error:
+                    # Keep serving the candles already held; the next view retries.
+                    logger.warning("Price refresh failed for %s: %r", self.coingecko_id, error)
+                    return True
+            self.refreshed_at = time.time()
+            return True
+
+    def view(self, lookback):
+        # The lookback's window, measured back from the last candle, at the finest tier that covers it.
+        tier = lookback_tier(lookback)
+        if not self.refresh():
+            metrics.registry.count("price_store_requests", ("days=" + tier, "hit"))
+        candles = self.candles[tier]
+        if len(candles) and LOOKBACK_DAYS[lookback] is not None:
+            candles = candles[candles[:, 0] > candles[-1, 0] - LOOKBACK_DAYS[lookback] * DAY_MS]
+        view = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
+        view["Timestamp"] = pd.to_datetime(candles[:, 0].astype(np.int64), unit="ms")
+        return view
+
+
+class PriceStore:
+    def __init__(self):
+        self.tokens = {}
+        self._lock = threading.Lock()
+
+    def token(self, coingecko_id):
+        with self._lock:
+            if coingecko_id not in self.tokens:
+                self.tokens[coingecko_id] = TokenPrices(coingecko_id)
+            return self.tokens[coingecko_id]
+
+    def view(self, coingecko_id, lookback):
+        return self.token(coingecko_id).view(lookback)
@@ -0,0 +1,14 @@
+import json
+
+import numpy as np
+
+CANDLE_COLUMNS = ["Timestamp", "Open", "High", "Low", "Close"]
+
+
+def parse_candles(raw_data):
+    # The endpoint wraps its JSON array in a bytes literal (b'[[...]]'); strip that and decode as JSON.
+    text = raw_data.decode("utf-8").strip()
+    if text.startswith("b'") and text.endswith("'"):
+        text = text[2:-1]
+    candles = np.array(json.loads(text), dtype=float)
+    return candles.reshape(-1, len(CANDLE_COLUMNS))
@@ -0,0 +1,154 @@
+import functools
+import logging
+import os
+import threading
+import time
+
+from hidingbook import cache, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    # The last good result of one argument-less fetcher, refreshed on a fixed interval by its own thread. A job
+    # with an opt_in environment variable only runs when that variable is set to 1.
+    def __init__(self, name, func, interval, opt_in=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.opt_in = opt_in
+        self.running = False
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.loaded_at = None
+        self.refreshing = False
+        self.duration = None
+        self.error = None
+
+    def store(self, value):
+        with self._lock:
+            self.value = value
+            self.loaded = True
+            self.loaded_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return self.loaded, self.value
+
+    def refresh(self):
+        self.refreshing = True
+        start = time.perf_counter()
+        try:
+            with metrics.timer("refresh." + self.name):
+                value = self.func()
+        except Exception as error:
+            # Keep serving the previous snapshot; the next tick tries again.
+            self.error = repr(error)
+            logger.warning("Refreshing %s failed: %r", self.name, error)
+        else:
+            self.store(value)
+            self.error = None
+        finally:
+            self.duration = time.perf_counter() - start
+            self.refreshing = False
+
+    def enabled(self):
+        return self.opt_in is None or os.environ.get(self.opt_in) == "1"
+
+    def age(self):
+        return None if self.loaded_at is None else time.time() - self.loaded_at
+
+    def status(self):
+        return {"Name": self.name, "running": self.running, "age_s": self.age(), "interval_s": self.interval,
+                "refresh_s": self.duration, "refreshing": self.refreshing, "error": self.error}
+
+
+class Refresher:
+    def __init__(self):
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return bool(self._threads)
+
+    def add(self, name, func, interval, opt_in=None):
+        self.jobs[name] = Job(name, func, interval, opt_in)
+        return self.jobs[name]
+
+    def _loop(self, job, stop):
+        # Streamlit's memo expects a script run context, so refresh threads use the shared background cache.
+        cache.set_thread_backend(cache.background)
+        while not stop.is_set():
+            job.refresh()
+            stop.wait(job.interval)
+
+    def start(self):
+        # Idempotent, like local_server.serve: only the first call from a Streamlit rerun starts the threads.
+        with self._lock:
+            if not self._threads:
+                self._stop = threading.Event()
+                for job in self.jobs.values():
+                    if not job.enabled():
+                        continue
+                    thread = threading.Thread(target=self._loop, args=(job, self._stop), name="refresh-" + job.name,
+                                              daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+                    job.running = True
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            self._threads = []
+            for job in self.jobs.values():
+                job.running = False
+
+    def status(self):
+        return [job.status() for job in self.jobs.values()]
+
+
+_refresher = Refresher()
+
+
+def warmed(interval, opt_in=None):
+    # Once the refresher is started, argument-less calls return the last good snapshot and never wait on
+    # upstream (only the very first call, before any snapshot exists, loads synchronously). Snapshots are shared
+    # across sessions, so callers must not mutate them. Refreshes bypass the wrapped function's cache layer.
+    # Jobs with an opt_in environment variable are left out of start() unless it is set to 1.
+    def decorator(func):
+        job = _refresher.add(func.__name__, getattr(func, "uncached", func), interval, opt_in)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if args or kwargs or not job.running:
+                return func(*args, **kwargs)
+            loaded, value = job.snapshot()
+            if loaded:
+                return value
+            value = func()
+            job.store(value)
+            return value
+
+        wrapper.job = job
+        return wrapper
+
+    return decorator
+
+
+def start():
+    _refresher.start()
+
+
+def stop():
+    _refresher.stop()
+
+
+def status():
+    return _refresher.status()
+
+
+metrics.gauge("snapshot_age_seconds", lambda: {job.name: job.age() for job in _refresher.jobs.values()})
@@ -0,0 +1,86 @@
+import threading
+
+import pandas as pd
+
+from hidingbook import metrics
+
+JOIN_COLUMNS = ("name", "decimals", "latest_price.usd_price", "latest_price.eth_price")
+
+
+def frame_fingerprint(data):
+    return len(data), int(pd.util.hash_pandas_object(data, index=True).sum())
+
+
+class TokenRegistry:
+    # Built once per token_fetch refresh. Lookups by address or symbol are dictionary hits, and the columns the
+    # order pipelines need are kept as arrays so joins and decimal scaling are single vectorized takes.
+    def __init__(self, token_data):
+        self.data = token_data.reset_index(drop=True)
+        self.fingerprint = frame_fingerprint(token_data)
+        self.address_index = pd.Index(self.data["address"])
+        self.by_address_pos = {address: pos for pos, address in enumerate(self.data["address"])}
+        self.by_symbol_pos = {}
+        for pos, symbol in enumerate(self.data["name"]):
+            self.by_symbol_pos.setdefault(symbol, pos)
+        self.address_by_symbol = {symbol: self.data["address"].iat[pos] for symbol, pos in self.by_symbol_pos.items()}
+        self.columns = {column: self.data[column].to_numpy() for column in JOIN_COLUMNS if column in self.data}
+        self.decimal_scale = 10.0 ** self.data["decimals"].to_numpy(dtype=float)
+
+    def __len__(self):
+        return len(self.data)
+
+    def by_address(self, address):
+        pos = self.by_address_pos.get(address)
+        return None if pos is None else self.data.iloc[pos]
+
+    def by_symbol(self, symbol):
+        pos = self.by_symbol_pos.get(symbol)
+        return None if pos is None else self.data.iloc[pos]
+
+    def positions(self, addresses):
+        return self.address_index.get_indexer(addresses)
+
+    def scale(self, raw_amounts, positions):
+        return raw_amounts / self.decimal_scale[positions]
+
+    @metrics.timed("token_registry.join")
+    def join(self, frame, maker_column, taker_column, scale_columns=None):
+        # Equivalent of merging the token table on both sides with ("_maker", "_taker") suffixes: rows whose
+        # tokens are unknown are dropped, and the named raw amounts are divided by their token's decimals.
+        maker_pos = self.positions(frame[maker_column])
+        taker_pos = self.positions(frame[taker_column])
+        known = (maker_pos >= 0) & (taker_pos >= 0)
+        if not known.all():
+            frame = frame[known]
+            maker_pos = maker_pos[known]
+            taker_pos = taker_pos[known]
+        joined_data = frame.reset_index(drop=True)
+
+        for column, values in self.columns.items():
+            joined_data[column + "_maker"] = values[maker_pos]
+            joined_data[column + "_taker"] = values[taker_pos]
+        for column, side in (scale_columns or {}).items():
+            joined_data[column] = self.scale(joined_data[column].to_numpy(dtype=float),
+                                             maker_pos if side == "maker" else taker_pos)
+
+        return joined_data
+
+
+_registry = None
+_registry_source = None
+_registry_lock = threading.Lock()
+
+
+def registry_for(token_data):
+    # Keyed on the token_fetch snapshot itself, so the frame is only hashed when a different object comes in (a
+    # refresh, or a cache that hands out copies) and the registry only rebuilt when the content changed too.
+    global _registry, _registry_source
+    with _registry_lock:
+        if token_data is _registry_source:
+            return _registry
+    fingerprint = frame_fingerprint(token_data)
+    with _registry_lock:
+        if _registry is None or _registry.fingerprint != fingerprint:
+            _registry = TokenRegistry(token_data)
+        _registry_source = token_data
+        return _registry
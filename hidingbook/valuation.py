@@ -0,0 +1,82 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+from hidingbook import cache
+from hidingbook.price_store import covering_lookback
+
+ETH_SYMBOL = "WETH"
+MAX_WORKERS = 8
+SIDES = ("maker", "taker")
+
+logger = logging.getLogger(__name__)
+
+
+def price_table(registry, price_store, addresses, since):
+    # The close of every candle since `since` per distinct token (plus WETH for ETH values), read concurrently from
+    # the shared price store. Tokens without a coingecko id or whose history cannot be fetched are left out and
+    # fall back to latest prices.
+    lookback = covering_lookback(since)
+    coingecko_ids = {}
+    for address in set(addresses) | {registry.address_by_symbol.get(ETH_SYMBOL)}:
+        token = registry.by_address(address)
+        if token is not None and isinstance(token.get("coingecko_id"), str):
+            coingecko_ids[address] = token["coingecko_id"]
+
+    def token_history(item):
+        address, coingecko_id = item
+        try:
+            candles = price_store.view(coingecko_id, lookback)
+        except (requests.RequestException, ValueError) as error:
+            logger.warning("No price history for %s: %r", coingecko_id, error)
+            return None
+        seconds = ((candles["Timestamp"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+        return pd.DataFrame({"Timestamp": seconds, "Close": candles["Close"].to_numpy(), "Token": address})
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, initializer=cache.set_thread_backend,
+                            initargs=(cache.background,)) as pool:
+        histories = [history for history in pool.map(token_history, coingecko_ids.items())
+                     if history is not None and len(history) > 0]
+    if not histories:
+        return pd.DataFrame({"Timestamp": np.array([], dtype=np.int64), "Close": np.array([], dtype=float),
+                             "Token": np.array([], dtype=object)})
+    return pd.concat(histories, ignore_index=True).sort_values("Timestamp", kind="stable")
+
+
+def as_of(times, tokens, price_data):
+    # Close of the nearest candle per (time, token), as one merge_asof over all rows; NaN where a token has no
+    # history. Rows are sorted by time for the join and scattered back to their original positions.
+    left = pd.DataFrame({"Timestamp": times, "Token": pd.Series(tokens, dtype=object),
+                         "Position": np.arange(len(times))})
+    left = left.sort_values("Timestamp", kind="stable")
+    merged = pd.merge_asof(left, price_data.astype({"Token": object}), on="Timestamp", by="Token",
+                           direction="nearest")
+    closes = np.full(len(times), np.nan)
+    closes[merged["Position"].to_numpy()] = merged["Close"].to_numpy()
+    return closes
+
+
+def value_orders(frame, registry, price_store, time_column, maker_column, taker_column, prefix):
+    # Adds <prefix>.usd_price_<side> and <prefix>.eth_price_<side> columns: each token's price at the row's
+    # own time (unix seconds), falling back to the joined latest_price where no history is available.
+    if len(frame) == 0:
+        return frame
+    times = frame[time_column].to_numpy(dtype=np.int64)
+    token_columns = {"maker": maker_column, "taker": taker_column}
+    addresses = pd.unique(frame[[maker_column, taker_column]].to_numpy().ravel())
+    price_data = price_table(registry, price_store, addresses, times.min())
+
+    eth_address = registry.address_by_symbol.get(ETH_SYMBOL)
+    eth_usd = as_of(times, np.full(len(times), eth_address, dtype=object), price_data)
+    valued_data = frame.copy()
+    for side in SIDES:
+        usd = as_of(times, frame[token_columns[side]].astype(object).to_numpy(), price_data)
+        eth = usd / eth_usd
+        valued_data[prefix + ".usd_price_" + side] = np.where(np.isnan(usd),
+                                                              frame["latest_price.usd_price_" + side], usd)
+        valued_data[prefix + ".eth_price_" + side] = np.where(np.isnan(eth),
+                                                              frame["latest_price.eth_price_" + side], eth)
+    return valued_data
@@ -1,14 +1,29 @@
+import pandas as pd
 import streamlit as st
 
-from data_fetchers import order_table, fills_table, auctions_table, order_string
+from data_fetchers import order_table, fills_table, auctions_table, prefetch_order_details, prefetch_balances, \
+    order_string, order_changes, schedule_rerun, order_fetch, book_time_picker
 from charts import price_chart
 
 st.set_page_config(page_title="Open Order Viewer", page_icon="🤖", layout="wide")
 st.markdown('<h1 align="center">Open Orders</h1>', unsafe_allow_html=True)
 
-order_grid, order_data = order_table()
-if len(order_grid) == 0:
+as_of = book_time_picker()
+live = as_of is None and st.checkbox("Live updates", help="Re-render whenever the shared poller refreshes the order\
+    book and highlight orders added, filled or updated in the last few minutes")
+changes = order_changes() if live else None
+if live:
+    schedule_rerun(order_fetch.job.interval)
+order_grid, order_data = order_table(changes, as_of)
+if changes:
+    with st.expander("Recent changes (" + str(len(changes)) + ")"):
+        change_data = pd.DataFrame(changes[::-1], columns=["time", "kind", "Name", "Pair", "OrderHash"])
+        change_data["time"] = pd.to_datetime(change_data["time"], unit="s")
+        st.dataframe(change_data)
+if len(order_grid["data"]) == 0:
     st.stop()
+prefetch_order_details(order_grid["data"]["OrderHash"])
+prefetch_balances(order_grid["page"])
 
 st.write("Select a row for full details")
 if order_grid["selected_rows"]:
@@ -1,21 +1,23 @@
 import streamlit as st
 
-from data_fetchers import order_table
-from charts import size_pie_chart, hiding_book_depth
+from data_fetchers import order_table, analytics_view, book_time_picker
+from charts import size_pie_chart, hiding_book_depth, depth_ladder, order_type_chart
 
 st.set_page_config(page_title="Open Order Viewer", page_icon="🤖", layout="wide")
 st.markdown('<h1 align="center">Open Orders</h1>', unsafe_allow_html=True)
 
-order_grid, order_data = order_table()
+as_of = book_time_picker()
+order_grid, order_data = order_table(as_of=as_of)
 st.write("Note: filtering the table will affect charts")
-if len(order_grid) == 0:
+if len(order_grid["data"]) == 0:
     st.stop()
+order_cube = analytics_view(order_grid)
 st.markdown('<h3 align="center">Order Size Breakdown</h3>', unsafe_allow_html=True)
 col1, col2, col3 = st.columns([1, 1, 1])
 with col1:
     st.write("")
 with col2:
-    size_pie_chart(order_grid["data"])
+    size_pie_chart(order_cube)
 with col3:
     st.write("")
 
@@ -23,6 +25,14 @@ st.markdown('<h3 align="center">Order Book Depth</h3>', unsafe_allow_html=True)
 st.write("These charts indicate the amount of selling (maker) and buying (taker) pressure on a given instrument.")
 col4, col5 = st.columns(2)
 with col4:
-    hiding_book_depth(order_grid["data"], "Token")
+    hiding_book_depth(order_cube, "Token")
 with col5:
-    hiding_book_depth(order_grid["data"], "Pair")
+    hiding_book_depth(order_cube, "Pair")
+
+st.markdown('<h3 align="center">Order Types</h3>', unsafe_allow_html=True)
+st.write("Maker USD and number of orders by order type (market maker, limit order, AutoFill).")
+order_type_chart(order_cube)
+
+st.markdown('<h3 align="center">Depth Ladder</h3>', unsafe_allow_html=True)
+st.write("How much liquidity sits at or better than each limit price on a pair.")
+depth_ladder(order_grid, order_data, archived=as_of is not None)
@@ -1,30 +1,24 @@
 import streamlit as st
 
-from data_fetchers import historical_table, fills_table, auctions_table, known_address_fetch
+from data_fetchers import historical_table, fills_table, auctions_table, prefetch_order_details, wallet_picker
 
 st.set_page_config(page_title="Historical Order Viewer", page_icon="🤖", layout="wide")
 st.markdown('<h1 align="center">Historical Orders</h1>', unsafe_allow_html=True)
 
-wallet_address = st.text_input("Wallet Address / Identifier", "")
-
-if len(wallet_address) > 0:
-    if wallet_address[:2] != "0x":
-        known_addresses = known_address_fetch()
-        wallet_address = known_addresses[known_addresses["Name"] == wallet_address].index.values[0]
-        st.write("Wallet address: " + wallet_address)
-
-    st.markdown(
-        "[Etherscan (Wallet)](https://etherscan.io/address/" + wallet_address + "#tokentxns)",
-        unsafe_allow_html=True)
-    st.markdown(
-        "[Nansen Wallet Profiler](https://pro.nansen.ai/wallet-profiler?address=" + wallet_address + ")",
-        unsafe_allow_html=True)
-    try:
-        order_grid = historical_table(wallet_address)
-    except:
-        st.stop()
+wallet_addresses = wallet_picker()
+
+if len(wallet_addresses) > 0:
+    if len(wallet_addresses) == 1:
+        st.markdown(
+            "[Etherscan (Wallet)](https://etherscan.io/address/" + wallet_addresses[0] + "#tokentxns)",
+            unsafe_allow_html=True)
+        st.markdown(
+            "[Nansen Wallet Profiler](https://pro.nansen.ai/wallet-profiler?address=" + wallet_addresses[0] + ")",
+            unsafe_allow_html=True)
+    order_grid = historical_table(wallet_addresses)
 else:
     st.stop()
+prefetch_order_details(order_grid["data"]["OrderHash"])
 
 if order_grid["selected_rows"]:
     st.caption("Selected order:")
@@ -1,38 +1,31 @@
 import streamlit as st
 
-from data_fetchers import historical_table, known_address_fetch
+from data_fetchers import historical_table, wallet_picker, analytics_view
 from charts import size_pie_chart, order_history_chart
 
 st.set_page_config(page_title="Historical Order Viewer", page_icon="🤖", layout="wide")
 st.markdown('<h1 align="center">Historical Orders</h1>', unsafe_allow_html=True)
 
-wallet_address = st.text_input("Wallet Address / Identifier", "")
+wallet_addresses = wallet_picker()
 
-if len(wallet_address) > 0:
-    if wallet_address[:2] != "0x":
-        known_addresses = known_address_fetch()
-        wallet_address = known_addresses[known_addresses["Name"] == wallet_address].index.values[0]
-        st.write("Wallet address: " + wallet_address)
+if len(wallet_addresses) > 0:
+    if len(wallet_addresses) == 1:
+        st.markdown(
+            "[Etherscan (Wallet)](https://etherscan.io/address/" + wallet_addresses[0] + "#tokentxns)",
+            unsafe_allow_html=True)
+        st.markdown(
+            "[Nansen Wallet Profiler](https://pro.nansen.ai/wallet-profiler?address=" + wallet_addresses[0] + ")",
+            unsafe_allow_html=True)
+    order_grid = historical_table(wallet_addresses)
+    st.write("Note: filtering the table will affect charts")
 
-    st.markdown(
-        "[Etherscan (Wallet)](https://etherscan.io/address/" + wallet_address + "#tokentxns)",
-        unsafe_allow_html=True)
-    st.markdown(
-        "[Nansen Wallet Profiler](https://pro.nansen.ai/wallet-profiler?address=" + wallet_address + ")",
-        unsafe_allow_html=True)
-    try:
-        order_grid = historical_table(wallet_address)
-        st.write("Note: filtering the table will affect charts")
-    except:
-        st.stop()
-
-    if len(order_grid) > 0:
+    if len(order_grid["data"]) > 0:
         st.markdown('<h3 align="center">Order Size Breakdown</h3>', unsafe_allow_html=True)
         col4, col5, col6 = st.columns([1, 1, 1])
         with col4:
             st.write("")
         with col5:
-            size_pie_chart(order_grid["data"])
+            size_pie_chart(analytics_view(order_grid))
         with col6:
             st.write("")
 
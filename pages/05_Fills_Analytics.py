@@ -0,0 +1,43 @@
+import streamlit as st
+
+from data_fetchers import fills_analytics_data
+from charts import fill_totals_chart, fill_latency_chart
+
+st.set_page_config(page_title="Fills Analytics", page_icon="🤖", layout="wide")
+st.markdown('<h1 align="center">Fills</h1>', unsafe_allow_html=True)
+
+st.write("Fills of every filled order in the open book and the local history store, as collected by the fills "
+         "ingestion.")
+lookback = st.radio("Lookback", ("1D", "1W", "1M", "1Y", "MAX"), index=4, horizontal=True)
+fills_data = fills_analytics_data(lookback)
+if fills_data is None or len(fills_data) == 0:
+    st.write("No fills stored yet. Run `python -m hidingbook ingest-fills`, or start the app with "
+             "`HIDINGBOOK_INGEST=1` to collect them in the background.")
+    st.stop()
+
+st.markdown('<h3 align="center">Fill Volume</h3>', unsafe_allow_html=True)
+col1, col2 = st.columns(2)
+with col1:
+    fill_totals_chart(fills_data, "Keeper", "TakerAmtFilledUSD")
+with col2:
+    fill_totals_chart(fills_data, "Pair", "TakerAmtFilledUSD")
+
+st.markdown('<h3 align="center">Gas Spent</h3>', unsafe_allow_html=True)
+col3, col4 = st.columns(2)
+with col3:
+    fill_totals_chart(fills_data, "Keeper", "GasUSD")
+with col4:
+    fill_totals_chart(fills_data, "Pair", "GasUSD")
+
+st.markdown('<h3 align="center">Fill Latency</h3>', unsafe_allow_html=True)
+col5, col6 = st.columns(2)
+with col5:
+    fill_latency_chart(fills_data)
+with col6:
+    fill_totals_chart(fills_data, "Keeper", "MedianLatencySec")
+
+with st.expander("Legend"):
+    st.markdown("**Keeper**: keeper that filled the order (the taker address when it is not a known keeper)")
+    st.markdown("**Filled USD**: taker amount filled, valued at USD prices at the time of fill")
+    st.markdown("**GasUSD**: gas spent in USD at the time of fill")
+    st.markdown("**Latency**: time from order creation to fill")
@@ -0,0 +1,51 @@
+import pandas as pd
+import streamlit as st
+
+import data_fetchers  # noqa: F401 (installs the cache backend, starts the local endpoint and background refresh)
+from hidingbook import http_client, local_server, metrics, refresher
+
+st.set_page_config(page_title="Diagnostics", page_icon="🤖", layout="wide")
+st.markdown('<h1 align="center">Diagnostics</h1>', unsafe_allow_html=True)
+
+st.write("Timings, result sizes and cache behaviour of the fetchers, table builders and charts since the app started\
+    (shared by all sessions). Load the other pages to populate them.")
+if st.button("Reset"):
+    metrics.registry.reset()
+
+st.markdown('<h3 align="center">Timings</h3>', unsafe_allow_html=True)
+st.dataframe(metrics.timer_frame())
+with st.expander("Legend"):
+    st.markdown("**Name**: instrumented function; `<table>.aggrid` is grid options serialization plus the AgGrid\
+                component, `*.json_normalize` and `token_registry.join` are the flattening and token joins")
+    st.markdown("**calls**, **errors**: number of calls and of calls that raised")
+    st.markdown("**seconds_avg**, **seconds_max**, **seconds_last**, **seconds_total**: wall time per call\
+                (cached fetchers include cache hits)")
+    st.markdown("**rows_last**: rows in the last result")
+    st.markdown("**bytes_last**: in-memory size of the last result (shallow, so string contents are not counted)")
+
+st.markdown('<h3 align="center">Caches</h3>', unsafe_allow_html=True)
+st.dataframe(metrics.cache_frame())
+st.write("`cache` is the in-process (Streamlit memo) layer; `disk_cache` is the on-disk layer behind it, where\
+    stale entries are served while a background refresh runs. `price_store` counts full downloads (`load`),\
+    incremental refreshes (`append`) and views served without asking upstream (`hit`) per candle tier;\
+    `depth_ladder` counts pair ladders reused (`hit`) or rebuilt (`miss`) when the order book changes, and\
+    `analytics_cube` counts analytics cubes shared (`hit`) or built (`miss`) for a snapshot.")
+
+st.markdown('<h3 align="center">Background refresh</h3>', unsafe_allow_html=True)
+st.write("Snapshots served to every page while the next refresh runs in the background: age and refresh duration\
+    (seconds), and the error of the last failed refresh, if any.")
+st.dataframe(pd.DataFrame(refresher.status()))
+
+st.markdown('<h3 align="center">Upstream APIs</h3>', unsafe_allow_html=True)
+st.write("Requests, response bytes, latency (seconds) and keep-alive connection reuse per upstream host.")
+st.dataframe(pd.DataFrame.from_dict(http_client.transport_stats(), orient="index"))
+
+st.markdown('<h3 align="center">Prometheus</h3>', unsafe_allow_html=True)
+if local_server.url() is not None:
+    st.write("Scrape endpoint: " + local_server.url() + "/metrics")
+else:
+    st.write("The local endpoint is not running (see the app log); the current export is below.")
+prometheus_text = metrics.prometheus_text()
+st.download_button("Download metrics", prometheus_text, file_name="hidingbook.prom", mime="text/plain")
+with st.expander("Export"):
+    st.code(prometheus_text, language="text")
@@ -0,0 +1,77 @@
+import difflib
+import random
+import string
+
+import pandas as pd
+
+from hidingbook.address_directory import FUZZY_CUTOFF, SUGGESTIONS, AddressDirectory, directory_for
+
+WORDS = ["alpha", "beta", "gamma", "delta", "keeper", "maker", "capital", "labs", "trading", "fund"]
+
+
+def random_known_addresses(seed, count=300):
+    rng = random.Random(seed)
+    names = [" ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 3))) for _ in range(count // 2)]
+    addresses = ["0x" + "".join(rng.choice("0123456789abcdefABCDEF") for _ in range(40)) for _ in range(count)]
+    return pd.DataFrame({"Name": [rng.choice(names) for _ in addresses],
+                         "Type": [rng.choice(["Market Maker", "Keeper"]) for _ in addresses]},
+                        index=pd.Index(addresses, name="Address"))
+
+
+def brute_force_suggest(known_addresses, text, limit=SUGGESTIONS):
+    # The ranking suggest() implements with bisect, as a scan over every name and address.
+    key = text.strip().lower()
+    if not key:
+        return []
+    if key[:2] == "0x":
+        names_by_address = {}
+        for address, name in zip(known_addresses.index, known_addresses["Name"]):
+            names_by_address.setdefault(address.lower(), name)
+        matches = [name for address, name in sorted(names_by_address.items()) if address.startswith(key)][:limit]
+        return list(dict.fromkeys(matches))
+    names = {}
+    for name in known_addresses["Name"]:
+        names.setdefault(name.lower(), name)
+    keys = sorted(names)
+    ranked = [key] if key in names else []
+    ranked += [name_key for name_key in keys if name_key.startswith(key)][:limit]
+    words = sorted((word, name_key) for name_key in keys for word in name_key.split()[1:])
+    ranked += [name_key for word, name_key in words if word.startswith(key)][:limit]
+    if not ranked:
+        ranked = difflib.get_close_matches(key, keys, n=limit, cutoff=FUZZY_CUTOFF)
+    return [names[name_key] for name_key in list(dict.fromkeys(ranked))[:limit]]
+
+
+def test_suggest_matches_brute_force():
+    known_addresses = random_known_addresses(seed=1)
+    directory = AddressDirectory(known_addresses)
+    rng = random.Random(2)
+    texts = ["", "  ", "0x", "0x1", "0xab", "0xABC"] + [name[:rng.randint(1, len(name))] for name in
+                                                       rng.sample(list(known_addresses["Name"]), 50)]
+    texts += [word[:rng.randint(1, len(word))] for word in WORDS]
+    texts += ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))) for _ in range(50)]
+    texts += ["Kepper", "captial lab"]
+    for text in texts:
+        assert directory.suggest(text) == brute_force_suggest(known_addresses, text), text
+
+
+def test_lookups_ignore_case():
+    known_addresses = random_known_addresses(seed=3)
+    directory = AddressDirectory(known_addresses)
+    for address, name in zip(known_addresses.index, known_addresses["Name"]):
+        first = known_addresses["Name"][known_addresses.index.str.lower() == address.lower()].iloc[0]
+        assert directory.name(address.upper().replace("0X", "0x")) == first
+        assert address in directory.lookup(name.upper())
+        assert directory.resolve(" " + name.lower() + " ") == directory.lookup(name)
+    unknown = pd.Series([known_addresses.index[0].lower(), "0xunknown"])
+    assert directory.map_names(unknown).isna().tolist() == [False, True]
+    assert directory.resolve("0x" + "a" * 40) == ["0x" + "a" * 40]
+    assert directory.resolve("0xabc") == []
+
+
+def test_directory_for_rebuilds_only_on_new_content():
+    known_addresses = random_known_addresses(seed=4)
+    directory = directory_for(known_addresses)
+    assert directory_for(known_addresses) is directory
+    assert directory_for(known_addresses.copy()) is directory
+    assert directory_for(known_addresses.iloc[1:]) is not directory
@@ -0,0 +1,98 @@
+import os
+import random
+
+import pandas as pd
+
+from hidingbook.book_archive import BookArchive, partition_name
+from hidingbook.compact import compact, hash_strings
+
+START = 1_700_000_000 - 1_700_000_000 % 3600
+TOKEN_COLUMNS = (("name_maker", "name_taker"),)
+
+
+def snapshot(book):
+    frame = pd.DataFrame([dict(order, **{"metaData.orderHash": order_hash}) for order_hash, order in book.items()],
+                         columns=["metaData.orderHash", "name_maker", "name_taker", "amount"])
+    return compact(frame, list(frame.columns), shared_categories=TOKEN_COLUMNS, hashes=["metaData.orderHash"])
+
+
+def simulate(archive, polls, seed=1, interval=60):
+    # Polls that add, update and remove orders, recorded with the change set OrderBook.sync hands over. Returns
+    # (timestamp, book) per poll.
+    rng = random.Random(seed)
+    book = {}
+    snapshots = []
+    frame = snapshot(book)
+    for poll in range(polls):
+        previous = frame
+        changed = set()
+        for _ in range(5):
+            order_hash = "0x%064x" % rng.randrange(400)
+            book[order_hash] = {"name_maker": rng.choice("ABC"), "name_taker": rng.choice("XYZ"),
+                                "amount": rng.random()}
+            changed.add(order_hash)
+        removed = set(rng.sample(sorted(book), min(4, len(book)))) if poll % 10 else set()
+        for order_hash in removed:
+            del book[order_hash]
+        changed -= removed
+        frame = snapshot(book)
+        upserted = frame[hash_strings(frame, "metaData.orderHash").isin(changed).to_numpy()]
+        removed_rows = previous[hash_strings(previous, "metaData.orderHash").isin(removed).to_numpy()]
+        timestamp = START + poll * interval
+        archive.record(frame, None if poll == 0 else (upserted, removed_rows), timestamp)
+        snapshots.append((timestamp, frame))
+    return snapshots
+
+
+def comparable(frame):
+    frame = frame.astype({column: object for column in frame.columns if frame[column].dtype == "category"})
+    return frame.sort_values(list(frame.columns)[:4]).reset_index(drop=True)
+
+
+def test_book_at_rebuilds_every_snapshot(tmp_path):
+    archive = BookArchive(str(tmp_path), shared_categories=TOKEN_COLUMNS)
+    # Three and a half hours of polls: finished hours are merged when the next one starts.
+    snapshots = simulate(archive, 210)
+    assert archive.book_at(START - 1) is None
+    for timestamp, frame in snapshots[::6] + snapshots[-1:]:
+        for at in (timestamp, timestamp + 59):
+            book = archive.book_at(at)
+            pd.testing.assert_frame_equal(comparable(book[list(frame.columns)]), comparable(frame),
+                                          check_dtype=False)
+
+    finished = sorted(os.listdir(tmp_path))[:-1]
+    assert len(finished) == 3
+    for partition in finished:
+        kinds = sorted(file_name.split("-")[0] for file_name in os.listdir(tmp_path / partition))
+        assert kinds == ["checkpoint", "diffs"]
+
+
+def test_unchanged_poll_writes_nothing(tmp_path):
+    archive = BookArchive(str(tmp_path))
+    frame = snapshot({"0x%064x" % 1: {"name_maker": "A", "name_taker": "X", "amount": 1.0}})
+    assert archive.record(frame, None, START) == "checkpoint"
+    assert archive.record(frame, (frame.iloc[:0], frame.iloc[:0]), START + 30) is None
+    assert archive.record(frame, None, START + 60) == "checkpoint"
+    assert archive.record(frame, (frame, frame.iloc[:0]), START + 90) == "diff"
+    # A new hour starts with a checkpoint whatever the change set.
+    assert archive.record(frame, (frame, frame.iloc[:0]), START + 3600) == "checkpoint"
+
+
+def test_retention_drops_old_hours(tmp_path):
+    archive = BookArchive(str(tmp_path), shared_categories=TOKEN_COLUMNS, retention=3600)
+    snapshots = simulate(archive, 3 * 60 + 1)
+    assert sorted(os.listdir(tmp_path)) == [partition_name(START + hour * 3600) for hour in (2, 3)]
+    assert archive.book_at(START + 2 * 3600 - 1) is None
+    timestamp, frame = snapshots[-50]
+    pd.testing.assert_frame_equal(comparable(archive.book_at(timestamp)[list(frame.columns)]), comparable(frame),
+                                  check_dtype=False)
+
+
+def test_merged_diffs_read_like_the_files_they_replace(tmp_path):
+    merged = BookArchive(str(tmp_path / "merged"), shared_categories=TOKEN_COLUMNS)
+    plain = BookArchive(str(tmp_path / "plain"), shared_categories=TOKEN_COLUMNS)
+    merged_snapshots = simulate(merged, 65, seed=3)
+    simulate(plain, 60, seed=3)
+    for timestamp, _ in merged_snapshots[:60:3]:
+        pd.testing.assert_frame_equal(comparable(merged.book_at(timestamp)), comparable(plain.book_at(timestamp)),
+                                      check_dtype=False)
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from hidingbook.depth_ladder import DepthLadders
+
+TOKENS = ["AAA", "BBB", "CCC", "DDD"]
+
+
+def random_orders(rng, count=400):
+    rows = []
+    for number in range(count):
+        maker_token, taker_token = rng.sample(TOKENS, 2)
+        maker_amount = float(rng.randint(1, 50))
+        taker_amount = float(rng.choice([1, 2, 4, 5, 8, 10])) * maker_amount
+        unfilled = taker_amount * rng.choice([0.25, 0.5, 1])
+        rows.append({"OrderHash": "0x%064x" % number, "MakerToken": maker_token, "TakerToken": taker_token,
+                     "MakerAmt": maker_amount, "TakerAmt": taker_amount, "MakerAmtUSD": 3 * maker_amount,
+                     "UnfilledTakerAmt": unfilled, "UnfilledTakerUSD": 7 * unfilled,
+                     "Price": taker_amount / maker_amount})
+    return pd.DataFrame(rows)
+
+
+def brute_force(order_data):
+    # Price levels order by order: asks sell the base (alphabetically first) token at Price, bids buy it at
+    # 1 / Price; levels run best first and accumulate amount and value.
+    levels = {}
+    for order in order_data.to_dict("records"):
+        base, quote = sorted([order["MakerToken"], order["TakerToken"]])
+        remaining = order["UnfilledTakerAmt"] / order["TakerAmt"]
+        if order["MakerToken"] == base:
+            key = ("Ask", order["Price"])
+            amount, value = order["MakerAmt"] * remaining, order["MakerAmtUSD"] * remaining
+        else:
+            key = ("Bid", 1 / order["Price"])
+            amount, value = order["UnfilledTakerAmt"], order["UnfilledTakerUSD"]
+        level = levels.setdefault(base + "/" + quote, {}).setdefault(key, [0.0, 0.0, 0])
+        level[0] += amount
+        level[1] += value
+        level[2] += 1
+    ladders = {}
+    for pair, pair_levels in levels.items():
+        rows = []
+        for side, best_first in (("Ask", True), ("Bid", False)):
+            depth_amount = depth_value = 0.0
+            for (_, price), (amount, value, orders) in sorted(
+                    ((key, level) for key, level in pair_levels.items() if key[0] == side),
+                    key=lambda item: item[0][1], reverse=not best_first):
+                depth_amount += amount
+                depth_value += value
+                rows.append([side, price, amount, depth_amount, depth_value, orders])
+        ladders[pair] = rows
+    return ladders
+
+
+def assert_matches(ladders, expected):
+    assert sorted(ladders) == sorted(expected)
+    for pair, ladder in ladders.items():
+        assert (ladder["Pair"] == pair).all()
+        actual = ladder[["Side", "Price", "Amount", "DepthAmt", "DepthUSD", "Orders"]].values.tolist()
+        assert [row[0] for row in actual] == [row[0] for row in expected[pair]]
+        assert np.allclose(np.array([row[1:] for row in actual], dtype=float),
+                           np.array([row[1:] for row in expected[pair]], dtype=float))
+
+
+def test_ladders_match_brute_force():
+    rng = random.Random(1)
+    order_data = random_orders(rng)
+    assert_matches(DepthLadders().update(order_data), brute_force(order_data))
+
+
+def test_incremental_updates_match_fresh_ladders():
+    rng = random.Random(2)
+    ladders = DepthLadders()
+    order_data = random_orders(rng)
+    for _ in range(10):
+        # Fill some orders and drop others, then compare with ladders built from scratch.
+        filled = order_data.sample(5, random_state=rng.randint(0, 10 ** 6)).index
+        order_data.loc[filled, "UnfilledTakerAmt"] /= 2
+        order_data.loc[filled, "UnfilledTakerUSD"] /= 2
+        order_data = order_data.drop(order_data.sample(5, random_state=rng.randint(0, 10 ** 6)).index)
+        order_data = order_data.reset_index(drop=True)
+        assert_matches(ladders.update(order_data), brute_force(order_data))
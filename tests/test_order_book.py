@@ -0,0 +1,123 @@
+import copy
+import random
+
+import pandas as pd
+
+from hidingbook.address_directory import AddressDirectory
+from hidingbook.compact import compact, concat_compact, hash_columns, hash_strings
+from hidingbook.order_book import OrderBook, derive_orders
+from hidingbook.token_registry import TokenRegistry
+
+TOKENS = pd.DataFrame({"address": ["0xa", "0xb", "0xc"], "name": ["AAA", "BBB", "CCC"], "decimals": [18, 6, 8],
+                       "latest_price.usd_price": [1.0, 2.0, 3.0], "latest_price.eth_price": [0.1, 0.2, 0.3]})
+KNOWN_ADDRESSES = pd.DataFrame({"Name": ["Maker One"], "Type": ["Market Maker"]},
+                               index=pd.Index(["0xm"], name="Address"))
+COLUMNS = ["metaData.orderHash", "order.maker", "Name", "OrderType", "name_maker", "name_taker", "order.makerAmount",
+           "metaData.filledAmount_takerToken", "metaData.remainingFillableAmount_takerToken"]
+TOKEN_COLUMNS = (("name_maker", "name_taker"),)
+
+
+def random_order(rng, number):
+    return {"order": {"maker": rng.choice(["0xm", "0xu"]), "makerToken": rng.choice(["0xa", "0xb", "0xz"]),
+                      "takerToken": rng.choice(["0xb", "0xc"]), "makerAmount": rng.randint(1, 10 ** 20),
+                      "takerAmount": rng.randint(1, 10 ** 9), "expiry": 1000 + rng.choice([10, 1000]),
+                      "salt": str(number)},
+            "metaData": {"orderHash": "0x%064x" % number, "creation": 1000, "filledAmount_takerToken": 0,
+                         "remainingFillableAmount_takerToken": 10 ** 9}}
+
+
+def random_polls(seed, count=20):
+    # Successive payloads of the orders endpoint: each poll drops some orders, adds new ones and fills others.
+    rng = random.Random(seed)
+    orders = [random_order(rng, number) for number in range(60)]
+    polls = [copy.deepcopy(orders)]
+    for poll in range(count):
+        orders = [order for order in orders if rng.random() > 0.1]
+        orders += [random_order(rng, 1000 + poll * 10 + number) for number in range(rng.randint(0, 4))]
+        for order in rng.sample(orders, min(3, len(orders))):
+            order["metaData"]["filledAmount_takerToken"] += 1000
+            order["metaData"]["remainingFillableAmount_takerToken"] -= 1000
+        polls.append(copy.deepcopy(orders))
+    return polls
+
+
+def rebuild(orders, registry, directory):
+    return derive_orders(pd.json_normalize(copy.deepcopy(orders)), registry, directory)
+
+
+def comparable(frame):
+    frame = frame.assign(**{"metaData.orderHash": hash_strings(frame, "metaData.orderHash")})
+    frame = frame.drop(columns=[column for column in hash_columns("metaData.orderHash") if column in frame])
+    frame = frame.astype({column: object for column in frame.columns if frame[column].dtype == "category"})
+    return frame.sort_values("metaData.orderHash").reset_index(drop=True)[sorted(frame.columns)]
+
+
+def test_sync_matches_full_rebuild():
+    registry = TokenRegistry(TOKENS)
+    directory = AddressDirectory(KNOWN_ADDRESSES)
+    book = OrderBook()
+    for orders in random_polls(seed=1):
+        pd.testing.assert_frame_equal(comparable(book.sync(orders, registry, directory)),
+                                      comparable(rebuild(orders, registry, directory)), check_dtype=False)
+
+
+def test_compacted_sync_matches_compacted_rebuild():
+    registry = TokenRegistry(TOKENS)
+    directory = AddressDirectory(KNOWN_ADDRESSES)
+
+    def compact_orders(order_data):
+        return compact(order_data, COLUMNS, categories=["Name", "OrderType"], shared_categories=TOKEN_COLUMNS,
+                       hashes=["metaData.orderHash"])
+
+    book = OrderBook(compact=compact_orders, shared_categories=TOKEN_COLUMNS)
+    for orders in random_polls(seed=2):
+        book_data = book.sync(orders, registry, directory)
+        assert all(book_data[column].dtype == "category" for column in ("Name", "name_maker", "name_taker"))
+        assert list(book_data["name_maker"].cat.categories) == list(book_data["name_taker"].cat.categories)
+        pd.testing.assert_frame_equal(comparable(book_data),
+                                      comparable(compact_orders(rebuild(orders, registry, directory))),
+                                      check_dtype=False)
+
+
+def test_token_refresh_rebuilds_book():
+    directory = AddressDirectory(KNOWN_ADDRESSES)
+    book = OrderBook()
+    orders = random_polls(seed=3, count=0)[0]
+    book.sync(orders, TokenRegistry(TOKENS), directory)
+    repriced = TokenRegistry(TOKENS.assign(**{"latest_price.usd_price": [5.0, 6.0, 7.0]}))
+    pd.testing.assert_frame_equal(comparable(book.sync(orders, repriced, directory)),
+                                  comparable(rebuild(orders, repriced, directory)), check_dtype=False)
+
+
+class RecordingArchive:
+    def __init__(self):
+        self.records = []
+
+    def record(self, frame, changes=None):
+        self.records.append((frame, changes))
+
+
+def test_archive_gets_the_rows_each_sync_changed():
+    registry = TokenRegistry(TOKENS)
+    directory = AddressDirectory(KNOWN_ADDRESSES)
+    archive = RecordingArchive()
+    book = OrderBook(archive=archive)
+    polls = random_polls(seed=4)
+    for orders in polls:
+        book.sync(orders, registry, directory)
+
+    assert archive.records[0][1] is None
+    state = archive.records[0][0]
+    for (frame, (upserted, removed)), orders in zip(archive.records[1:], polls[1:]):
+        # Replaying the change sets on the first snapshot gives every later one.
+        state = pd.concat([state[~state["metaData.orderHash"].isin(upserted["metaData.orderHash"]) &
+                                 ~state["metaData.orderHash"].isin(removed["metaData.orderHash"])], upserted])
+        pd.testing.assert_frame_equal(comparable(state), comparable(frame), check_dtype=False)
+        pd.testing.assert_frame_equal(comparable(frame), comparable(rebuild(orders, registry, directory)),
+                                      check_dtype=False)
+
+
+def test_concat_compact_keeps_index_when_asked():
+    left = pd.DataFrame({"name": pd.Categorical(["a"])}, index=["x"])
+    right = pd.DataFrame({"name": pd.Categorical(["b"])}, index=["y"])
+    assert list(concat_compact([left, right], ignore_index=False).index) == ["x", "y"]
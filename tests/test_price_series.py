@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from hidingbook.price_series import cross_rate, downsample, lttb
+
+
+def reference_lttb(x, y, threshold):
+    # Straight transcription of the published algorithm, one point and one triangle at a time.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    bucket_size = (n - 2) / (threshold - 2)
+    kept = [0]
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        next_x = sum(x[end:next_end]) / (next_end - end)
+        next_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for point in range(start, end):
+            area = abs((x[previous] - next_x) * (y[point] - y[previous]) -
+                       (x[previous] - x[point]) * (next_y - y[previous]))
+            if area > best_area:
+                best, best_area = point, area
+        kept.append(best)
+        previous = best
+    return kept + [n - 1]
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(1)
+    for n, threshold in [(10, 3), (100, 7), (1000, 500), (5000, 500), (4321, 123)]:
+        x = np.cumsum(rng.integers(1, 100, n)).astype(float)
+        y = np.cumsum(rng.normal(size=n))
+        assert list(lttb(x, y, threshold)) == reference_lttb(list(x), list(y), threshold)
+
+
+def test_lttb_keeps_short_series():
+    assert list(lttb(np.arange(5.0), np.arange(5.0), 10)) == [0, 1, 2, 3, 4]
+
+
+def test_downsample_keeps_extremes_and_endpoints():
+    timestamps = pd.date_range("2022-01-01", periods=2000, freq="min")
+    close = np.sin(np.linspace(0, 20, 2000))
+    close[1234] = 5
+    prices = pd.DataFrame({"Timestamp": timestamps, "Close": close})
+    sampled = downsample(prices, 100)
+    assert len(sampled) == 100
+    assert sampled["Timestamp"].iloc[0] == timestamps[0] and sampled["Timestamp"].iloc[-1] == timestamps[-1]
+    assert sampled["Close"].max() == 5
+
+
+def test_cross_rate_aligns_on_nearest_candle():
+    # Each base candle takes the nearest quote candle within two hours (the coarser interval); the last one is
+    # further than that from any quote candle and is dropped.
+    base = pd.DataFrame({"Timestamp": pd.to_datetime(["2022-01-01 00:00", "2022-01-01 01:00", "2022-01-01 02:00",
+                                                      "2022-01-01 04:00", "2022-01-01 09:00"]),
+                         "Close": [2.0, 4, 6, 8, 10]})
+    quote = pd.DataFrame({"Timestamp": pd.date_range("2022-01-01 00:05", periods=2, freq="2h"), "Close": [2.0, 3]})
+    rate = cross_rate(base, quote)
+    assert list(rate["Close"]) == [1, 2, 2, 8 / 3]
@@ -0,0 +1,55 @@
+import random
+
+import pandas as pd
+
+from hidingbook.order_book import ORDER_AMOUNTS
+from hidingbook.token_registry import TokenRegistry, registry_for
+
+TOKENS = pd.DataFrame({"address": ["0xa", "0xb", "0xc"], "name": ["AAA", "BBB", "AAA"], "decimals": [18, 6, 8],
+                       "coingecko_id": ["a", "b", "c"], "latest_price.usd_price": [1.0, 2.0, 3.0],
+                       "latest_price.eth_price": [0.1, 0.2, 0.3]})
+
+
+def random_orders(seed, count=1000):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "order.makerToken": [rng.choice(["0xa", "0xb", "0xc", "0xz"]) for _ in range(count)],
+        "order.takerToken": [rng.choice(["0xa", "0xb", "0xc"]) for _ in range(count)],
+        "order.makerAmount": [rng.randint(1, 10 ** 20) for _ in range(count)],
+        "order.takerAmount": [rng.randint(1, 10 ** 9) for _ in range(count)],
+        "metaData.filledAmount_takerToken": [rng.randint(0, 10 ** 9) for _ in range(count)],
+        "metaData.remainingFillableAmount_takerToken": [rng.randint(0, 10 ** 9) for _ in range(count)],
+        "row": range(count)})
+
+
+def merged(orders):
+    # The joins the registry replaced: the token table merged on both sides, then every amount rescaled.
+    joined = pd.merge(orders, TOKENS, left_on="order.makerToken", right_on="address")
+    joined = pd.merge(joined, TOKENS, left_on="order.takerToken", right_on="address", suffixes=("_maker", "_taker"))
+    for column, side in ORDER_AMOUNTS.items():
+        joined[column] = joined[column] / 10 ** joined["decimals_" + side]
+    return joined.sort_values("row").reset_index(drop=True)
+
+
+def test_join_matches_merge():
+    orders = random_orders(seed=1)
+    joined = TokenRegistry(TOKENS).join(orders, "order.makerToken", "order.takerToken", ORDER_AMOUNTS)
+    expected = merged(orders)
+    assert len(joined) == len(expected) < len(orders)
+    pd.testing.assert_frame_equal(joined, expected[list(joined.columns)], check_dtype=False)
+
+
+def test_lookups():
+    registry = TokenRegistry(TOKENS)
+    assert registry.by_address("0xb")["name"] == "BBB"
+    assert registry.by_address("0xz") is None
+    # The first token with a symbol wins, as with the boolean-mask lookups it replaced.
+    assert registry.by_symbol("AAA")["coingecko_id"] == "a"
+    assert registry.by_symbol("ZZZ") is None
+
+
+def test_registry_for_rebuilds_only_on_new_content():
+    registry = registry_for(TOKENS)
+    assert registry_for(TOKENS) is registry
+    assert registry_for(TOKENS.copy()) is registry
+    assert registry_for(TOKENS.assign(decimals=[18, 6, 9])) is not registry